@@ -0,0 +1,211 @@
+"""
+Process-local caching for query results that only change on import.
+
+Type catalogs and search indexes are kept in ``query_cache``, a small LRU
+that imports clear after committing. Stats query results (equipment and
+system series and totals) are only cached for the keys the last cache
+warming chose (app.warming), unless QUERY_CACHE_RESULTS=all caches every
+one. Entries also expire after QUERY_CACHE_TTL seconds, which bounds
+staleness in workers that did not run the import themselves. The cache
+also counts lookups of the most requested keys over the last day, so the
+hottest queries can be warmed after an import.
+
+``single_flight`` coalesces concurrent identical queries: while one request
+runs a query, others asking for the same key wait for its result instead of
+sending the same SQL again.
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from collections.abc import Callable
+from typing import Any
+
+from app.database import settings
+
+# Lookups are counted in hourly buckets over the last day
+REQUEST_LOG_BUCKETS = 24
+# Keys counted per bucket; past twice as many, only the most requested are kept
+REQUEST_LOG_KEYS = 1000
+
+
+class QueryCache:
+    """Thread-safe LRU of query results cleared on import."""
+
+    def __init__(self):
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._requests: deque[tuple[int, Counter]] = deque(maxlen=REQUEST_LOG_BUCKETS)
+        self._warmed: frozenset = frozenset()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Any | None:
+        with self._lock:
+            self._record(key)
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] >= settings.query_cache_ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, generation: int | None = None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                # An import invalidated the cache while the value was loading
+                return
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.query_cache_size:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, calling ``loader`` once on a miss."""
+        value = self.get(key)
+        if value is None:
+            generation = self._generation
+            value = single_flight.do(("cache", key), loader)
+            self.set(key, value, generation)
+        return value
+
+    def get_or_load_result(self, key, loader: Callable[[], Any]) -> Any:
+        """
+        Like get_or_load for stats query results, which are only cached for
+        warmed keys unless QUERY_CACHE_RESULTS=all. Uncached lookups are still
+        counted for hot_keys() and coalesced with concurrent identical ones.
+        """
+        if settings.query_cache_results == "all" or key in self._warmed:
+            return self.get_or_load(key, loader)
+        with self._lock:
+            self._record(key)
+        return single_flight.do(key, loader)
+
+    def set_warmed(self, keys):
+        """Cache the results of these keys from now on, instead of the previous ones."""
+        self._warmed = frozenset(keys)
+
+    def invalidate(self):
+        """Drop every entry; called after each import."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def reset(self):
+        """Drop entries, statistics and the request log."""
+        self.invalidate()
+        with self._lock:
+            self._requests.clear()
+            self._warmed = frozenset()
+            self.hits = 0
+            self.misses = 0
+
+    def _record(self, key):
+        hour = int(time.time() // 3600)
+        while self._requests and self._requests[0][0] <= hour - REQUEST_LOG_BUCKETS:
+            self._requests.popleft()
+        if not self._requests or self._requests[-1][0] != hour:
+            self._requests.append((hour, Counter()))
+        counts = self._requests[-1][1]
+        counts[key] += 1
+        # Keys come from client filters: keep the bucket bounded to its heavy hitters
+        if len(counts) > 2 * REQUEST_LOG_KEYS:
+            kept = counts.most_common(REQUEST_LOG_KEYS)
+            counts.clear()
+            counts.update(dict(kept))
+
+    def hot_keys(self, limit: int) -> list:
+        """The ``limit`` most looked-up keys over the last day."""
+        since = int(time.time() // 3600) - REQUEST_LOG_BUCKETS
+        with self._lock:
+            counts = sum((c for hour, c in self._requests if hour > since), Counter())
+        return [key for key, _ in counts.most_common(limit)]
+
+
+class _Call:
+    """A query in flight and the result its waiters will share."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its result."""
+
+    def __init__(self):
+        self._calls: dict[Any, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn: Callable[[], Any]) -> Any:
+        """Call ``fn``, or wait for the in-flight call with the same ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def reset(self):
+        with self._lock:
+            self.executions = 0
+            self.coalesced = 0
+
+
+def query_key(*parts) -> tuple:
+    """
+    Normalize query arguments into a hashable key.
+
+    Enums become their values and lists become sorted tuples, since filter
+    and projection lists are sets as far as the result is concerned. Tuples
+    keep their order, for arguments such as a [start, end] date range.
+    """
+    key = []
+    for part in parts:
+        if isinstance(part, list):
+            key.append(tuple(sorted({getattr(p, "value", p) for p in part})))
+        elif isinstance(part, tuple):
+            key.append(tuple(getattr(p, "value", p) for p in part))
+        else:
+            key.append(getattr(part, "value", part))
+    return tuple(key)
+
+
+def cache_stats() -> dict:
+    """Cache hit ratio and how many database calls coalescing saved."""
+    lookups = query_cache.hits + query_cache.misses
+    return {
+        "query_cache_hits": query_cache.hits,
+        "query_cache_misses": query_cache.misses,
+        "query_cache_hit_ratio": query_cache.hits / lookups if lookups else None,
+        "single_flight_executions": single_flight.executions,
+        "single_flight_coalesced": single_flight.coalesced,
+    }
+
+
+query_cache = QueryCache()
+single_flight = SingleFlight()
@@ -1,6 +1,13 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.pool import InstrumentedQueuePool
+from app.replicas import Replica, ReplicaSet
 
 Base = declarative_base()
 
@@ -12,6 +19,62 @@ class Settings(BaseSettings):
     postgres_password: str = "postgres"
     postgres_db: str = "wartrack"
     database_url: str | None = None
+    # Create missing tables on startup; turn off when migrations manage the schema
+    db_create_all: bool = True
+
+    # Connection pool
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_pool_use_lifo: bool = False
+    # Set when connecting through PgBouncer/pgcat in transaction pooling mode
+    db_external_pooler: bool = False
+
+    # "changes" stores an equipment row only when its counts changed (app.equipment_storage)
+    equipment_storage: Literal["dense", "changes"] = "dense"
+
+    # Serve equipment queries from an in-memory NumPy snapshot (needs numpy)
+    equipment_snapshot: bool = False
+    equipment_snapshot_max_age: int = 900
+
+    # Query result cache, cleared by imports. Stats results are only cached for
+    # the warmed keys; "all" caches every one, at the cost of memory and of
+    # QUERY_CACHE_TTL staleness in workers that did not run the import
+    query_cache_size: int = 256
+    query_cache_ttl: int = 900
+    query_cache_results: Literal["warmed", "all"] = "warmed"
+
+    # Caches warmed in the background after each import
+    cache_warm_queries: list[
+        Literal["equipment_totals", "equipment_series", "catalogs", "system_totals"]
+    ] = ["equipment_totals", "equipment_series", "catalogs", "system_totals"]
+    cache_warm_hot_keys: int = 20
+    cache_warm_concurrency: int = 4
+
+    # Read replicas for read-only endpoints
+    read_database_url: str | None = None
+    read_database_urls: list[str] = []
+    replica_max_lag: float = 30.0
+    replica_check_interval: float = 10.0
+    read_your_writes_seconds: float = 60.0
+
+    # Prometheus /metrics and instrumentation (needs prometheus_client)
+    metrics_enabled: bool = True
+
+    # Slow-query log; EXPLAIN (ANALYZE, BUFFERS) re-runs sampled slow SELECTs on
+    # PostgreSQL, which adds load while the database is slow, so it is opt-in
+    slow_query_log: bool = True
+    slow_query_threshold_ms: float = 500.0
+    slow_query_explain_sample_rate: float = 0.0
+
+    # /debug endpoints expose query parameters and have no authentication
+    debug_endpoints: bool = False
+
+    # Response compression
+    compression_minimum_size: int = 1024
+    compression_cache_size: int = 128
 
     class Config:
         env_file = ".env"
@@ -26,10 +89,51 @@ class Settings(BaseSettings):
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
 
+    @property
+    def read_urls(self) -> list[str]:
+        urls = [self.read_database_url] if self.read_database_url else []
+        return list(dict.fromkeys(urls + self.read_database_urls))
+
+
+def engine_options(settings: Settings, url: str | None = None) -> dict:
+    """Build create_engine() keyword arguments from the pool settings."""
+    url = make_url(url or settings.db_url)
+
+    if url.get_backend_name() == "sqlite":
+        # SQLite picks its own pool class; QueuePool sizing does not apply
+        return {}
+
+    if settings.db_external_pooler:
+        # The external pooler owns the connections. Server-side prepared
+        # statements are bound to a backend and break under transaction pooling.
+        connect_args = {}
+        if url.get_driver_name() == "psycopg":
+            connect_args["prepare_threshold"] = None
+        elif url.get_driver_name() == "asyncpg":
+            connect_args["statement_cache_size"] = 0
+        return {"poolclass": NullPool, "connect_args": connect_args}
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_use_lifo": settings.db_pool_use_lifo,
+    }
+
 
 settings = Settings()
-engine = create_engine(settings.db_url, pool_pre_ping=True)
+engine = create_engine(settings.db_url, **engine_options(settings))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+read_replicas = ReplicaSet(
+    SessionLocal,
+    [Replica(url, **engine_options(settings, url)) for url in settings.read_urls],
+    max_lag=settings.replica_max_lag,
+    check_interval=settings.replica_check_interval,
+    write_window=settings.read_your_writes_seconds,
+)
 
 
 def get_db():
@@ -38,3 +142,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Session for read-only endpoints: a healthy replica, or the primary."""
+    db = read_replicas.session()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -40,3 +40,63 @@ class Status(str, Enum):
     DAMAGED = "damaged"
     DESTROYED = "destroyed"
     CAPTURED = "captured"
+
+
+class EquipmentField(str, Enum):
+    ID = "id"
+    COUNTRY = "country"
+    TYPE = "type"
+    DESTROYED = "destroyed"
+    ABANDONED = "abandoned"
+    CAPTURED = "captured"
+    DAMAGED = "damaged"
+    TOTAL = "total"
+    DATE = "date"
+
+
+class SystemField(str, Enum):
+    ID = "id"
+    COUNTRY = "country"
+    ORIGIN = "origin"
+    SYSTEM = "system"
+    STATUS = "status"
+    URL = "url"
+    DATE = "date"
+
+
+class Bucket(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class AggregateFunction(str, Enum):
+    SUM = "sum"
+    AVG = "avg"
+    MIN = "min"
+    MAX = "max"
+
+
+class EquipmentDimension(str, Enum):
+    COUNTRY = "country"
+    TYPE = "type"
+
+
+class SystemDimension(str, Enum):
+    COUNTRY = "country"
+    ORIGIN = "origin"
+    SYSTEM = "system"
+    STATUS = "status"
+
+
+class ExportTable(str, Enum):
+    EQUIPMENT = "equipment"
+    ALL_EQUIPMENT = "all_equipment"
+    SYSTEM = "system"
+    ALL_SYSTEM = "all_system"
+
+
+class ExportFormat(str, Enum):
+    ARROW = "arrow"
+    PARQUET = "parquet"
+    CSV = "csv"
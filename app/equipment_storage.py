@@ -0,0 +1,275 @@
+"""
+Change-only storage of the equipment table.
+
+Equipment counts are cumulative daily snapshots, and most (country, type)
+series do not change from one date to the next. With
+EQUIPMENT_STORAGE=changes, imports only write a row when its counts differ
+from the series' previous stored row, and every imported date is recorded
+in ``equipment_date``. Readers go through ``equipment_source()``, which then
+rebuilds the dense daily series by carrying each stored row forward over
+the following dates, so queries return the same rows as with dense storage.
+A carried row keeps the id of the stored row it repeats. When an imported
+date no longer reports a series, ``equipment_series_end`` records that date
+and the series is not carried past it.
+
+``compact_equipment`` and ``expand_equipment`` convert an existing table
+between the two forms (scripts/compact_equipment.py).
+"""
+
+from collections import defaultdict
+from collections.abc import Iterable
+
+from sqlalchemy import and_, delete, func, insert, null, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from app.database import settings
+from app.models import Equipment, EquipmentDate, EquipmentSeriesEnd
+from app.schemas import EquipmentResponse
+
+COUNT_COLUMNS = ("destroyed", "abandoned", "captured", "damaged", "total")
+
+# Sorts after every YYYY-MM-DD date: the last row of a series without an end
+OPEN_END = "9999-12-31"
+
+
+def change_storage() -> bool:
+    """Whether equipment rows are stored only when their counts change."""
+    return settings.equipment_storage == "changes"
+
+
+def _dense_select(carried_only: bool = False):
+    """
+    Each stored row repeated on every calendar date up to the next stored row
+    or end of its series (all remaining dates when neither follows). With
+    ``carried_only``, the dates of the stored rows themselves are left out.
+    """
+    # Ends are rows without an id, so the next event of a series bounds it
+    events = union_all(
+        select(
+            Equipment.id,
+            Equipment.country,
+            Equipment.type,
+            *[getattr(Equipment, c) for c in COUNT_COLUMNS],
+            Equipment.date,
+        ),
+        select(
+            null(),
+            EquipmentSeriesEnd.country,
+            EquipmentSeriesEnd.type,
+            *[null() for _ in COUNT_COLUMNS],
+            EquipmentSeriesEnd.date,
+        ),
+    ).subquery("events")
+    next_date = func.lead(events.c.date).over(
+        partition_by=(events.c.country, events.c.type), order_by=events.c.date
+    )
+    stored = select(*events.c, func.coalesce(next_date, OPEN_END).label("next_date")).subquery(
+        "stored"
+    )
+    first_date = (
+        EquipmentDate.date > stored.c.date if carried_only else EquipmentDate.date >= stored.c.date
+    )
+    return (
+        select(
+            stored.c.id,
+            stored.c.country,
+            stored.c.type,
+            *[stored.c[c] for c in COUNT_COLUMNS],
+            EquipmentDate.date,
+        )
+        .select_from(stored)
+        .join(EquipmentDate, and_(first_date, EquipmentDate.date < stored.c.next_date))
+        .where(stored.c.id.is_not(None))
+    )
+
+
+dense_equipment = _dense_select().subquery("equipment_dense")
+
+
+def equipment_source():
+    """
+    What equipment queries should read: the ``Equipment`` model, or the
+    columns of the rebuilt dense series under change-only storage. Both
+    expose ``id``, ``country``, ``type``, the counts and ``date`` as attributes.
+    """
+    return dense_equipment.c if change_storage() else Equipment
+
+
+def stored_dates(db: Session) -> set[str]:
+    """Dates already imported."""
+    column = EquipmentDate.date if change_storage() else Equipment.date
+    return {date for (date,) in db.query(column).distinct()}
+
+
+def record_dates(db: Session, dates: Iterable[str]):
+    """Add imported dates to the calendar. The caller commits."""
+    known = {date for (date,) in db.query(EquipmentDate.date)}
+    for date in sorted(set(dates) - known):
+        if date:
+            db.add(EquipmentDate(date=date))
+
+
+def _record_ends(db: Session, ends: Iterable[tuple[str, str, str]]):
+    """Add (country, type, date) series ends not stored yet. The caller commits."""
+    columns = (EquipmentSeriesEnd.country, EquipmentSeriesEnd.type, EquipmentSeriesEnd.date)
+    known = {tuple(end) for end in db.query(*columns)}
+    for country, type_, date in sorted({tuple(end) for end in ends} - known):
+        db.add(EquipmentSeriesEnd(country=country, type=type_, date=date))
+
+
+def _latest_counts(db: Session, before: str) -> dict[tuple[str, str], tuple]:
+    """
+    Counts of the last stored row before ``before`` for each (country, type)
+    series that has not ended since.
+    """
+    latest = (
+        db.query(Equipment.country, Equipment.type, func.max(Equipment.date).label("date"))
+        .filter(Equipment.date < before)
+        .group_by(Equipment.country, Equipment.type)
+        .subquery()
+    )
+    rows = db.query(
+        Equipment.country,
+        Equipment.type,
+        Equipment.date,
+        *[getattr(Equipment, c) for c in COUNT_COLUMNS],
+    ).join(
+        latest,
+        and_(
+            Equipment.country == latest.c.country,
+            Equipment.type == latest.c.type,
+            Equipment.date == latest.c.date,
+        ),
+    )
+    last_ends = (
+        db.query(
+            EquipmentSeriesEnd.country, EquipmentSeriesEnd.type, func.max(EquipmentSeriesEnd.date)
+        )
+        .filter(EquipmentSeriesEnd.date < before)
+        .group_by(EquipmentSeriesEnd.country, EquipmentSeriesEnd.type)
+    )
+    ends = {(country, type_): date for country, type_, date in last_ends}
+    return {
+        (country, type_): tuple(counts)
+        for country, type_, date, *counts in rows
+        if ends.get((country, type_), "") < date
+    }
+
+
+def record_series_ends(db: Session, rows: list[dict]):
+    """
+    Record the end of every series that was reported on the previous imported
+    date but is missing from a date of ``rows``. Call before ``changed_rows``;
+    the caller commits. Rows are dicts with the Equipment column names.
+    """
+    reported = defaultdict(set)
+    for row in rows:
+        if row["date"]:
+            reported[row["date"]].add((row["country"], row["type"]))
+    if not reported:
+        return
+    dates = sorted(reported)
+    live = set(_latest_counts(db, dates[0]))
+    ends = []
+    for date in dates:
+        ends.extend((country, type_, date) for country, type_ in live - reported[date])
+        live = reported[date]
+    _record_ends(db, ends)
+
+
+def changed_rows(db: Session, rows: list[dict]) -> list[dict]:
+    """
+    The equipment rows whose counts differ from the previous date of their
+    series, taking earlier rows of ``rows`` into account. Rows are dicts with
+    the Equipment column names.
+    """
+    rows = sorted(rows, key=lambda r: r["date"])
+    if not rows:
+        return []
+    latest = _latest_counts(db, rows[0]["date"])
+    changed = []
+    for row in rows:
+        key = (row["country"], row["type"])
+        counts = tuple(row[c] for c in COUNT_COLUMNS)
+        if latest.get(key) != counts:
+            latest[key] = counts
+            changed.append(row)
+    return changed
+
+
+def sparse_rows(rows: list[EquipmentResponse]) -> list[EquipmentResponse]:
+    """
+    Keep the first row of each series and the rows whose counts changed from
+    the previous one, ordered by country, type and date.
+    """
+    rows = sorted(rows, key=lambda r: (r.country, r.type, r.date))
+    sparse, previous = [], None
+    for row in rows:
+        key = (row.country, row.type, *[getattr(row, c) for c in COUNT_COLUMNS])
+        if key != previous:
+            sparse.append(row)
+        previous = key
+    return sparse
+
+
+def compact_equipment(db: Session) -> int:
+    """
+    Record every stored date in the calendar and the end of every series that
+    misses a date, then delete the rows that repeat the row of their series
+    on the previous date. Returns the number of deleted rows; the caller
+    commits.
+    """
+    record_dates(db, (date for (date,) in db.query(Equipment.date).distinct()))
+    db.flush()
+    counts = [getattr(Equipment, c) for c in COUNT_COLUMNS]
+    series = {"partition_by": (Equipment.country, Equipment.type), "order_by": Equipment.date}
+    following = (
+        select(func.min(EquipmentDate.date))
+        .where(EquipmentDate.date > Equipment.date)
+        .scalar_subquery()
+    )
+    preceding = (
+        select(func.max(EquipmentDate.date))
+        .where(EquipmentDate.date < Equipment.date)
+        .scalar_subquery()
+    )
+    compared = select(
+        Equipment.id,
+        Equipment.country,
+        Equipment.type,
+        following.label("following"),
+        func.lead(Equipment.date).over(**series).label("next_date"),
+        (func.lag(Equipment.date).over(**series) == preceding).label("consecutive"),
+        *[
+            (column == func.lag(column).over(**series)).label(f"same_{column.key}")
+            for column in counts
+        ],
+    ).subquery()
+    # A series ends on the first calendar date after a row that has no row
+    ends = select(compared.c.country, compared.c.type, compared.c.following).where(
+        compared.c.following.is_not(None),
+        or_(compared.c.next_date.is_(None), compared.c.following < compared.c.next_date),
+    )
+    _record_ends(db, db.execute(ends))
+    repeated = select(compared.c.id).where(
+        compared.c.consecutive, *[compared.c[f"same_{column.key}"] for column in counts]
+    )
+    ids = [id_ for (id_,) in db.execute(repeated)]
+    for i in range(0, len(ids), 500):
+        db.execute(delete(Equipment).where(Equipment.id.in_(ids[i : i + 500])))
+    return len(ids)
+
+
+def expand_equipment(db: Session) -> int:
+    """
+    Write the carried-forward rows back, turning change-only storage into
+    dense storage, and drop the series ends it no longer needs. Returns the
+    number of inserted rows; the caller commits.
+    """
+    carried = _dense_select(carried_only=True).subquery()
+    columns = ["country", "type", *COUNT_COLUMNS, "date"]
+    result = db.execute(
+        insert(Equipment).from_select(columns, select(*[carried.c[c] for c in columns]))
+    )
+    db.execute(delete(EquipmentSeriesEnd))
+    return result.rowcount
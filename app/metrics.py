@@ -0,0 +1,247 @@
+"""
+Prometheus metrics.
+
+``MetricsMiddleware`` records latency and response size per route template,
+SQLAlchemy cursor events time every query on every engine, and imports
+report their duration and rows per second. Pool and cache counters already
+kept by app.pool and app.cache are copied into Prometheus metrics when
+/metrics is scraped, and at most once per second after a request, so the
+hot paths only pay for a histogram observation.
+
+prometheus_client is optional (``pip install war-assets-tracker[metrics]``).
+With several worker processes, point PROMETHEUS_MULTIPROC_DIR at an empty
+directory shared by the workers: /metrics then aggregates all of them with
+prometheus_client's multiprocess mode.
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.cache import query_cache, single_flight
+from app.database import engine, settings
+from app.pool import pool_status
+
+try:
+    import prometheus_client
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+except ImportError:  # pragma: no cover - optional dependency
+    prometheus_client = None
+
+# Seconds between copies of the pool and cache counters outside of scrapes
+REFRESH_INTERVAL = 1.0
+
+STATEMENT_KINDS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "CREATE", "DROP", "ALTER"}
+
+if prometheus_client is not None:
+    REQUESTS = Counter("wat_http_requests_total", "HTTP requests", ["method", "route", "status"])
+    REQUEST_DURATION = Histogram(
+        "wat_http_request_duration_seconds",
+        "Time to produce the full HTTP response",
+        ["method", "route"],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    )
+    RESPONSE_SIZE = Histogram(
+        "wat_http_response_size_bytes",
+        "Response body size as sent, after compression",
+        ["method", "route"],
+        buckets=tuple(256 * 4**i for i in range(10)),
+    )
+    DB_QUERY_DURATION = Histogram(
+        "wat_db_query_duration_seconds",
+        "Database statement execution time",
+        ["statement"],
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+    )
+    POOL_CONNECTIONS = Gauge(
+        "wat_db_pool_connections",
+        "Primary pool connections by state",
+        ["state"],
+        multiprocess_mode="livesum",
+    )
+    POOL_CHECKOUTS = Counter("wat_db_pool_checkouts_total", "Pool connection checkouts")
+    POOL_OVERFLOW_EVENTS = Counter(
+        "wat_db_pool_overflow_events_total", "Overflow connections opened by the pool"
+    )
+    POOL_TIMEOUTS = Counter("wat_db_pool_timeouts_total", "Pool checkouts that timed out")
+    POOL_WAIT = Counter("wat_db_pool_wait_seconds_total", "Time spent waiting for a connection")
+    CACHE_HITS = Counter("wat_query_cache_hits_total", "Query cache hits")
+    CACHE_MISSES = Counter("wat_query_cache_misses_total", "Query cache misses")
+    CACHE_HIT_RATIO = Gauge(
+        "wat_query_cache_hit_ratio",
+        "Query cache hits over lookups since the process started",
+        multiprocess_mode="liveall",
+    )
+    SINGLE_FLIGHT_COALESCED = Counter(
+        "wat_single_flight_coalesced_total", "Database calls saved by request coalescing"
+    )
+    IMPORT_DURATION = Histogram(
+        "wat_import_duration_seconds",
+        "Import duration",
+        ["dataset"],
+        buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+    )
+    IMPORT_ROWS = Counter("wat_import_rows_total", "Rows written by imports", ["dataset"])
+    IMPORT_ROWS_PER_SECOND = Gauge(
+        "wat_import_rows_per_second",
+        "Throughput of the last import",
+        ["dataset"],
+        multiprocess_mode="mostrecent",
+    )
+
+
+def metrics_enabled() -> bool:
+    return settings.metrics_enabled and prometheus_client is not None
+
+
+def require_prometheus():
+    """Raise RuntimeError when metrics are disabled or prometheus_client is missing."""
+    if prometheus_client is None:
+        raise RuntimeError("prometheus_client is not installed; install the 'metrics' extra")
+    if not settings.metrics_enabled:
+        raise RuntimeError("Metrics are disabled (METRICS_ENABLED=false)")
+
+
+_refresh_lock = threading.Lock()
+_last_refresh = 0.0
+_last_counts: dict[str, float] = {}
+
+
+def _sync_counter(counter, name: str, value: float):
+    """Advance ``counter`` by how much the in-process total ``value`` grew."""
+    delta = value - _last_counts.get(name, 0)
+    _last_counts[name] = value
+    # A reset of the source counter just starts a new baseline
+    if delta > 0:
+        counter.inc(delta)
+
+
+def refresh_process_metrics(force: bool = False):
+    """Copy the pool and cache counters into their Prometheus metrics."""
+    global _last_refresh
+
+    if not metrics_enabled():
+        return
+    now = time.monotonic()
+    if not force and now - _last_refresh < REFRESH_INTERVAL:
+        return
+    with _refresh_lock:
+        _last_refresh = now
+        status = pool_status(engine)
+        for state in ("in_use", "checked_in", "overflow"):
+            if state in status:
+                POOL_CONNECTIONS.labels(state).set(status[state])
+        for counter, name in [
+            (POOL_CHECKOUTS, "checkouts"),
+            (POOL_OVERFLOW_EVENTS, "overflow_events"),
+            (POOL_TIMEOUTS, "timeouts"),
+            (POOL_WAIT, "wait_seconds_total"),
+        ]:
+            if name in status:
+                _sync_counter(counter, name, status[name])
+
+        hits, misses = query_cache.hits, query_cache.misses
+        _sync_counter(CACHE_HITS, "cache_hits", hits)
+        _sync_counter(CACHE_MISSES, "cache_misses", misses)
+        if hits + misses:
+            CACHE_HIT_RATIO.set(hits / (hits + misses))
+        _sync_counter(SINGLE_FLIGHT_COALESCED, "single_flight_coalesced", single_flight.coalesced)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """The exposition text of every metric, and its content type."""
+    require_prometheus()
+    refresh_process_metrics(force=True)
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def record_import(dataset: str, rows: int, seconds: float):
+    """Record a finished import of ``rows`` rows of ``dataset``."""
+    if not metrics_enabled():
+        return
+    IMPORT_DURATION.labels(dataset).observe(seconds)
+    IMPORT_ROWS.labels(dataset).inc(rows)
+    if seconds > 0:
+        IMPORT_ROWS_PER_SECOND.labels(dataset).set(rows / seconds)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    words = statement[:64].split(None, 1)
+    kind = words[0].upper() if words else ""
+    DB_QUERY_DURATION.labels(kind if kind in STATEMENT_KINDS else "OTHER").observe(
+        time.perf_counter() - start
+    )
+
+
+def install_query_metrics():
+    """Time the statements of every engine. Safe to call more than once."""
+    if not metrics_enabled() or event.contains(
+        Engine, "before_cursor_execute", _before_cursor_execute
+    ):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts, latency and response size,
+    labelled with the route template (``/api/stats/equipments/{country}``)
+    so that path parameters do not multiply the series.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message: Message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            REQUESTS.labels(method, route, str(status)).inc()
+            REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - start)
+            RESPONSE_SIZE.labels(method, route).observe(size)
+            refresh_process_metrics()
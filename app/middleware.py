@@ -0,0 +1,192 @@
+"""
+HTTP response compression.
+
+Negotiates zstd, brotli or gzip from ``Accept-Encoding``. zstd and brotli are
+optional (``pip install war-assets-tracker[compression]``); gzip is always
+available. Compressed bodies are kept in a small LRU keyed by a digest of the
+uncompressed body, so repeated identical payloads (the same stats query hit by
+many clients between imports) are compressed only once.
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "text/", "application/xml")
+
+# Bodies above this size are compressed in a worker thread
+THREAD_THRESHOLD = 256 * 1024
+
+
+def _compressors(gzip_level: int, brotli_quality: int, zstd_level: int) -> dict:
+    """Available encodings in server preference order."""
+    compressors = {}
+    if zstandard is not None:
+        compressors["zstd"] = lambda body: zstandard.ZstdCompressor(level=zstd_level).compress(body)
+    if brotli is not None:
+        compressors["br"] = lambda body: brotli.compress(body, quality=brotli_quality)
+    compressors["gzip"] = lambda body: gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    return compressors
+
+
+def negotiate_encoding(accept_encoding: str, available: list[str]) -> str | None:
+    """
+    Pick the content coding to use for an Accept-Encoding header.
+
+    The highest q-value wins. Ties go to the earlier entry in ``available``.
+    Returns None when identity should be used.
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in available:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressedBodyCache:
+    """Thread-safe LRU of compressed bodies keyed by (encoding, body digest)."""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(encoding: str, body: bytes) -> tuple[str, bytes]:
+        return encoding, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key: tuple[str, bytes]) -> bytes | None:
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return compressed
+
+    def set(self, key: tuple[str, bytes], compressed: bytes):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = compressed
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class CompressionMiddleware:
+    """Compress complete responses with the best encoding the client accepts."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        cache_size: int = 128,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compressors = _compressors(gzip_level, brotli_quality, zstd_level)
+        self.cache = CompressedBodyCache(cache_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        encoding = negotiate_encoding(accept_encoding, list(self.compressors))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                if start_message is not None:
+                    await send(start_message)
+                    start_message = None
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_CONTENT_TYPES)
+            ):
+                # Streaming, already encoded or binary responses go out untouched
+                passthrough = True
+                await send_compressed(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if len(body) >= self.minimum_size:
+                message["body"] = await self.compress(encoding, body)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(message["body"]))
+
+            await send(start_message)
+            start_message = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    async def compress(self, encoding: str, body: bytes) -> bytes:
+        """Compress ``body``, reusing a cached result for identical payloads."""
+        key = self.cache.key(encoding, body)
+        compressed = self.cache.get(key)
+        if compressed is not None:
+            return compressed
+
+        compressor = self.compressors[encoding]
+        if len(body) > THREAD_THRESHOLD:
+            compressed = await anyio.to_thread.run_sync(compressor, body)
+        else:
+            compressed = compressor(body)
+        self.cache.set(key, compressed)
+        return compressed
@@ -21,6 +21,27 @@ class Equipment(Base):
     )
 
 
+class EquipmentDate(Base):
+    """Dates covered by equipment imports, the calendar of change-only storage."""
+
+    __tablename__ = "equipment_date"
+
+    date = Column(String, primary_key=True)
+
+
+class EquipmentSeriesEnd(Base):
+    """
+    First imported date on which a (country, type) series was no longer
+    reported. Change-only storage stops carrying the series forward there.
+    """
+
+    __tablename__ = "equipment_series_end"
+
+    country = Column(String, primary_key=True)
+    type = Column(String, primary_key=True)
+    date = Column(String, primary_key=True)
+
+
 class AllEquipment(Base):
     __tablename__ = "all_equipment"
 
@@ -67,3 +88,45 @@ class AllSystem(Base):
     total = Column(Integer, nullable=False)
 
     __table_args__ = (UniqueConstraint("country", "system", name="uq_all_system_country_system"),)
+
+
+class EquipmentDailyTotal(Base):
+    """Rollup of equipment counts across all types per country and date."""
+
+    __tablename__ = "equipment_daily_total"
+
+    id = Column(Integer, primary_key=True, index=True)
+    country = Column(String, nullable=False)
+    date = Column(String, nullable=False)
+    destroyed = Column(Integer, nullable=False)
+    abandoned = Column(Integer, nullable=False)
+    captured = Column(Integer, nullable=False)
+    damaged = Column(Integer, nullable=False)
+    total = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("country", "date", name="uq_equipment_daily_total_country_date"),
+    )
+
+
+class SystemDailyStatus(Base):
+    """Rollup of system entry counts per country, system, status and date."""
+
+    __tablename__ = "system_daily_status"
+
+    id = Column(Integer, primary_key=True, index=True)
+    country = Column(String, nullable=False)
+    system = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    date = Column(String, nullable=False)
+    count = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "country",
+            "system",
+            "status",
+            "date",
+            name="uq_system_daily_status_country_system_status_date",
+        ),
+    )
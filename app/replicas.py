@@ -0,0 +1,133 @@
+"""
+Read replica routing.
+
+Read-only endpoints take their session from ``ReplicaSet.session()``, which
+round-robins over the healthy replicas. Replicas are checked in the
+background every REPLICA_CHECK_INTERVAL seconds; one that cannot be reached
+or whose replay lag exceeds REPLICA_MAX_LAG leaves the rotation until a
+later check passes. Reads go to the primary when no replica is configured
+or healthy, and for READ_YOUR_WRITES_SECONDS after an import in this process,
+so the data an import just wrote is visible right away.
+"""
+
+import itertools
+import threading
+import time
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+# Zero when the replica has replayed everything it received, else the age of
+# the last replayed transaction. NULL (not a standby) counts as no lag.
+LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    """One read replica with its engine and last health check result."""
+
+    def __init__(self, url: str, **engine_kwargs):
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.engine = create_engine(url, **engine_kwargs)
+        self.sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.healthy = True
+        self.lag: float | None = None
+        self.error: str | None = None
+        event.listen(self.engine, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        # A dropped connection takes the replica out until the next check
+        if context.is_disconnect:
+            self.healthy = False
+            self.error = str(context.original_exception)
+
+    def check(self, max_lag: float):
+        """Measure replay lag and update ``healthy``."""
+        try:
+            with self.engine.connect() as conn:
+                if self.engine.dialect.name == "postgresql":
+                    lag = conn.execute(LAG_QUERY).scalar()
+                else:
+                    conn.execute(text("SELECT 1"))
+                    lag = 0
+            self.lag = float(lag or 0)
+            self.error = None
+            self.healthy = self.lag <= max_lag
+        except Exception as e:
+            self.lag = None
+            self.error = str(e)
+            self.healthy = False
+
+
+class ReplicaSet:
+    """Route read sessions to healthy replicas, falling back to the primary."""
+
+    def __init__(
+        self,
+        primary: sessionmaker,
+        replicas: list[Replica],
+        max_lag: float = 30.0,
+        check_interval: float = 10.0,
+        write_window: float = 60.0,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.write_window = write_window
+        self.last_write = float("-inf")
+        self.last_check = float("-inf")
+        self._checking = threading.Lock()
+        self._counter = itertools.count()
+
+    def session(self) -> Session:
+        """A session on the next healthy replica, or on the primary."""
+        if not self.replicas:
+            return self.primary()
+        self._schedule_check()
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy or time.monotonic() - self.last_write < self.write_window:
+            return self.primary()
+        return healthy[next(self._counter) % len(healthy)].sessionmaker()
+
+    def reading_from_primary(self) -> bool:
+        return time.monotonic() - self.last_write < self.write_window or not any(
+            r.healthy for r in self.replicas
+        )
+
+    def mark_write(self):
+        """Send reads to the primary for the next ``write_window`` seconds."""
+        self.last_write = time.monotonic()
+
+    def check(self):
+        """Check every replica now."""
+        for replica in self.replicas:
+            replica.check(self.max_lag)
+        self.last_check = time.monotonic()
+
+    def _schedule_check(self):
+        if time.monotonic() - self.last_check < self.check_interval:
+            return
+        if not self._checking.acquire(blocking=False):
+            return
+        self.last_check = time.monotonic()
+
+        def run():
+            try:
+                self.check()
+            finally:
+                self._checking.release()
+
+        threading.Thread(target=run, name="replica-check", daemon=True).start()
+
+    def status(self) -> dict:
+        return {
+            "reading_from_primary": not self.replicas or self.reading_from_primary(),
+            "replicas": [
+                {"url": r.name, "healthy": r.healthy, "lag_seconds": r.lag, "error": r.error}
+                for r in self.replicas
+            ],
+        }
@@ -0,0 +1,178 @@
+"""
+Rollup tables for the hot aggregates.
+
+``equipment_daily_total`` holds the sum over all equipment types per country
+and date, ``system_daily_status`` the number of system entries per country,
+system, status and date. Both are derived from the fact tables and refreshed
+for the imported dates at the end of each import.
+
+``all_system`` totals are derived the same way: each entry (url) is counted
+once per country and system, by the status of its latest row, since every
+scrape date repeats the entries seen so far. They are refreshed for the
+(country, system) keys an import wrote; ``check_all_system`` compares the
+table against a full recount.
+"""
+
+from collections.abc import Iterable
+
+from sqlalchemy import case, delete, func, insert, tuple_
+from sqlalchemy.orm import Session
+
+from app.enums import EquipmentType, Status
+from app.equipment_storage import equipment_source
+from app.models import AllSystem, EquipmentDailyTotal, System, SystemDailyStatus
+
+# Keep IN (...) lists well below driver parameter limits
+DATE_CHUNK_SIZE = 500
+
+ALL_SYSTEM_COUNTS = ["destroyed", "abandoned", "captured", "damaged", "total"]
+
+
+def _date_chunks(dates: Iterable | None):
+    """Yield lists of dates (or other keys) to refresh, or a single None for a full rebuild."""
+    if dates is None:
+        yield None
+        return
+    dates = sorted(set(dates))
+    for i in range(0, len(dates), DATE_CHUNK_SIZE):
+        yield dates[i : i + DATE_CHUNK_SIZE]
+
+
+def refresh_equipment_daily_totals(db: Session, dates: Iterable[str] | None = None):
+    """
+    Recompute equipment_daily_total for the given dates (all dates when None).
+
+    Rows of the synthetic "All Types" type are skipped so they are not counted twice.
+    The caller commits.
+    """
+    source = equipment_source()
+    for chunk in _date_chunks(dates):
+        delete_stmt = delete(EquipmentDailyTotal)
+        select_query = (
+            db.query(
+                source.country,
+                source.date,
+                func.sum(source.destroyed),
+                func.sum(source.abandoned),
+                func.sum(source.captured),
+                func.sum(source.damaged),
+                func.sum(source.total),
+            )
+            .filter(source.type != EquipmentType.ALL_TYPES.value)
+            .group_by(source.country, source.date)
+        )
+        if chunk is not None:
+            delete_stmt = delete_stmt.where(EquipmentDailyTotal.date.in_(chunk))
+            select_query = select_query.filter(source.date.in_(chunk))
+
+        db.execute(delete_stmt)
+        db.execute(
+            insert(EquipmentDailyTotal).from_select(
+                ["country", "date", "destroyed", "abandoned", "captured", "damaged", "total"],
+                select_query.statement,
+            )
+        )
+
+
+def refresh_system_daily_status(db: Session, dates: Iterable[str] | None = None):
+    """Recompute system_daily_status for the given dates (all dates when None). The caller commits."""
+    for chunk in _date_chunks(dates):
+        delete_stmt = delete(SystemDailyStatus)
+        select_query = db.query(
+            System.country,
+            System.system,
+            System.status,
+            System.date,
+            func.count(),
+        ).group_by(System.country, System.system, System.status, System.date)
+        if chunk is not None:
+            delete_stmt = delete_stmt.where(SystemDailyStatus.date.in_(chunk))
+            select_query = select_query.filter(System.date.in_(chunk))
+
+        db.execute(delete_stmt)
+        db.execute(
+            insert(SystemDailyStatus).from_select(
+                ["country", "system", "status", "date", "count"],
+                select_query.statement,
+            )
+        )
+
+
+def _system_totals_query(db: Session, keys: list[tuple[str, str]] | None = None):
+    """
+    Entries per country and system, counted by status, with ``total`` counting all of them.
+
+    Each (country, system, url) entry is counted once, with the status of its
+    latest date. ``keys`` limits the count to those (country, system) keys.
+    """
+    ranked = db.query(
+        System.country,
+        System.system,
+        System.status,
+        func.row_number()
+        .over(partition_by=(System.country, System.system, System.url), order_by=System.date.desc())
+        .label("rank"),
+    )
+    if keys is not None:
+        ranked = ranked.filter(tuple_(System.country, System.system).in_(keys))
+    latest = ranked.subquery()
+
+    return (
+        db.query(
+            latest.c.country,
+            latest.c.system,
+            *[
+                func.sum(case((latest.c.status == status.value, 1), else_=0))
+                for status in (Status.DESTROYED, Status.ABANDONED, Status.CAPTURED, Status.DAMAGED)
+            ],
+            func.count(),
+        )
+        .filter(latest.c.rank == 1)
+        .group_by(latest.c.country, latest.c.system)
+    )
+
+
+def refresh_all_system(db: Session, keys: Iterable[tuple[str, str]] | None = None):
+    """
+    Recompute all_system for the given (country, system) keys (all keys when None).
+
+    Keys that no longer have entries are removed. The caller commits.
+    """
+    for chunk in _date_chunks(keys):
+        delete_stmt = delete(AllSystem)
+        if chunk is not None:
+            delete_stmt = delete_stmt.where(tuple_(AllSystem.country, AllSystem.system).in_(chunk))
+
+        db.execute(delete_stmt)
+        db.execute(
+            insert(AllSystem).from_select(
+                ["country", "system", *ALL_SYSTEM_COUNTS], _system_totals_query(db, chunk).statement
+            )
+        )
+
+
+def check_all_system(db: Session) -> list[dict]:
+    """
+    Compare all_system against a recount of the system entries.
+
+    Returns one item per mismatching (country, system) key with the ``stored``
+    and ``expected`` counts; either is None when the key is missing on that side.
+    """
+    expected = {
+        (country, system): dict(zip(ALL_SYSTEM_COUNTS, counts, strict=True))
+        for country, system, *counts in _system_totals_query(db)
+    }
+    stored = {
+        (row.country, row.system): {field: getattr(row, field) for field in ALL_SYSTEM_COUNTS}
+        for row in db.query(AllSystem)
+    }
+    return [
+        {
+            "country": country,
+            "system": system,
+            "stored": stored.get((country, system)),
+            "expected": expected.get((country, system)),
+        }
+        for country, system in sorted(expected.keys() | stored.keys())
+        if stored.get((country, system)) != expected.get((country, system))
+    ]
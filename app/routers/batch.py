@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.database import get_read_db
+from app.schemas import BatchRequest, BatchResult
+from app.services.batch_service import BatchService
+
+router = APIRouter(prefix="/api/stats", tags=["Batch"])
+
+
+@router.post(
+    "/batch",
+    response_model=dict[str, BatchResult],
+    response_model_exclude_unset=True,
+    summary="Run several equipment and system queries at once",
+)
+def run_batch(request: BatchRequest, db: Session = Depends(get_read_db)):
+    """Run equipment and system sub-queries in one round trip, keyed by sub-query id."""
+    service = BatchService(db)
+    try:
+        return service.run(request.queries)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Path
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_read_db
 from app.enums import Countries
 from app.schemas import (
     AllEquipmentResponse,
+    EquipmentDeltaResponse,
+    EquipmentDeltasRequest,
     EquipmentResponse,
+    EquipmentsAggregateRequest,
     EquipmentsRequest,
     TotalEquipmentsRequest,
 )
@@ -17,14 +20,15 @@ router = APIRouter(prefix="/api/stats", tags=["Equipments"])
 @router.post(
     "/equipments/{country}",
     response_model=list[EquipmentResponse],
+    response_model_exclude_unset=True,
     summary="Get equipment data by country",
 )
 def get_equipments(
     country: Countries = Path(..., description="Country filter"),
     request: EquipmentsRequest = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    """Get equipment data filtered by country, types, and date range."""
+    """Get equipment data filtered by country, types, and date range, projected to `fields`."""
     if country not in Countries:
         raise HTTPException(
             status_code=400,
@@ -37,6 +41,56 @@ def get_equipments(
             country=country,
             types=request.types if request else None,
             date=request.date if request else None,
+            fields=request.fields if request else None,
+            sparse=request.sparse if request else False,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post(
+    "/equipments/{country}/deltas",
+    response_model=list[EquipmentDeltaResponse],
+    summary="Get daily equipment losses by country",
+)
+def get_equipment_deltas(
+    country: Countries = Path(..., description="Country filter"),
+    request: EquipmentDeltasRequest = None,
+    db: Session = Depends(get_read_db),
+):
+    """Get day-over-day increments per type with rolling 7- and 30-day sums."""
+    service = EquipmentsService(db)
+    try:
+        return service.get_equipment_deltas(
+            country=country,
+            types=request.types if request else None,
+            date=request.date if request else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post(
+    "/equipments/{country}/aggregate",
+    response_model=list[dict],
+    summary="Get equipment data aggregated by time bucket",
+)
+def aggregate_equipments(
+    country: Countries = Path(..., description="Country filter"),
+    request: EquipmentsAggregateRequest = None,
+    db: Session = Depends(get_read_db),
+):
+    """Get equipment counts bucketed by day, week or month and grouped by dimensions."""
+    request = request or EquipmentsAggregateRequest()
+    service = EquipmentsService(db)
+    try:
+        return service.aggregate_equipments(
+            country=country,
+            types=request.types,
+            date=request.date,
+            bucket=request.bucket,
+            group_by=request.group_by,
+            aggregates=request.aggregates,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -49,7 +103,7 @@ def get_equipments(
 )
 def get_total_equipments(
     request: TotalEquipmentsRequest = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get total equipment data with optional filters."""
     service = EquipmentsService(db)
@@ -64,7 +118,7 @@ def get_total_equipments(
     response_model=list[dict],
     summary="Get equipment types",
 )
-def get_equipment_types(db: Session = Depends(get_db)):
-    """Get distinct equipment types for Ukraine."""
+def get_equipment_types(db: Session = Depends(get_read_db)):
+    """Get equipment types with row counts, first/last seen dates and countries."""
     service = EquipmentsService(db)
     return service.get_equipment_types()
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.database import get_read_db
+from app.enums import Countries, EquipmentType, ExportFormat, ExportTable, Status
+from app.services.export_service import ExportService, require_pyarrow
+
+router = APIRouter(prefix="/api/export", tags=["Export"])
+
+MEDIA_TYPES = {
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+@router.get("/{table}", summary="Export a table as Arrow, Parquet or CSV")
+def export_table(
+    table: ExportTable = Path(..., description="Table to export"),
+    format: ExportFormat = Query(ExportFormat.ARROW, description="Output format"),
+    country: Countries = Query(Countries.ALL, description="Country filter"),
+    types: list[EquipmentType] | None = Query(None, description="Equipment types"),
+    systems: list[str] | None = Query(None, description="System names"),
+    status: list[Status] | None = Query(None, description="System statuses"),
+    date_from: str | None = Query(None, description="Start date (YYYY-MM-DD)"),
+    date_to: str | None = Query(None, description="End date (YYYY-MM-DD)"),
+    db: Session = Depends(get_read_db),
+):
+    """Stream a table with optional filters, written in record batches."""
+    if format != ExportFormat.CSV:
+        try:
+            require_pyarrow()
+        except RuntimeError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+
+    date = None
+    if date_from or date_to:
+        date = [date_from or "0000-01-01", date_to or "9999-12-31"]
+        if date[0] > date[1]:
+            raise HTTPException(
+                status_code=400,
+                detail="Start date should be before end date, please correct",
+            )
+
+    filters = {
+        "country": country,
+        "types": types,
+        "systems": systems,
+        "status": status,
+        "date": date,
+    }
+    service = ExportService(db)
+    if format == ExportFormat.CSV:
+        content = service.iter_csv(table, **filters)
+    elif format == ExportFormat.PARQUET:
+        content = service.iter_parquet(table, **filters)
+    else:
+        content = service.iter_arrow_stream(table, **filters)
+
+    return StreamingResponse(
+        content,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table.value}.{format.value}"'},
+    )
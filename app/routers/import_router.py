@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services.equipments_service import EquipmentsService
 from app.services.systems_service import SystemsService
+from app.warming import start_cache_warming
 
 router = APIRouter(prefix="/api/import", tags=["Import"])
 
@@ -16,6 +17,7 @@ def import_equipments(
     try:
         service = EquipmentsService(db)
         service.import_equipments()
+        start_cache_warming()
         return {"message": "Equipment data imported successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
@@ -29,6 +31,7 @@ def import_all_equipments(
     try:
         service = EquipmentsService(db)
         service.import_all_equipments()
+        start_cache_warming()
         return {"message": "All equipment data imported successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
@@ -42,19 +45,21 @@ def import_systems(
     try:
         service = SystemsService(db)
         service.import_systems()
+        start_cache_warming()
         return {"message": "System data imported successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
 
 
-@router.post("/all-systems", summary="Import all system totals")
+@router.post("/all-systems", summary="Rebuild all system totals")
 def import_all_systems(
     db: Session = Depends(get_db),
 ):
-    """Trigger import of all system totals from scraper."""
+    """Rebuild all system totals from the system entries (imports keep them in sync)."""
     try:
         service = SystemsService(db)
         service.import_all_systems()
+        start_cache_warming()
         return {"message": "All system data imported successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
@@ -73,8 +78,8 @@ def import_all(
         equipments_service.import_equipments(import_all=False)
         equipments_service.import_all_equipments()
         systems_service.import_systems(import_all=False)
-        systems_service.import_all_systems()
 
+        start_cache_warming()
         return {"message": "All data imported successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
@@ -93,8 +98,8 @@ def import_historical(
         equipments_service.import_equipments(import_all=True)
         equipments_service.import_all_equipments()
         systems_service.import_systems(import_all=True)
-        systems_service.import_all_systems()
 
+        start_cache_warming()
         return {"message": "All historical data imported successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
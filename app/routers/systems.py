@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_read_db
 from app.enums import Countries
 from app.schemas import (
     AllSystemResponse,
     SystemResponse,
+    SystemsAggregateRequest,
+    SystemSearchResult,
     SystemsRequest,
     TotalSystemsRequest,
 )
@@ -17,14 +19,15 @@ router = APIRouter(prefix="/api/stats", tags=["Systems"])
 @router.post(
     "/systems/{country}",
     response_model=list[SystemResponse],
+    response_model_exclude_unset=True,
     summary="Get system data by country",
 )
 def get_systems(
     country: Countries = Path(..., description="Country filter"),
     request: SystemsRequest = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    """Get system data filtered by country, systems, status, and date range."""
+    """Get system data filtered by country, systems, status, and date, projected to `fields`."""
     if country not in Countries:
         raise HTTPException(
             status_code=400,
@@ -38,6 +41,34 @@ def get_systems(
             systems=request.systems if request else None,
             status=request.status if request else None,
             date=request.date if request else None,
+            fields=request.fields if request else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post(
+    "/systems/{country}/aggregate",
+    response_model=list[dict],
+    summary="Get system data aggregated by time bucket",
+)
+def aggregate_systems(
+    country: Countries = Path(..., description="Country filter"),
+    request: SystemsAggregateRequest = None,
+    db: Session = Depends(get_read_db),
+):
+    """Get system entry counts bucketed by day, week or month and grouped by dimensions."""
+    request = request or SystemsAggregateRequest()
+    service = SystemsService(db)
+    try:
+        return service.aggregate_systems(
+            country=country,
+            systems=request.systems,
+            status=request.status,
+            date=request.date,
+            bucket=request.bucket,
+            group_by=request.group_by,
+            aggregates=request.aggregates,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -50,7 +81,7 @@ def get_systems(
 )
 def get_total_systems(
     request: TotalSystemsRequest = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get total system data with optional filters."""
     service = SystemsService(db)
@@ -65,7 +96,25 @@ def get_total_systems(
     response_model=list[dict],
     summary="Get system types",
 )
-def get_system_types(db: Session = Depends(get_db)):
-    """Get distinct system types."""
+def get_system_types(db: Session = Depends(get_read_db)):
+    """Get system types with entry counts, first/last seen dates, countries and origins."""
     service = SystemsService(db)
     return service.get_system_types()
+
+
+@router.get(
+    "/system-types/search",
+    response_model=list[SystemSearchResult],
+    summary="Search system names and origins",
+)
+def search_systems(
+    q: str = Query(..., min_length=1, max_length=100, description="Search text"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of matches"),
+    db: Session = Depends(get_read_db),
+):
+    """Autocomplete system names and origins: prefix matches first, then fuzzy matches."""
+    service = SystemsService(db)
+    try:
+        return service.search_systems(q, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
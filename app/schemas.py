@@ -1,6 +1,18 @@
-from pydantic import BaseModel, Field
+from typing import Annotated, Literal
 
-from app.enums import Countries, EquipmentType, Status
+from pydantic import BaseModel, Field, field_validator
+
+from app.enums import (
+    AggregateFunction,
+    Bucket,
+    Countries,
+    EquipmentDimension,
+    EquipmentField,
+    EquipmentType,
+    Status,
+    SystemDimension,
+    SystemField,
+)
 
 
 class EquipmentsRequest(BaseModel):
@@ -11,6 +23,15 @@ class EquipmentsRequest(BaseModel):
         max_length=2,
         description="First item is start date, second is end date (YYYY-MM-DD)",
     )
+    fields: list[EquipmentField] | None = Field(
+        None,
+        min_length=1,
+        description="Columns to return; all columns when omitted",
+    )
+    sparse: bool = Field(
+        False,
+        description="Only return the first row of each series and the rows whose counts changed",
+    )
 
 
 class TotalEquipmentsRequest(BaseModel):
@@ -27,6 +48,11 @@ class SystemsRequest(BaseModel):
         max_length=2,
         description="First item is start date, second is end date (YYYY-MM-DD)",
     )
+    fields: list[SystemField] | None = Field(
+        None,
+        min_length=1,
+        description="Columns to return; all columns when omitted",
+    )
 
 
 class TotalSystemsRequest(BaseModel):
@@ -34,16 +60,112 @@ class TotalSystemsRequest(BaseModel):
     systems: list[str] | None = None
 
 
+class EquipmentDeltasRequest(BaseModel):
+    types: list[EquipmentType] | None = None
+    date: list[str] | None = Field(
+        None,
+        min_length=2,
+        max_length=2,
+        description="First item is start date, second is end date (YYYY-MM-DD)",
+    )
+
+
+class EquipmentsAggregateRequest(BaseModel):
+    types: list[EquipmentType] | None = None
+    date: list[str] | None = Field(
+        None,
+        min_length=2,
+        max_length=2,
+        description="First item is start date, second is end date (YYYY-MM-DD)",
+    )
+    bucket: Bucket = Bucket.DAY
+    group_by: list[EquipmentDimension] = Field(
+        default_factory=list,
+        description="Dimensions kept apart; all others are summed per day",
+    )
+    aggregates: list[AggregateFunction] = Field(
+        default_factory=lambda: [AggregateFunction.MAX],
+        min_length=1,
+        description="Functions applied to the daily values within each bucket",
+    )
+
+
+class SystemsAggregateRequest(BaseModel):
+    systems: list[str] | None = None
+    status: list[Status] | None = None
+    date: list[str] | None = Field(
+        None,
+        min_length=2,
+        max_length=2,
+        description="First item is start date, second is end date (YYYY-MM-DD)",
+    )
+    bucket: Bucket = Bucket.DAY
+    group_by: list[SystemDimension] = Field(
+        default_factory=list,
+        description="Dimensions kept apart; all others are counted together per day",
+    )
+    aggregates: list[AggregateFunction] = Field(
+        default_factory=lambda: [AggregateFunction.MAX],
+        min_length=1,
+        description="Functions applied to the daily entry counts within each bucket",
+    )
+
+
+class EquipmentsBatchQuery(EquipmentsRequest):
+    id: str = Field(..., description="Key of this sub-query's results in the response")
+    kind: Literal["equipments"]
+    country: Countries = Countries.ALL
+
+
+class SystemsBatchQuery(SystemsRequest):
+    id: str = Field(..., description="Key of this sub-query's results in the response")
+    kind: Literal["systems"]
+    country: Countries = Countries.ALL
+
+
+class BatchRequest(BaseModel):
+    queries: list[
+        Annotated[EquipmentsBatchQuery | SystemsBatchQuery, Field(discriminator="kind")]
+    ] = Field(..., min_length=1, max_length=50)
+
+    @field_validator("queries")
+    @classmethod
+    def unique_ids(cls, queries):
+        ids = [q.id for q in queries]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Sub-query ids must be unique")
+        return queries
+
+
 class EquipmentResponse(BaseModel):
-    id: int
+    # Optional so that projected queries (``fields=``) can leave columns unset
+    id: int | None = None
+    country: str | None = None
+    type: str | None = None
+    destroyed: int | None = None
+    abandoned: int | None = None
+    captured: int | None = None
+    damaged: int | None = None
+    total: int | None = None
+    date: str | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class EquipmentDeltaResponse(BaseModel):
+    # Increments since the previous date; None for the first date of a series
     country: str
     type: str
-    destroyed: int
-    abandoned: int
-    captured: int
-    damaged: int
-    total: int
+    destroyed: int | None
+    abandoned: int | None
+    captured: int | None
+    damaged: int | None
+    total: int | None
     date: str
+    # Sum of the total increments over the last 7 and 30 dates, inclusive
+    total_7d: int | None
+    total_30d: int | None
 
     class Config:
         from_attributes = True
@@ -64,13 +186,14 @@ class AllEquipmentResponse(BaseModel):
 
 
 class SystemResponse(BaseModel):
-    id: int
-    country: str
-    origin: str
-    system: str
-    status: str
-    url: str
-    date: str
+    # Optional so that projected queries (``fields=``) can leave columns unset
+    id: int | None = None
+    country: str | None = None
+    origin: str | None = None
+    system: str | None = None
+    status: str | None = None
+    url: str | None = None
+    date: str | None = None
 
     class Config:
         from_attributes = True
@@ -88,3 +211,24 @@ class AllSystemResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SystemSearchResult(BaseModel):
+    value: str
+    kind: Literal["system", "origin"]
+    match: Literal["prefix", "fuzzy"]
+    score: float
+
+
+class EquipmentsBatchResult(BaseModel):
+    kind: Literal["equipments"]
+    results: list[EquipmentResponse]
+
+
+class SystemsBatchResult(BaseModel):
+    kind: Literal["systems"]
+    results: list[SystemResponse]
+
+
+# Tagged with the sub-query's kind; the row models alone are indistinguishable
+BatchResult = Annotated[EquipmentsBatchResult | SystemsBatchResult, Field(discriminator="kind")]
@@ -1,15 +1,16 @@
 """
 Scraper service for fetching equipment and system data from Oryx.
-Uses the oryx-wat-scraper library for scraping.
+Uses the oryx-wat-scraper library for scraping. The library and its HTTP and
+parsing stack are imported when a scraper is created, not at app start-up.
 """
 
-from oryx_wat_scraper import OryxScraper as OryxScraperLib
-
 
 class OryxScraperWrapper:
     """Wrapper for OryxScraper to maintain compatibility with existing code."""
 
     def __init__(self):
+        from oryx_wat_scraper import OryxScraper as OryxScraperLib
+
         self.scraper = OryxScraperLib()
 
     def scrape_equipments(self) -> list[dict]:
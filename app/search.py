@@ -0,0 +1,119 @@
+"""
+Prefix and fuzzy search over system names and origins.
+
+On PostgreSQL with migration 006, system names are matched in the database
+through the pg_trgm GIN index on ``all_system.system``. Elsewhere, and for
+origins, values are loaded once into a ``SearchIndex``: a trie for prefix
+matches and an inverted trigram index for fuzzy ones. Both paths score
+matches with pg_trgm's similarity, so results rank the same on either
+backend: prefix matches first, then by similarity.
+"""
+
+import re
+
+# pg_trgm's default pg_trgm.similarity_threshold
+SIMILARITY_THRESHOLD = 0.3
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(value: str) -> frozenset[str]:
+    """Trigrams of ``value`` as pg_trgm extracts them: per lowercased word, padded."""
+    grams = set()
+    for word in _WORD.findall(value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(a: str, b: str) -> float:
+    """pg_trgm ``similarity()``: shared trigrams over all distinct trigrams."""
+    return _similarity(trigrams(a), trigrams(b))
+
+
+def _similarity(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def rank(matches: list[dict], limit: int) -> list[dict]:
+    """Prefix matches first, then by descending score and value."""
+    matches.sort(key=lambda m: (m["match"] != "prefix", -m["score"], m["value"]))
+    return matches[:limit]
+
+
+class _Node:
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.values: list[str] = []
+
+
+class SearchIndex:
+    """In-memory prefix trie and trigram index over a set of values."""
+
+    def __init__(self, values, kind: str):
+        self.kind = kind
+        self.values = sorted({v for v in values if v})
+        self._root = _Node()
+        self._trigrams = [trigrams(v) for v in self.values]
+        self._postings: dict[str, list[int]] = {}
+        for i, value in enumerate(self.values):
+            node = self._root
+            for char in value.lower():
+                node = node.children.setdefault(char, _Node())
+            node.values.append(value)
+            for gram in self._trigrams[i]:
+                self._postings.setdefault(gram, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def prefixed(self, prefix: str) -> list[str]:
+        """Values starting with ``prefix``, ignoring case."""
+        node = self._root
+        for char in prefix.lower():
+            node = node.children.get(char)
+            if node is None:
+                return []
+        found, stack = [], [node]
+        while stack:
+            node = stack.pop()
+            found.extend(node.values)
+            stack.extend(node.children.values())
+        return found
+
+    def similar(self, query: str, threshold: float = SIMILARITY_THRESHOLD) -> dict[str, float]:
+        """Values whose similarity to ``query`` reaches ``threshold``, with their scores."""
+        query_grams = trigrams(query)
+        shared: dict[int, int] = {}
+        for gram in query_grams:
+            for i in self._postings.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        scores = {}
+        for i, count in shared.items():
+            score = count / (len(query_grams) + len(self._trigrams[i]) - count)
+            if score >= threshold:
+                scores[self.values[i]] = score
+        return scores
+
+    def search(self, query: str, limit: int) -> list[dict]:
+        """Ranked prefix and fuzzy matches of ``query``."""
+        query_grams = trigrams(query)
+        matches = {
+            value: {
+                "value": value,
+                "kind": self.kind,
+                "match": "prefix",
+                "score": _similarity(query_grams, trigrams(value)),
+            }
+            for value in self.prefixed(query)
+        }
+        for value, score in self.similar(query).items():
+            matches.setdefault(
+                value, {"value": value, "kind": self.kind, "match": "fuzzy", "score": score}
+            )
+        return rank(list(matches.values()), limit)
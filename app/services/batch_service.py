@@ -0,0 +1,87 @@
+from collections import defaultdict
+
+from sqlalchemy import literal, union_all
+from sqlalchemy.orm import Session
+
+from app.enums import EquipmentField, SystemField
+from app.equipment_storage import equipment_source
+from app.models import System
+from app.schemas import (
+    EquipmentResponse,
+    EquipmentsBatchQuery,
+    EquipmentsBatchResult,
+    SystemResponse,
+    SystemsBatchQuery,
+    SystemsBatchResult,
+)
+from app.services.equipments_service import EquipmentsService
+from app.services.systems_service import SystemsService
+from app.snapshot import get_equipment_snapshot
+
+
+class BatchService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.equipments = EquipmentsService(db)
+        self.systems = SystemsService(db)
+
+    def run(
+        self, queries: list[EquipmentsBatchQuery | SystemsBatchQuery]
+    ) -> dict[str, EquipmentsBatchResult | SystemsBatchResult]:
+        """
+        Run equipment and system sub-queries on this session's connection.
+
+        Each sub-query's rows are returned under its id, tagged with its kind.
+
+        Sub-queries of the same kind that return the same columns are merged
+        into one UNION ALL statement tagged with the sub-query id, so a batch
+        costs one round trip per distinct projection instead of one per query.
+        """
+        results = {q.id: [] for q in queries}
+        groups = defaultdict(list)
+        snapshot = get_equipment_snapshot(self.db)
+
+        for q in queries:
+            if q.kind == "equipments" and q.sparse:
+                results[q.id] = self.equipments.get_equipments(
+                    q.country, q.types, q.date, q.fields, sparse=True
+                )
+                continue
+            if q.kind == "equipments" and snapshot is not None:
+                results[q.id] = snapshot.query(q.country, q.types, q.date, q.fields)
+                continue
+            fields = tuple(dict.fromkeys(q.fields)) if q.fields else None
+            groups[(q.kind, fields)].append(q)
+
+        for (kind, fields), group in groups.items():
+            if kind == "equipments":
+                model, response, all_fields = equipment_source(), EquipmentResponse, EquipmentField
+            else:
+                model, response, all_fields = System, SystemResponse, SystemField
+            names = [f.value for f in fields or all_fields]
+            columns = [getattr(model, name) for name in names]
+
+            statements = [
+                self._filter(q, self.db.query(literal(q.id).label("query_id"), *columns))
+                for q in group
+            ]
+            for row in self.db.execute(union_all(*statements)):
+                query_id, *values = row
+                results[query_id].append(
+                    response.model_validate(dict(zip(names, values, strict=True)))
+                )
+
+        return {
+            q.id: (EquipmentsBatchResult if q.kind == "equipments" else SystemsBatchResult)(
+                kind=q.kind, results=results[q.id]
+            )
+            for q in queries
+        }
+
+    def _filter(self, q: EquipmentsBatchQuery | SystemsBatchQuery, query):
+        """Statement for one sub-query using the services' own filters."""
+        if q.kind == "equipments":
+            query = self.equipments._filter_equipments(query, q.country, q.types, q.date)
+        else:
+            query = self.systems._filter_systems(query, q.country, q.systems, q.status, q.date)
+        return query.statement
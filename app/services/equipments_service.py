@@ -1,10 +1,36 @@
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+import time
 
-from app.enums import Countries, EquipmentType
-from app.models import AllEquipment, Equipment
-from app.schemas import AllEquipmentResponse, EquipmentResponse
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Query, Session
+
+from app.cache import query_cache, query_key
+from app.database import read_replicas
+from app.enums import (
+    AggregateFunction,
+    Bucket,
+    Countries,
+    EquipmentDimension,
+    EquipmentField,
+    EquipmentType,
+)
+from app.equipment_storage import (
+    change_storage,
+    changed_rows,
+    equipment_source,
+    record_dates,
+    record_series_ends,
+    sparse_rows,
+    stored_dates,
+)
+from app.metrics import record_import
+from app.models import AllEquipment, Equipment, EquipmentDailyTotal
+from app.rollups import refresh_equipment_daily_totals
+from app.schemas import AllEquipmentResponse, EquipmentDeltaResponse, EquipmentResponse
 from app.scraper import OryxScraper
+from app.snapshot import get_equipment_snapshot, reload_equipment_snapshot
+from app.utils import aggregate, date_bucket
+
+COUNT_COLUMNS = ("destroyed", "abandoned", "captured", "damaged", "total")
 
 
 class EquipmentsService:
@@ -16,32 +42,213 @@ class EquipmentsService:
         country: Countries,
         types: list[EquipmentType] | None = None,
         date: list[str] | None = None,
+        fields: list[EquipmentField] | None = None,
+        sparse: bool = False,
+    ) -> list[EquipmentResponse]:
+        """
+        Get equipment data with filters, optionally limited to the given fields.
+
+        With ``sparse``, only the first row of each series in range and the
+        rows whose counts changed from the previous date are returned.
+        Concurrent calls with the same normalized filters share one execution;
+        results of warmed queries are cached until the next import.
+        """
+        key = query_key("equipments", country, types or [], tuple(date or ()), fields or [], sparse)
+        return query_cache.get_or_load_result(
+            key, lambda: self._get_equipments(country, types, date, fields, sparse)
+        )
+
+    def _get_equipments(
+        self,
+        country: Countries,
+        types: list[EquipmentType] | None,
+        date: list[str] | None,
+        fields: list[EquipmentField] | None,
+        sparse: bool = False,
     ) -> list[EquipmentResponse]:
-        """Get equipment data with filters."""
-        query = self.db.query(Equipment)
+        if sparse:
+            rows = sparse_rows(self._get_equipments(country, types, date, None))
+            if fields:
+                names = {f.value for f in fields}
+                rows = [EquipmentResponse.model_validate(r.model_dump(include=names)) for r in rows]
+            return rows
 
+        snapshot = get_equipment_snapshot(self.db)
+        if snapshot is not None:
+            return snapshot.query(country, types, date, fields)
+
+        source = equipment_source()
+        if fields or source is not Equipment:
+            columns = [getattr(source, f.value) for f in dict.fromkeys(fields or EquipmentField)]
+            query = self._filter_equipments(self.db.query(*columns), country, types, date)
+            return [EquipmentResponse.model_validate(dict(r._mapping)) for r in query.all()]
+
+        query = self._filter_equipments(self.db.query(Equipment), country, types, date)
+        results = query.all()
+        return [EquipmentResponse.model_validate(r) for r in results]
+
+    def _filter_equipments(
+        self,
+        query: Query,
+        country: Countries,
+        types: list[EquipmentType] | None = None,
+        date: list[str] | None = None,
+        model=None,
+    ) -> Query:
+        """
+        Apply the country, type and date range filters to a query on ``model``
+        (default: equipment_source()).
+        """
+        if model is None:
+            model = equipment_source()
         if country != Countries.ALL:
-            query = query.filter(Equipment.country.ilike(country.value))
+            query = query.filter(model.country.ilike(country.value))
 
         if types:
-            query = query.filter(Equipment.type.in_([t.value for t in types]))
+            query = query.filter(model.type.in_([t.value for t in types]))
 
         if date and len(date) == 2:
             start_date = date[0]
             end_date = date[1]
             if start_date > end_date:
                 raise ValueError("Start date should be before end date, please correct")
-            query = query.filter(and_(Equipment.date >= start_date, Equipment.date <= end_date))
+            query = query.filter(and_(model.date >= start_date, model.date <= end_date))
 
-        results = query.all()
-        return [EquipmentResponse.model_validate(r) for r in results]
+        return query
+
+    def get_equipment_deltas(
+        self,
+        country: Countries,
+        types: list[EquipmentType] | None = None,
+        date: list[str] | None = None,
+    ) -> list[EquipmentDeltaResponse]:
+        """
+        Get day-over-day increments of the cumulative equipment counts.
+
+        Increments come from LAG() over each (country, type) series and are
+        followed by rolling 7- and 30-date sums of the total increment. The
+        window runs over the rows before the start date too, so the first
+        rows in range still have correct increments and rolling sums.
+        """
+        source = equipment_source()
+        series = (source.country, source.type)
+        query = self.db.query(
+            source.country,
+            source.type,
+            source.date,
+            *[
+                (
+                    getattr(source, c)
+                    - func.lag(getattr(source, c)).over(partition_by=series, order_by=source.date)
+                ).label(c)
+                for c in COUNT_COLUMNS
+            ],
+        )
+        query = self._filter_equipments(query, country, types, model=source)
+
+        start_date = None
+        if date and len(date) == 2:
+            start_date = date[0]
+            end_date = date[1]
+            if start_date > end_date:
+                raise ValueError("Start date should be before end date, please correct")
+            query = query.filter(source.date <= end_date)
+        deltas = query.subquery()
+
+        window = {"partition_by": (deltas.c.country, deltas.c.type), "order_by": deltas.c.date}
+        rolling = self.db.query(
+            deltas,
+            func.sum(deltas.c.total).over(rows=(-6, 0), **window).label("total_7d"),
+            func.sum(deltas.c.total).over(rows=(-29, 0), **window).label("total_30d"),
+        ).subquery()
+
+        query = self.db.query(rolling)
+        if start_date:
+            query = query.filter(rolling.c.date >= start_date)
+        results = query.order_by(rolling.c.country, rolling.c.type, rolling.c.date).all()
+        return [EquipmentDeltaResponse.model_validate(dict(r._mapping)) for r in results]
+
+    def aggregate_equipments(
+        self,
+        country: Countries,
+        types: list[EquipmentType] | None = None,
+        date: list[str] | None = None,
+        bucket: Bucket = Bucket.DAY,
+        group_by: list[EquipmentDimension] | None = None,
+        aggregates: list[AggregateFunction] | None = None,
+    ) -> list[dict]:
+        """
+        Aggregate equipment counts into day, week or month buckets.
+
+        Counts are cumulative, so rows are first summed per day over the dimensions
+        not in ``group_by``. Each aggregate is then applied to those daily values
+        within the bucket, e.g. ``max`` gives the level reached by the end of it.
+        The synthetic "All Types" rows are never summed in, as in the rollup, and
+        filtering on "All Types" means every real type.
+        """
+        dimensions = [d.value for d in dict.fromkeys(group_by or [])]
+        aggregates = list(dict.fromkeys(aggregates or [AggregateFunction.MAX]))
+        if types and EquipmentType.ALL_TYPES in types:
+            types = None
+
+        snapshot = get_equipment_snapshot(self.db)
+        if snapshot is not None:
+            return snapshot.aggregate(country, types, date, bucket, dimensions, aggregates)
+
+        daily = self._daily_equipment_counts(country, types, date, bucket, dimensions)
+        group_columns = [daily.c.bucket, *[daily.c[d] for d in dimensions]]
+        query = (
+            self.db.query(
+                *group_columns,
+                *[
+                    aggregate(function, daily.c[column]).label(f"{column}_{function.value}")
+                    for column in COUNT_COLUMNS
+                    for function in aggregates
+                ],
+            )
+            .group_by(*group_columns)
+            .order_by(*group_columns)
+        )
+        return [dict(r._mapping) for r in query.all()]
+
+    def _daily_equipment_counts(
+        self,
+        country: Countries,
+        types: list[EquipmentType] | None,
+        date: list[str] | None,
+        bucket: Bucket,
+        dimensions: list[str],
+    ):
+        """Subquery of per-day count sums with a bucket column and the given dimensions."""
+        # Totals across all types are precomputed in the rollup table
+        model = equipment_source() if types or "type" in dimensions else EquipmentDailyTotal
+        dimension_columns = [getattr(model, d) for d in dimensions]
+        query = self.db.query(
+            date_bucket(self.db, model.date, bucket).label("bucket"),
+            *dimension_columns,
+            *[func.sum(getattr(model, c)).label(c) for c in COUNT_COLUMNS],
+        )
+        query = self._filter_equipments(query, country, types, date, model=model)
+        if model is not EquipmentDailyTotal:
+            query = query.filter(model.type != EquipmentType.ALL_TYPES.value)
+        return query.group_by(model.date, *dimension_columns).subquery()
 
     def get_total_equipments(
         self,
         country: Countries | None = None,
         types: list[EquipmentType] | None = None,
     ) -> list[AllEquipmentResponse]:
-        """Get total equipment data with filters."""
+        """Get total equipment data with filters, cached until the next import when warmed."""
+        key = query_key("all_equipments", country, types or [])
+        return query_cache.get_or_load_result(
+            key, lambda: self._get_total_equipments(country, types)
+        )
+
+    def _get_total_equipments(
+        self,
+        country: Countries | None,
+        types: list[EquipmentType] | None,
+    ) -> list[AllEquipmentResponse]:
         query = self.db.query(AllEquipment)
 
         if country:
@@ -54,9 +261,53 @@ class EquipmentsService:
         return [AllEquipmentResponse.model_validate(r) for r in results]
 
     def get_equipment_types(self) -> list[dict]:
-        """Get distinct equipment types for all countries."""
-        results = self.db.query(AllEquipment.type).distinct().order_by(AllEquipment.type).all()
-        return [{"type": r[0]} for r in results]
+        """
+        Get the equipment type catalog.
+
+        Each type comes with its row count, first and last seen dates and the
+        countries it is reported for. The catalog is cached until the next import.
+        """
+        return query_cache.get_or_load(query_key("equipment_types"), self._load_equipment_types)
+
+    def _load_equipment_types(self) -> list[dict]:
+        catalog = {}
+
+        def entry(equipment_type: str) -> dict:
+            return catalog.setdefault(
+                equipment_type,
+                {
+                    "type": equipment_type,
+                    "rows": 0,
+                    "first_seen": None,
+                    "last_seen": None,
+                    "countries": set(),
+                },
+            )
+
+        source = equipment_source()
+        stats = self.db.query(
+            source.type,
+            source.country,
+            func.count(),
+            func.min(source.date),
+            func.max(source.date),
+        ).group_by(source.type, source.country)
+        for equipment_type, country, rows, first_seen, last_seen in stats:
+            item = entry(equipment_type)
+            item["rows"] += rows
+            item["countries"].add(country.lower())
+            if item["first_seen"] is None or first_seen < item["first_seen"]:
+                item["first_seen"] = first_seen
+            if item["last_seen"] is None or last_seen > item["last_seen"]:
+                item["last_seen"] = last_seen
+
+        totals = self.db.query(AllEquipment.type, AllEquipment.country).distinct()
+        for equipment_type, country in totals:
+            entry(equipment_type)["countries"].add(country.lower())
+
+        return [
+            {**item, "countries": sorted(item["countries"])} for _, item in sorted(catalog.items())
+        ]
 
     def import_equipments(self, import_all: bool = False):
         """
@@ -69,11 +320,11 @@ class EquipmentsService:
         """
         from app.utils import upsert_equipment
 
+        start = time.perf_counter()
         # Get existing dates from database
         existing_dates = set()
         if not import_all:
-            existing_records = self.db.query(Equipment.date).distinct().all()
-            existing_dates = {record[0] for record in existing_records}
+            existing_dates = stored_dates(self.db)
 
         with OryxScraper() as scraper:
             data = scraper.scrape_equipments()
@@ -94,9 +345,8 @@ class EquipmentsService:
 
         print(f"Importing {len(new_data)} new equipment records...")
 
-        # Use upsert for incremental updates
-        for item in new_data:
-            equipment_data = {
+        rows = [
+            {
                 "country": item.get("country", ""),
                 "type": item.get("equipment_type", ""),
                 "destroyed": int(item.get("destroyed", 0) or 0),
@@ -106,16 +356,33 @@ class EquipmentsService:
                 "total": int(item.get("type_total", 0) or 0),
                 "date": item.get("date_recorded", ""),
             }
+            for item in new_data
+        ]
+        if change_storage():
+            # Only rows whose counts changed; readers carry the others forward
+            record_series_ends(self.db, rows)
+            rows = changed_rows(self.db, rows)
 
+        # Use upsert for incremental updates
+        for equipment_data in rows:
             upsert_equipment(self.db, equipment_data, Equipment)
 
+        imported_dates = {item.get("date_recorded", "") for item in new_data}
+        record_dates(self.db, imported_dates)
+        self.db.flush()
+        refresh_equipment_daily_totals(self.db, None if import_all else imported_dates)
         self.db.commit()
+        query_cache.invalidate()
+        read_replicas.mark_write()
+        reload_equipment_snapshot(self.db)
+        record_import("equipment", len(new_data), time.perf_counter() - start)
         print(f"✓ Successfully imported {len(new_data)} equipment records")
 
     def import_all_equipments(self):
         """Import all equipment totals from scraper with incremental updates."""
         from app.utils import upsert_all_equipment
 
+        start = time.perf_counter()
         with OryxScraper() as scraper:
             data = scraper.scrape_all_equipments()
 
@@ -134,3 +401,6 @@ class EquipmentsService:
             upsert_all_equipment(self.db, equipment_data, AllEquipment)
 
         self.db.commit()
+        query_cache.invalidate()
+        read_replicas.mark_write()
+        record_import("all_equipment", len(data), time.perf_counter() - start)
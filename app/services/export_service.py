@@ -0,0 +1,333 @@
+"""
+Bulk export of the equipment and system tables.
+
+Rows are read with server-side cursors in batches and written as Apache Arrow
+record batches, so memory use stays bounded by the batch size regardless of
+how much history is exported. pyarrow is optional
+(``pip install war-assets-tracker[export]``) and only imported by the first
+Arrow or Parquet export, which keeps it out of the app's start-up time.
+
+CSV on PostgreSQL is produced by the server itself with ``COPY ... TO STDOUT``
+and passed through untouched.
+"""
+
+import csv
+import datetime
+import io
+import queue
+import tempfile
+import threading
+from collections.abc import Iterator
+
+from sqlalchemy import Integer
+from sqlalchemy.orm import Query, Session
+
+from app.enums import Countries, EquipmentType, ExportTable, Status
+from app.equipment_storage import equipment_source
+from app.models import AllEquipment, AllSystem, Equipment, System
+from app.services.equipments_service import EquipmentsService
+from app.services.systems_service import SystemsService
+from app.utils import get_dialect_name
+
+# Set by require_pyarrow()
+pa = None
+pq = None
+
+EXPORT_MODELS = {
+    ExportTable.EQUIPMENT: Equipment,
+    ExportTable.ALL_EQUIPMENT: AllEquipment,
+    ExportTable.SYSTEM: System,
+    ExportTable.ALL_SYSTEM: AllSystem,
+}
+
+DEFAULT_BATCH_SIZE = 50_000
+
+# Parquet is spooled in memory up to this size, then to a temporary file
+PARQUET_SPOOL_SIZE = 16 * 1024 * 1024
+
+# Chunks buffered between the COPY thread and the response
+COPY_QUEUE_SIZE = 16
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+def require_pyarrow():
+    """Import pyarrow on first use; RuntimeError when the optional dependency is missing."""
+    global pa, pq
+
+    if pa is not None:
+        return
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:  # pragma: no cover - optional dependency
+        raise RuntimeError("pyarrow is not installed; install the 'export' extra") from None
+    pa, pq = pyarrow, pyarrow.parquet
+
+
+def _parse_date(value) -> datetime.date | None:
+    try:
+        return datetime.date.fromisoformat(value) if len(value) == 10 else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _date_array(values):
+    """date32 array of YYYY-MM-DD strings; empty or malformed dates become null."""
+    try:
+        return pa.array(values, pa.string()).cast(pa.date32())
+    except pa.ArrowInvalid:
+        return pa.array([_parse_date(v) for v in values], pa.date32())
+
+
+class _ChunkSink:
+    """Write-only file object that collects what pyarrow writes to it."""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class _CopyAborted(Exception):
+    """Raised inside COPY when the consumer stops reading."""
+
+
+class _QueueWriter:
+    """
+    File object handed to psycopg2 copy_expert() that feeds a bounded queue.
+
+    psycopg2 writes one row at a time, so rows are batched into chunks of
+    about COPY_CHUNK_SIZE bytes before being queued.
+    """
+
+    def __init__(self):
+        self.queue: queue.Queue = queue.Queue(maxsize=COPY_QUEUE_SIZE)
+        self.aborted = threading.Event()
+        self._buffer: list[bytes] = []
+        self._buffered = 0
+
+    def write(self, data):
+        if self.aborted.is_set():
+            raise _CopyAborted()
+        data = data.encode() if isinstance(data, str) else bytes(data)
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= COPY_CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.queue.put(b"".join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+
+
+class ExportService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def build_query(
+        self,
+        table: ExportTable,
+        country: Countries = Countries.ALL,
+        types: list[EquipmentType] | None = None,
+        systems: list[str] | None = None,
+        status: list[Status] | None = None,
+        date: list[str] | None = None,
+    ) -> Query:
+        """Query for ``table`` with the same filters as the stats endpoints."""
+        model = EXPORT_MODELS[table]
+        query = self.db.query(*model.__table__.columns).order_by(model.id)
+
+        if table == ExportTable.EQUIPMENT:
+            source = equipment_source()
+            if source is not Equipment:
+                columns = [getattr(source, c.name) for c in Equipment.__table__.columns]
+                query = self.db.query(*columns).order_by(source.id, source.date)
+            return EquipmentsService(self.db)._filter_equipments(query, country, types, date)
+        if table == ExportTable.SYSTEM:
+            return SystemsService(self.db)._filter_systems(query, country, systems, status, date)
+
+        if country != Countries.ALL:
+            query = query.filter(model.country.ilike(country.value))
+        if table == ExportTable.ALL_EQUIPMENT and types:
+            query = query.filter(model.type.in_([t.value for t in types]))
+        if table == ExportTable.ALL_SYSTEM and systems:
+            query = query.filter(model.system.in_(systems))
+        return query
+
+    def arrow_schema(self, table: ExportTable):
+        """
+        Arrow schema for ``table``; ``date`` columns become date32, nullable
+        because empty or malformed dates are exported as null.
+        """
+        require_pyarrow()
+        fields = []
+        for column in EXPORT_MODELS[table].__table__.columns:
+            if column.name == "date":
+                arrow_type = pa.date32()
+            elif isinstance(column.type, Integer):
+                arrow_type = pa.int32()
+            else:
+                arrow_type = pa.string()
+            nullable = column.nullable or column.name == "date"
+            fields.append(pa.field(column.name, arrow_type, nullable=nullable))
+        return pa.schema(fields)
+
+    def iter_record_batches(
+        self, table: ExportTable, batch_size: int = DEFAULT_BATCH_SIZE, **filters
+    ) -> Iterator:
+        """Yield pyarrow RecordBatches of at most ``batch_size`` rows."""
+        schema = self.arrow_schema(table)
+        query = self.build_query(table, **filters)
+        result = self.db.execute(
+            query.statement.execution_options(stream_results=True, yield_per=batch_size)
+        )
+        for rows in result.partitions(batch_size):
+            columns = zip(*rows, strict=True)
+            arrays = []
+            for field, values in zip(schema, columns, strict=True):
+                if pa.types.is_date32(field.type):
+                    arrays.append(_date_array(values))
+                else:
+                    arrays.append(pa.array(values, field.type))
+            yield pa.record_batch(arrays, schema=schema)
+
+    def iter_arrow_stream(
+        self, table: ExportTable, batch_size: int = DEFAULT_BATCH_SIZE, **filters
+    ) -> Iterator[bytes]:
+        """Yield an Arrow IPC stream chunk by chunk, one chunk per record batch."""
+        sink = _ChunkSink()
+        schema = self.arrow_schema(table)
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for batch in self.iter_record_batches(table, batch_size, **filters):
+                writer.write_batch(batch)
+                yield sink.drain()
+        yield sink.drain()
+
+    def write_parquet(
+        self, sink, table: ExportTable, batch_size: int = DEFAULT_BATCH_SIZE, **filters
+    ) -> int:
+        """Write ``table`` to ``sink`` (path or file object) as Parquet. Returns the row count."""
+        rows = 0
+        schema = self.arrow_schema(table)
+        with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+            for batch in self.iter_record_batches(table, batch_size, **filters):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        return rows
+
+    def write_arrow(
+        self, sink, table: ExportTable, batch_size: int = DEFAULT_BATCH_SIZE, **filters
+    ) -> int:
+        """Write ``table`` to ``sink`` (path or file object) as an Arrow IPC stream."""
+        rows = 0
+        schema = self.arrow_schema(table)
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for batch in self.iter_record_batches(table, batch_size, **filters):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        return rows
+
+    def iter_parquet(
+        self, table: ExportTable, batch_size: int = DEFAULT_BATCH_SIZE, **filters
+    ) -> Iterator[bytes]:
+        """
+        Yield a Parquet file in chunks.
+
+        Parquet writes its footer last, so the file is built in a spooled
+        temporary file first and then streamed out.
+        """
+        with tempfile.SpooledTemporaryFile(max_size=PARQUET_SPOOL_SIZE) as spool:
+            self.write_parquet(spool, table, batch_size, **filters)
+            spool.seek(0)
+            while chunk := spool.read(1024 * 1024):
+                yield chunk
+
+    def iter_csv(
+        self, table: ExportTable, batch_size: int = DEFAULT_BATCH_SIZE, **filters
+    ) -> Iterator[bytes]:
+        """Yield ``table`` as CSV with a header row, using COPY on PostgreSQL."""
+        query = self.build_query(table, **filters)
+        if get_dialect_name(self.db) == "postgresql":
+            return self._iter_copy_csv(query)
+        return self._iter_rows_csv(query, batch_size)
+
+    def _iter_copy_csv(self, query: Query) -> Iterator[bytes]:
+        """Stream ``COPY (query) TO STDOUT`` straight from the server."""
+        sql = str(
+            query.statement.compile(
+                dialect=self.db.bind.dialect, compile_kwargs={"literal_binds": True}
+            )
+        )
+        copy_sql = f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)"
+        cursor = self.db.connection().connection.cursor()
+
+        if hasattr(cursor, "copy"):
+            # psycopg 3 yields COPY data directly
+            with cursor.copy(copy_sql) as copy:
+                for data in copy:
+                    yield bytes(data)
+            return
+
+        # psycopg2 only writes COPY data to a file object, so run it in a
+        # thread that feeds a bounded queue (backpressure on slow clients)
+        writer = _QueueWriter()
+        done = object()
+        errors: list[Exception] = []
+
+        def run_copy():
+            try:
+                cursor.copy_expert(copy_sql, writer)
+                writer.flush()
+            except _CopyAborted:
+                pass
+            except Exception as e:
+                errors.append(e)
+            finally:
+                writer.queue.put(done)
+
+        thread = threading.Thread(target=run_copy, name="csv-copy", daemon=True)
+        thread.start()
+        try:
+            while (chunk := writer.queue.get()) is not done:
+                yield chunk
+        finally:
+            writer.aborted.set()
+            # Unblock a writer waiting on a full queue
+            while thread.is_alive():
+                try:
+                    writer.queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            thread.join()
+            cursor.close()
+        if errors:
+            raise errors[0]
+
+    def _iter_rows_csv(self, query: Query, batch_size: int) -> Iterator[bytes]:
+        """CSV fallback for databases without COPY (SQLite)."""
+        result = self.db.execute(
+            query.statement.execution_options(stream_results=True, yield_per=batch_size)
+        )
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(result.keys())
+        for rows in result.partitions(batch_size):
+            writer.writerows(rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode()
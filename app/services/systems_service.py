@@ -1,10 +1,18 @@
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+import time
 
-from app.enums import Countries, Status
-from app.models import AllSystem, System
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Query, Session
+
+from app.cache import query_cache, query_key
+from app.database import read_replicas
+from app.enums import AggregateFunction, Bucket, Countries, Status, SystemDimension, SystemField
+from app.metrics import record_import
+from app.models import AllSystem, System, SystemDailyStatus
+from app.rollups import refresh_all_system, refresh_system_daily_status
 from app.schemas import AllSystemResponse, SystemResponse
 from app.scraper import OryxScraper
+from app.search import SearchIndex, rank
+from app.utils import aggregate, date_bucket, escape_like, has_trigram_index
 
 
 class SystemsService:
@@ -17,32 +25,140 @@ class SystemsService:
         systems: list[str] | None = None,
         status: list[Status] | None = None,
         date: list[str] | None = None,
+        fields: list[SystemField] | None = None,
     ) -> list[SystemResponse]:
-        """Get system data with filters."""
-        query = self.db.query(System).filter(System.country.ilike(country.value))
+        """
+        Get system data with filters, optionally limited to the given fields.
+
+        Concurrent calls with the same normalized filters share one execution;
+        results of warmed queries are cached until the next import.
+        """
+        key = query_key(
+            "systems", country, systems or [], status or [], tuple(date or ()), fields or []
+        )
+        return query_cache.get_or_load_result(
+            key, lambda: self._get_systems(country, systems, status, date, fields)
+        )
+
+    def _get_systems(
+        self,
+        country: Countries,
+        systems: list[str] | None,
+        status: list[Status] | None,
+        date: list[str] | None,
+        fields: list[SystemField] | None,
+    ) -> list[SystemResponse]:
+        if fields:
+            columns = [getattr(System, f.value) for f in dict.fromkeys(fields)]
+            query = self._filter_systems(self.db.query(*columns), country, systems, status, date)
+            return [SystemResponse.model_validate(dict(r._mapping)) for r in query.all()]
+
+        query = self._filter_systems(self.db.query(System), country, systems, status, date)
+        results = query.all()
+        return [SystemResponse.model_validate(r) for r in results]
+
+    def _filter_systems(
+        self,
+        query: Query,
+        country: Countries,
+        systems: list[str] | None = None,
+        status: list[Status] | None = None,
+        date: list[str] | None = None,
+        model=System,
+    ) -> Query:
+        """Apply the country, system, status and date range filters to a query on ``model``."""
+        if country != Countries.ALL:
+            query = query.filter(model.country.ilike(country.value))
 
         if systems:
-            query = query.filter(System.system.in_(systems))
+            query = query.filter(model.system.in_(systems))
 
         if status:
-            query = query.filter(System.status.in_([s.value for s in status]))
+            query = query.filter(model.status.in_([s.value for s in status]))
 
         if date and len(date) == 2:
             start_date = date[0]
             end_date = date[1]
             if start_date > end_date:
                 raise ValueError("Start date should be before end date, please correct")
-            query = query.filter(and_(System.date >= start_date, System.date <= end_date))
+            query = query.filter(and_(model.date >= start_date, model.date <= end_date))
 
-        results = query.all()
-        return [SystemResponse.model_validate(r) for r in results]
+        return query
+
+    def aggregate_systems(
+        self,
+        country: Countries,
+        systems: list[str] | None = None,
+        status: list[Status] | None = None,
+        date: list[str] | None = None,
+        bucket: Bucket = Bucket.DAY,
+        group_by: list[SystemDimension] | None = None,
+        aggregates: list[AggregateFunction] | None = None,
+    ) -> list[dict]:
+        """
+        Aggregate system entry counts into day, week or month buckets.
+
+        Entries are first counted per day and ``group_by`` dimensions. Each
+        aggregate is then applied to those daily counts within the bucket.
+        """
+        dimensions = [d.value for d in dict.fromkeys(group_by or [])]
+        aggregates = list(dict.fromkeys(aggregates or [AggregateFunction.MAX]))
+
+        daily = self._daily_system_counts(country, systems, status, date, bucket, dimensions)
+        group_columns = [daily.c.bucket, *[daily.c[d] for d in dimensions]]
+        query = (
+            self.db.query(
+                *group_columns,
+                *[
+                    aggregate(function, daily.c.count).label(f"count_{function.value}")
+                    for function in aggregates
+                ],
+            )
+            .group_by(*group_columns)
+            .order_by(*group_columns)
+        )
+        return [dict(r._mapping) for r in query.all()]
+
+    def _daily_system_counts(
+        self,
+        country: Countries,
+        systems: list[str] | None,
+        status: list[Status] | None,
+        date: list[str] | None,
+        bucket: Bucket,
+        dimensions: list[str],
+    ):
+        """Subquery of per-day entry counts with a bucket column and the given dimensions."""
+        # Counts per system and status are precomputed in the rollup table
+        if "origin" in dimensions:
+            model, count = System, func.count()
+        else:
+            model, count = SystemDailyStatus, func.sum(SystemDailyStatus.count)
+        dimension_columns = [getattr(model, d) for d in dimensions]
+        query = self.db.query(
+            date_bucket(self.db, model.date, bucket).label("bucket"),
+            *dimension_columns,
+            count.label("count"),
+        )
+        query = self._filter_systems(query, country, systems, status, date, model=model)
+        return query.group_by(model.date, *dimension_columns).subquery()
 
     def get_total_systems(
         self,
         country: Countries | None = None,
         systems: list[str] | None = None,
     ) -> list[AllSystemResponse]:
-        """Get total system data with filters."""
+        """Get total system data with filters, cached until the next import when warmed."""
+        key = query_key("all_systems", country, systems or [])
+        return query_cache.get_or_load_result(
+            key, lambda: self._get_total_systems(country, systems)
+        )
+
+    def _get_total_systems(
+        self,
+        country: Countries | None,
+        systems: list[str] | None,
+    ) -> list[AllSystemResponse]:
         query = self.db.query(AllSystem)
 
         if country:
@@ -55,9 +171,107 @@ class SystemsService:
         return [AllSystemResponse.model_validate(r) for r in results]
 
     def get_system_types(self) -> list[dict]:
-        """Get distinct system types."""
-        results = self.db.query(AllSystem.system).distinct().all()
-        return [{"system": r[0]} for r in results]
+        """
+        Get the system catalog.
+
+        Each system comes with its entry count, first and last seen dates, the
+        countries it is reported for and its origins. The catalog is cached
+        until the next import.
+        """
+        return query_cache.get_or_load(query_key("system_types"), self._load_system_types)
+
+    def _load_system_types(self) -> list[dict]:
+        catalog = {}
+
+        def entry(system: str) -> dict:
+            return catalog.setdefault(
+                system,
+                {
+                    "system": system,
+                    "rows": 0,
+                    "first_seen": None,
+                    "last_seen": None,
+                    "countries": set(),
+                    "origins": set(),
+                },
+            )
+
+        stats = self.db.query(
+            System.system,
+            System.country,
+            System.origin,
+            func.count(),
+            func.min(System.date),
+            func.max(System.date),
+        ).group_by(System.system, System.country, System.origin)
+        for system, country, origin, rows, first_seen, last_seen in stats:
+            item = entry(system)
+            item["rows"] += rows
+            item["countries"].add(country.lower())
+            item["origins"].add(origin)
+            if item["first_seen"] is None or first_seen < item["first_seen"]:
+                item["first_seen"] = first_seen
+            if item["last_seen"] is None or last_seen > item["last_seen"]:
+                item["last_seen"] = last_seen
+
+        totals = self.db.query(AllSystem.system, AllSystem.country).distinct()
+        for system, country in totals:
+            entry(system)["countries"].add(country.lower())
+
+        return [
+            {**item, "countries": sorted(item["countries"]), "origins": sorted(item["origins"])}
+            for _, item in sorted(catalog.items())
+        ]
+
+    def search_systems(self, query: str, limit: int = 10) -> list[dict]:
+        """
+        Search system names and origins for ``query``.
+
+        Returns up to ``limit`` matches, values starting with the query first
+        and then values similar to it, each ranked by trigram similarity.
+        """
+        query = query.strip()
+        if not query:
+            raise ValueError("Search query must not be empty")
+
+        if has_trigram_index(self.db):
+            matches = self._search_system_names(query, limit)
+        else:
+            matches = self.search_index("system").search(query, limit)
+        matches += self.search_index("origin").search(query, limit)
+        return [{**m, "score": round(m["score"], 4)} for m in rank(matches, limit)]
+
+    def _search_system_names(self, query: str, limit: int) -> list[dict]:
+        """Match system names through the pg_trgm index on all_system.system."""
+        prefix = AllSystem.system.ilike(escape_like(query) + "%", escape="/")
+        is_prefix = prefix.label("is_prefix")
+        score = func.similarity(AllSystem.system, query).label("score")
+        rows = (
+            self.db.query(AllSystem.system, score, is_prefix)
+            .filter(or_(prefix, AllSystem.system.op("%")(query)))
+            .distinct()
+            .order_by(is_prefix.desc(), score.desc(), AllSystem.system)
+            .limit(limit)
+        )
+        return [
+            {
+                "value": system,
+                "kind": "system",
+                "match": "prefix" if matched_prefix else "fuzzy",
+                "score": float(similarity),
+            }
+            for system, similarity, matched_prefix in rows
+        ]
+
+    def search_index(self, kind: str) -> SearchIndex:
+        """In-memory index of system names or origins, cached until the next import."""
+        return query_cache.get_or_load(
+            query_key("search_index", kind), lambda: self._load_search_index(kind)
+        )
+
+    def _load_search_index(self, kind: str) -> SearchIndex:
+        column = AllSystem.system if kind == "system" else System.origin
+        return SearchIndex((value for (value,) in self.db.query(column).distinct()), kind)
 
     def import_systems(self, import_all: bool = False):
         """
@@ -68,8 +282,9 @@ class SystemsService:
             import_all: If True, import all data regardless of existing dates.
                        If False, only import new dates (default).
         """
-        from app.utils import upsert_system
+        from app.utils import ensure_system_partitions, upsert_system
 
+        start = time.perf_counter()
         # Get existing dates from database
         existing_dates = set()
         if not import_all:
@@ -94,6 +309,7 @@ class SystemsService:
             return
 
         print(f"Importing {len(new_data)} new system records...")
+        ensure_system_partitions(self.db, {item.get("date_recorded", "") for item in new_data})
 
         # Use upsert for incremental updates
         for item in new_data:
@@ -108,28 +324,25 @@ class SystemsService:
 
             upsert_system(self.db, system_data, System)
 
+        self.db.flush()
+        imported_dates = {item.get("date_recorded", "") for item in new_data}
+        imported_keys = {(item.get("country", ""), item.get("system", "")) for item in new_data}
+        refresh_system_daily_status(self.db, None if import_all else imported_dates)
+        refresh_all_system(self.db, None if import_all else imported_keys)
         self.db.commit()
+        query_cache.invalidate()
+        read_replicas.mark_write()
+        record_import("system", len(new_data), time.perf_counter() - start)
         print(f"✓ Successfully imported {len(new_data)} system records")
 
     def import_all_systems(self):
-        """Import all system totals from scraper with incremental updates."""
-        from app.utils import upsert_system
-
-        with OryxScraper() as scraper:
-            data = scraper.scrape_all_systems()
-
-        # Use upsert for incremental updates
-        for item in data:
-            system_data = {
-                "country": item.get("country", ""),
-                "system": item.get("system", ""),
-                "destroyed": int(item.get("destroyed", 0) or 0),
-                "abandoned": int(item.get("abandoned", 0) or 0),
-                "captured": int(item.get("captured", 0) or 0),
-                "damaged": int(item.get("damaged", 0) or 0),
-                "total": int(item.get("total", 0) or 0),
-            }
-
-            upsert_system(self.db, system_data, AllSystem)
+        """
+        Rebuild all system totals from the system entries.
 
+        import_systems already keeps all_system in sync for the keys it
+        writes, so this is only needed to repair the table.
+        """
+        refresh_all_system(self.db)
         self.db.commit()
+        query_cache.invalidate()
+        read_replicas.mark_write()
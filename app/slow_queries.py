@@ -0,0 +1,234 @@
+"""
+Slow-query log.
+
+Cursor events time every statement; the ones slower than
+SLOW_QUERY_THRESHOLD_MS are printed with their parameters, the route that
+issued them and the service method they came from, and are grouped by
+normalized shape (literals and bind parameters replaced by ``?``) for
+``GET /debug/slow-queries``. Statements under the threshold only cost two
+``perf_counter()`` calls.
+
+On PostgreSQL a sample of slow SELECTs (SLOW_QUERY_EXPLAIN_SAMPLE_RATE) is
+re-run as ``EXPLAIN (ANALYZE, BUFFERS)`` on a background thread, in a
+transaction that is rolled back, and the plan is kept with its shape.
+"""
+
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.database import settings
+
+# Distinct shapes kept; the fastest is dropped to make room
+MAX_SHAPES = 500
+# Pending EXPLAINs; further samples are dropped while the worker is busy
+EXPLAIN_QUEUE_SIZE = 16
+EXPLAIN_TIMEOUT_MS = 30_000
+PARAMS_PREVIEW_CHARS = 500
+
+_current_scope: ContextVar[Scope | None] = ContextVar("slow_query_scope", default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND = re.compile(r"%\([^)]+\)s|%s|\?|(?<!:):\w+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """The shape of a statement: literals, binds and IN lists collapsed to ``?``."""
+    shape = _STRING.sub("?", statement)
+    shape = _BIND.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+def current_route() -> str | None:
+    """``METHOD /route/{template}`` of the request being served, if any."""
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    path = getattr(scope.get("route"), "path", None) or scope.get("path")
+    return f"{scope.get('method')} {path}"
+
+
+def calling_service_method() -> str | None:
+    """The innermost ``app.services`` function on the stack, as ``Class.method``."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_globals.get("__name__", "").startswith("app.services."):
+            return frame.f_code.co_qualname
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryLog:
+    """Thread-safe per-shape statistics of slow statements."""
+
+    def __init__(self, max_shapes: int = MAX_SHAPES):
+        self.max_shapes = max_shapes
+        self._lock = threading.Lock()
+        self._shapes: dict[str, dict] = {}
+
+    def record(
+        self, statement: str, parameters, duration_ms: float, route: str | None, method: str | None
+    ) -> str:
+        """Add one slow execution; returns its shape."""
+        shape = normalize(statement)
+        with self._lock:
+            entry = self._shapes.get(shape)
+            if entry is None:
+                if len(self._shapes) >= self.max_shapes:
+                    fastest = min(self._shapes, key=lambda s: self._shapes[s]["max_ms"])
+                    del self._shapes[fastest]
+                entry = self._shapes[shape] = {
+                    "shape": shape,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "explain": None,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            if duration_ms >= entry["max_ms"]:
+                entry.update(
+                    max_ms=duration_ms,
+                    parameters=repr(parameters)[:PARAMS_PREVIEW_CHARS],
+                    route=route,
+                    service_method=method,
+                )
+        return shape
+
+    def set_explain(self, shape: str, plan: str):
+        with self._lock:
+            if shape in self._shapes:
+                self._shapes[shape]["explain"] = plan
+
+    def top(self, limit: int = 10) -> list[dict]:
+        """The ``limit`` shapes with the slowest single execution."""
+        with self._lock:
+            entries = sorted(self._shapes.values(), key=lambda e: e["max_ms"], reverse=True)
+            return [
+                {
+                    **entry,
+                    "total_ms": round(entry["total_ms"], 2),
+                    "max_ms": round(entry["max_ms"], 2),
+                    "mean_ms": round(entry["total_ms"] / entry["count"], 2),
+                }
+                for entry in entries[:limit]
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+_explain_queue: queue.Queue = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+_explain_thread: threading.Thread | None = None
+_explain_thread_lock = threading.Lock()
+
+
+def _explain_worker():
+    while True:
+        engine, shape, statement, parameters = _explain_queue.get()
+        try:
+            with engine.connect() as conn:
+                conn.exec_driver_sql(f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}")
+                rows = conn.exec_driver_sql(
+                    "EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters
+                ).all()
+                conn.rollback()
+            slow_query_log.set_explain(shape, "\n".join(row[0] for row in rows))
+        except Exception as e:
+            print(f"⚠ Warning: EXPLAIN of slow query failed: {e}")
+        finally:
+            _explain_queue.task_done()
+
+
+def _schedule_explain(engine: Engine, shape: str, statement: str, parameters):
+    """Queue an EXPLAIN unless the worker is already backed up."""
+    global _explain_thread
+
+    with _explain_thread_lock:
+        if _explain_thread is None:
+            _explain_thread = threading.Thread(
+                target=_explain_worker, name="slow-query-explain", daemon=True
+            )
+            _explain_thread.start()
+    try:
+        _explain_queue.put_nowait((engine, shape, statement, parameters))
+    except queue.Full:
+        pass
+
+
+def _should_explain(conn, statement: str, executemany: bool) -> bool:
+    # EXPLAIN ANALYZE runs the statement: only ever re-run plain reads
+    return (
+        not executemany
+        and conn.dialect.name == "postgresql"
+        and statement.lstrip()[:6].upper() == "SELECT"
+        and random.random() < settings.slow_query_explain_sample_rate
+    )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._slow_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_slow_query_start", None)
+    if start is None:
+        return
+    duration_ms = (time.perf_counter() - start) * 1000
+    if (
+        duration_ms < settings.slow_query_threshold_ms
+        or threading.current_thread() is _explain_thread
+    ):
+        return
+
+    route, method = current_route(), calling_service_method()
+    shape = slow_query_log.record(statement, parameters, duration_ms, route, method)
+    print(
+        f"⚠ Slow query ({duration_ms:.1f} ms) route={route} method={method}: "
+        f"{_SPACE.sub(' ', statement)[:PARAMS_PREVIEW_CHARS]} "
+        f"params={repr(parameters)[:PARAMS_PREVIEW_CHARS]}"
+    )
+    if _should_explain(conn, statement, executemany):
+        _schedule_explain(conn.engine, shape, statement, parameters)
+
+
+def install_slow_query_log():
+    """Time the statements of every engine. Safe to call more than once."""
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryContextMiddleware:
+    """Makes the current request visible to the slow-query log."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
@@ -0,0 +1,315 @@
+"""
+In-memory columnar snapshot of the equipment table.
+
+The equipment table changes once a day and fits comfortably in RAM, so when
+``EQUIPMENT_SNAPSHOT`` is enabled it is loaded into NumPy column arrays after
+each import and equipment queries are answered with vectorized masks instead
+of a database round trip:
+
+- country and type are dictionary-encoded into small integer codes
+- date is stored as int32 days since 1970-01-01
+- counts are int32
+
+A reload builds a new snapshot and swaps the module-level reference, so
+readers always see either the old or the new snapshot, never a mix. While
+any equipment date is not a valid YYYY-MM-DD string, the snapshot is not
+served and queries take the SQL path, whose string comparisons define how
+such rows are filtered. numpy is
+optional (``pip install war-assets-tracker[snapshot]``) and only imported once
+the snapshot is enabled and used.
+"""
+
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.database import settings
+from app.enums import AggregateFunction, Bucket, Countries, EquipmentField, EquipmentType
+from app.equipment_storage import equipment_source
+from app.schemas import EquipmentResponse
+
+# Set by numpy_available()
+np = None
+
+COUNT_COLUMNS = ("destroyed", "abandoned", "captured", "damaged", "total")
+
+
+def numpy_available() -> bool:
+    """Import numpy on first use; False when the optional dependency is missing."""
+    global np
+
+    if np is None:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - optional dependency
+            return False
+        np = numpy
+    return True
+
+
+class EquipmentSnapshot:
+    """Immutable column arrays of the equipment table."""
+
+    def __init__(self, rows: list[tuple]):
+        """Build the arrays from (id, country, type, destroyed, ..., total, date) rows."""
+        if not numpy_available():
+            raise RuntimeError("numpy is not installed; install the 'snapshot' extra")
+
+        columns = list(zip(*rows, strict=True)) if rows else [()] * 9
+        self.id = np.asarray(columns[0], dtype=np.int64)
+        self.countries, self.country = self._encode(columns[1])
+        self.types, self.type = self._encode(columns[2])
+        for name, values in zip(COUNT_COLUMNS, columns[3:8], strict=True):
+            setattr(self, name, np.asarray(values, dtype=np.int32))
+        self.day, self.invalid_dates = _parse_days(columns[8])
+        self.loaded_at = time.monotonic()
+
+    @staticmethod
+    def _encode(values) -> tuple[list[str], "np.ndarray"]:
+        """Dictionary-encode strings into sorted labels and int16 codes."""
+        labels, codes = np.unique(np.asarray(values, dtype=object), return_inverse=True)
+        return [str(label) for label in labels], codes.astype(np.int16)
+
+    @classmethod
+    def load(cls, db: Session) -> "EquipmentSnapshot":
+        """Read the whole equipment table into a new snapshot."""
+        source = equipment_source()
+        rows = (
+            db.query(
+                source.id,
+                source.country,
+                source.type,
+                *[getattr(source, c) for c in COUNT_COLUMNS],
+                source.date,
+            )
+            .order_by(source.id, source.date)
+            .all()
+        )
+        return cls([tuple(r) for r in rows])
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def mask(
+        self,
+        country: Countries,
+        types: list[EquipmentType] | None = None,
+        date: list[str] | None = None,
+    ) -> "np.ndarray":
+        """Boolean row mask equivalent to EquipmentsService._filter_equipments."""
+        mask = np.ones(len(self), dtype=bool)
+
+        if country != Countries.ALL:
+            # ILIKE semantics: case-insensitive equality
+            codes = [i for i, c in enumerate(self.countries) if c.lower() == country.value]
+            mask &= np.isin(self.country, codes)
+
+        if types:
+            wanted = {t.value for t in types}
+            mask &= np.isin(self.type, [i for i, t in enumerate(self.types) if t in wanted])
+
+        if date and len(date) == 2:
+            start_date = date[0]
+            end_date = date[1]
+            if start_date > end_date:
+                raise ValueError("Start date should be before end date, please correct")
+            bounds = np.asarray(date, dtype="datetime64[D]").astype(np.int32)
+            mask &= (self.day >= bounds[0]) & (self.day <= bounds[1])
+
+        return mask
+
+    def _column(self, name: str, index: "np.ndarray") -> list:
+        """Decoded Python values of one column for the selected rows."""
+        if name == "country":
+            return [self.countries[c] for c in self.country[index]]
+        if name == "type":
+            return [self.types[t] for t in self.type[index]]
+        if name == "date":
+            return np.datetime_as_string(self.day[index].astype("datetime64[D]")).tolist()
+        return getattr(self, name)[index].tolist()
+
+    def query(
+        self,
+        country: Countries,
+        types: list[EquipmentType] | None = None,
+        date: list[str] | None = None,
+        fields: list[EquipmentField] | None = None,
+    ) -> list[EquipmentResponse]:
+        """Answer EquipmentsService.get_equipments from the arrays."""
+        index = np.flatnonzero(self.mask(country, types, date))
+        names = (
+            [f.value for f in dict.fromkeys(fields)]
+            if fields
+            else list(EquipmentResponse.model_fields)
+        )
+        columns = [self._column(name, index) for name in names]
+        return [
+            EquipmentResponse.model_validate(dict(zip(names, values, strict=True)))
+            for values in zip(*columns, strict=True)
+        ]
+
+    def aggregate(
+        self,
+        country: Countries,
+        types: list[EquipmentType] | None = None,
+        date: list[str] | None = None,
+        bucket: Bucket = Bucket.DAY,
+        dimensions: list[str] | None = None,
+        aggregates: list[AggregateFunction] | None = None,
+    ) -> list[dict]:
+        """Answer EquipmentsService.aggregate_equipments from the arrays."""
+        dimensions = dimensions or []
+        aggregates = aggregates or [AggregateFunction.MAX]
+        if types and EquipmentType.ALL_TYPES in types:
+            types = None
+        mask = self.mask(country, types, date)
+        # Sums across types skip the synthetic "All Types" rows, like the rollup
+        if EquipmentType.ALL_TYPES.value in self.types:
+            mask &= self.type != self.types.index(EquipmentType.ALL_TYPES.value)
+        index = np.flatnonzero(mask)
+        if not index.size:
+            return []
+
+        day = self.day[index]
+        dimension_codes = [getattr(self, d)[index] for d in dimensions]
+
+        # Sum per day over the dimensions not grouped on
+        daily_keys, daily = np.unique(
+            np.stack([day, *dimension_codes]), axis=1, return_inverse=True
+        )
+        daily = daily.ravel()
+        daily_sums = {
+            c: np.bincount(daily, weights=getattr(self, c)[index], minlength=daily_keys.shape[1])
+            for c in COUNT_COLUMNS
+        }
+
+        # Aggregate the daily values within each bucket
+        buckets = _bucket_start(daily_keys[0], bucket)
+        group_keys, group = np.unique(
+            np.stack([buckets, *daily_keys[1:]]), axis=1, return_inverse=True
+        )
+        group = group.ravel()
+        size = group_keys.shape[1]
+        counts = np.bincount(group, minlength=size)
+        results = {}
+        for column, values in daily_sums.items():
+            for function in aggregates:
+                results[f"{column}_{function.value}"] = _reduce(
+                    function, group, values, counts, size
+                )
+
+        labels = {
+            "bucket": np.datetime_as_string(group_keys[0].astype("datetime64[D]")).tolist(),
+        }
+        for i, dimension in enumerate(dimensions, start=1):
+            names = self.countries if dimension == "country" else self.types
+            labels[dimension] = [names[code] for code in group_keys[i]]
+
+        rows = [
+            {
+                **{name: values[i] for name, values in labels.items()},
+                **{name: values[i] for name, values in results.items()},
+            }
+            for i in range(size)
+        ]
+        # Match the SQL ORDER BY on the decoded labels
+        return sorted(rows, key=lambda r: tuple(r[name] for name in labels))
+
+
+def _bucket_start(days: "np.ndarray", bucket: Bucket) -> "np.ndarray":
+    """First day of the bucket for each day number; weeks start on Monday."""
+    if bucket == Bucket.WEEK:
+        # 1970-01-01 was a Thursday, three days after a Monday
+        return days - (days + 3) % 7
+    if bucket == Bucket.MONTH:
+        months = days.astype("datetime64[D]").astype("datetime64[M]")
+        return months.astype("datetime64[D]").astype(days.dtype)
+    return days
+
+
+def _reduce(function: AggregateFunction, group, values, counts, size) -> list:
+    """Apply an aggregate function to ``values`` per group."""
+    if function in (AggregateFunction.SUM, AggregateFunction.AVG):
+        sums = np.bincount(group, weights=values, minlength=size)
+        if function == AggregateFunction.AVG:
+            return (sums / counts).tolist()
+        return sums.astype(np.int64).tolist()
+
+    if function == AggregateFunction.MIN:
+        out = np.full(size, np.inf)
+        np.minimum.at(out, group, values)
+    else:
+        out = np.full(size, -np.inf)
+        np.maximum.at(out, group, values)
+    return out.astype(np.int64).tolist()
+
+
+def _parse_days(values) -> tuple["np.ndarray", int]:
+    """
+    int32 days since 1970-01-01 of YYYY-MM-DD strings, and how many values are
+    not valid dates (blank, impossible or another format); those rows get day 0.
+    """
+    strings = np.asarray(values, dtype=object)
+    try:
+        parsed = np.asarray(strings, dtype="datetime64[D]")
+    except (TypeError, ValueError):
+        parsed = np.asarray([_parse_day(v) for v in strings], dtype="datetime64[D]")
+    # numpy also accepts "2023-01" or "2023"; only exact round trips are valid
+    valid = ~np.isnat(parsed) & (np.datetime_as_string(parsed) == strings.astype(str))
+    return np.where(valid, parsed.astype(np.int64), 0).astype(np.int32), int((~valid).sum())
+
+
+def _parse_day(value) -> "np.datetime64":
+    try:
+        return np.datetime64(value, "D")
+    except (TypeError, ValueError):
+        return np.datetime64("NaT")
+
+
+_snapshot: EquipmentSnapshot | None = None
+_reload_lock = threading.Lock()
+
+
+def get_equipment_snapshot(db: Session) -> EquipmentSnapshot | None:
+    """
+    Current snapshot when EQUIPMENT_SNAPSHOT is enabled, else None.
+
+    Loads the snapshot on first use and reloads it once it is older than
+    EQUIPMENT_SNAPSHOT_MAX_AGE, which bounds staleness in workers that did not
+    run the import themselves.
+    """
+    if not settings.equipment_snapshot or not numpy_available():
+        return None
+
+    snapshot = _snapshot
+    max_age = settings.equipment_snapshot_max_age
+    if snapshot is None or time.monotonic() - snapshot.loaded_at >= max_age:
+        with _reload_lock:
+            # Another request may have reloaded while we waited
+            snapshot = _snapshot
+            if snapshot is None or time.monotonic() - snapshot.loaded_at >= max_age:
+                reload_equipment_snapshot(db)
+                snapshot = _snapshot
+    return snapshot if not snapshot.invalid_dates else None
+
+
+def reload_equipment_snapshot(db: Session) -> EquipmentSnapshot | None:
+    """
+    Rebuild the snapshot and swap it in atomically. No-op when disabled.
+
+    Returns None when the snapshot cannot be served because of invalid dates.
+    """
+    global _snapshot
+
+    if not settings.equipment_snapshot or not numpy_available():
+        return None
+    snapshot = EquipmentSnapshot.load(db)
+    _snapshot = snapshot
+    if snapshot.invalid_dates:
+        print(
+            f"⚠ Warning: {snapshot.invalid_dates} equipment rows have invalid dates - "
+            "serving equipment queries from SQL instead of the snapshot"
+        )
+        return None
+    return snapshot
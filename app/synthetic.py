@@ -0,0 +1,332 @@
+"""
+Deterministic synthetic data at Oryx scale.
+
+``SyntheticData`` generates the records OryxScraper returns: cumulative
+daily equipment counts for every (country, type) series, the latest totals,
+and system entries with origins, statuses and image URLs. Like the scraped
+lists, every date repeats all earlier system entries. The same parameters
+and seed always produce the same records. Records are generated lazily, so
+millions of system rows never sit in memory at once.
+
+``SyntheticScraper`` stands in for OryxScraper so the import path can run on
+synthetic data, and ``write_synthetic_data`` bulk-inserts the records
+directly (scripts/generate_data.py, scripts/benchmark.py).
+"""
+
+import random
+from collections.abc import Iterator
+from datetime import date, timedelta
+from itertools import accumulate
+
+from sqlalchemy import column, delete, insert, table, text
+from sqlalchemy.orm import Session
+
+from app.enums import EquipmentType, Status
+from app.equipment_storage import change_storage, changed_rows, record_dates, record_series_ends
+from app.models import (
+    AllEquipment,
+    AllSystem,
+    Equipment,
+    EquipmentDate,
+    EquipmentSeriesEnd,
+    System,
+)
+from app.rollups import (
+    refresh_all_system,
+    refresh_equipment_daily_totals,
+    refresh_system_daily_status,
+)
+from app.utils import ensure_system_partitions, get_dialect_name, is_encoded
+
+START_DATE = date(2022, 2, 24)
+
+# Losses are skewed towards Russia, as in the real data
+COUNTRY_WEIGHTS = {"russia": 3, "ukraine": 1}
+STATUS_WEIGHTS = {
+    Status.DESTROYED.value: 60,
+    Status.DAMAGED.value: 15,
+    Status.ABANDONED.value: 10,
+    Status.CAPTURED.value: 15,
+}
+# Later dates sometimes report a damaged or abandoned entry as destroyed or captured
+STATUS_CHANGES = {
+    Status.DAMAGED.value: Status.DESTROYED.value,
+    Status.ABANDONED.value: Status.CAPTURED.value,
+}
+STATUS_CHANGE_RATE = 0.01
+ORIGINS = (
+    "Soviet Union",
+    "Russia",
+    "Ukraine",
+    "United States",
+    "Germany",
+    "United Kingdom",
+    "France",
+    "Poland",
+    "Czech Republic",
+    "Sweden",
+)
+SYSTEM_PREFIXES = ("T", "BMP", "BTR", "MT-LB", "2S", "BM", "Su", "Mi", "Buk", "Tor", "KamAZ")
+
+# Status order of the equipment count columns
+COUNT_STATUSES = ("destroyed", "abandoned", "captured", "damaged")
+
+INSERT_BATCH_SIZE = 10_000
+
+# Dictionary-encoded columns of each table, each with its dim_* table (migration 005)
+ENCODED_COLUMNS = {
+    "equipment": ("country", "type"),
+    "system": ("country", "origin", "system", "status", "url"),
+}
+
+
+class SyntheticData:
+    """Seeded generator of scraper-shaped equipment and system records."""
+
+    def __init__(
+        self,
+        days: int = 365,
+        types: int | None = None,
+        systems: int = 2000,
+        entries_per_day: int = 50,
+        seed: int = 0,
+        start: date = START_DATE,
+    ):
+        if days < 1 or systems < 1 or entries_per_day < 0:
+            raise ValueError("days and systems must be positive, entries_per_day non-negative")
+        equipment_types = [t for t in EquipmentType if t != EquipmentType.ALL_TYPES]
+        self.types = equipment_types[: types or len(equipment_types)]
+        self.days = days
+        self.systems = systems
+        self.entries_per_day = entries_per_day
+        self.seed = seed
+        self.start = start
+
+    def dates(self) -> list[str]:
+        return [(self.start + timedelta(days=day)).isoformat() for day in range(self.days)]
+
+    def equipment_records(self) -> Iterator[dict]:
+        """Cumulative counts per country, type and date, plus the "All Types" sums."""
+        rng = random.Random(f"equipment-{self.seed}")
+        countries = list(COUNTRY_WEIGHTS)
+        # How likely each series is to change on a given day
+        activity = {
+            (country, t): rng.uniform(0.05, 0.6) * COUNTRY_WEIGHTS[country] / 3
+            for country in countries
+            for t in self.types
+        }
+        counts = {key: [0, 0, 0, 0] for key in activity}
+        for date_recorded in self.dates():
+            for country in countries:
+                totals = [0, 0, 0, 0]
+                for equipment_type in self.types:
+                    values = counts[(country, equipment_type)]
+                    if rng.random() < activity[(country, equipment_type)]:
+                        values[rng.randrange(4)] += rng.randint(1, 5)
+                    totals = [a + b for a, b in zip(totals, values, strict=True)]
+                    yield _equipment_record(country, equipment_type.value, values, date_recorded)
+                yield _equipment_record(
+                    country, EquipmentType.ALL_TYPES.value, totals, date_recorded
+                )
+
+    def all_equipment_records(self) -> list[dict]:
+        """The last day's counts of every series, without a date."""
+        latest = {}
+        for record in self.equipment_records():
+            latest[(record["country"], record["equipment_type"])] = record
+        return [{k: v for k, v in r.items() if k != "date_recorded"} for r in latest.values()]
+
+    def system_name(self, index: int) -> str:
+        prefix = SYSTEM_PREFIXES[index % len(SYSTEM_PREFIXES)]
+        return f"{prefix}-{index // len(SYSTEM_PREFIXES) + 1}"
+
+    def system_records(self) -> Iterator[dict]:
+        """
+        Every system entry listed so far, on each date: ``entries_per_day`` new
+        entries with unique URLs per date, and the earlier ones again, some
+        with an updated status.
+        """
+        rng = random.Random(f"system-{self.seed}")
+        systems = range(self.systems)
+        countries, country_weights = zip(*COUNTRY_WEIGHTS.items(), strict=True)
+        statuses, status_weights = zip(*STATUS_WEIGHTS.items(), strict=True)
+        # A few systems account for most entries, as in the real data
+        system_weights = list(accumulate(1 / (i + 1) for i in systems))
+        country_weights = list(accumulate(country_weights))
+        status_weights = list(accumulate(status_weights))
+        k = self.entries_per_day
+        entries = []
+        for day, date_recorded in enumerate(self.dates()):
+            for listed in entries:
+                if listed["status"] in STATUS_CHANGES and rng.random() < STATUS_CHANGE_RATE:
+                    listed["status"] = STATUS_CHANGES[listed["status"]]
+            picked = rng.choices(systems, cum_weights=system_weights, k=k)
+            picked_countries = rng.choices(countries, cum_weights=country_weights, k=k)
+            picked_statuses = rng.choices(statuses, cum_weights=status_weights, k=k)
+            for entry, index in enumerate(picked):
+                name = self.system_name(index)
+                entries.append(
+                    {
+                        "country": picked_countries[entry],
+                        "origin": ORIGINS[index * 7 % len(ORIGINS)],
+                        "system": name,
+                        "status": picked_statuses[entry],
+                        "url": f"https://i.postimg.cc/s{self.seed}d{day}e{entry}/{name}.jpg",
+                    }
+                )
+            for listed in entries:
+                yield {**listed, "date_recorded": date_recorded}
+
+
+def _equipment_record(country: str, equipment_type: str, values, date_recorded: str) -> dict:
+    return {
+        "country": country,
+        "equipment_type": equipment_type,
+        **dict(zip(COUNT_STATUSES, values, strict=True)),
+        "type_total": sum(values),
+        "date_recorded": date_recorded,
+    }
+
+
+class SyntheticScraper:
+    """Stand-in for OryxScraper returning ``SyntheticData`` records."""
+
+    def __init__(self, data: SyntheticData):
+        self.data = data
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def scrape_equipments(self) -> list[dict]:
+        return list(self.data.equipment_records())
+
+    def scrape_all_equipments(self) -> list[dict]:
+        return self.data.all_equipment_records()
+
+    def scrape_systems(self) -> list[dict]:
+        return list(self.data.system_records())
+
+
+def _equipment_row(record: dict) -> dict:
+    return {
+        "country": record["country"],
+        "type": record["equipment_type"],
+        **{status: record[status] for status in COUNT_STATUSES},
+        "total": record["type_total"],
+    }
+
+
+def _system_row(record: dict) -> dict:
+    row = {k: v for k, v in record.items() if k != "date_recorded"}
+    row["date"] = record["date_recorded"]
+    return row
+
+
+def _insert_encoded(db: Session, table_name: str, rows: list[dict]):
+    """
+    Insert into a fact table through a staging table, resolving the dimension
+    ids for the whole batch instead of row by row in the view's trigger.
+    """
+    columns = list(rows[0])
+    dimensions = ENCODED_COLUMNS[table_name]
+    stage = f"{table_name}_stage"
+    db.execute(
+        text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {stage} ON COMMIT DROP AS "
+            f"SELECT {', '.join(columns)} FROM {table_name} WITH NO DATA"
+        )
+    )
+    db.execute(text(f"TRUNCATE {stage}"))
+    db.execute(insert(table(stage, *[column(c) for c in columns])), rows)
+    for dimension in dimensions:
+        db.execute(
+            text(
+                f"INSERT INTO dim_{dimension} (value) SELECT DISTINCT {dimension} FROM {stage} "
+                "ON CONFLICT DO NOTHING"
+            )
+        )
+    targets = [f"{c}_id" if c in dimensions else c for c in columns]
+    values = [f"d_{c}.id" if c in dimensions else f"s.{c}" for c in columns]
+    joins = " ".join(f"JOIN dim_{c} d_{c} ON d_{c}.value = s.{c}" for c in dimensions)
+    db.execute(
+        text(
+            f"INSERT INTO {table_name}_fact ({', '.join(targets)}) "
+            f"SELECT {', '.join(values)} FROM {stage} s {joins}"
+        )
+    )
+
+
+def _insert_batches(db: Session, model, rows) -> int:
+    table_name = model.__tablename__
+    encoded = (
+        table_name in ENCODED_COLUMNS
+        and get_dialect_name(db) == "postgresql"
+        and is_encoded(db, table_name)
+    )
+
+    def flush(batch):
+        if encoded:
+            _insert_encoded(db, table_name, batch)
+        else:
+            db.execute(insert(model), batch)
+
+    count, batch = 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == INSERT_BATCH_SIZE:
+            flush(batch)
+            count, batch = count + len(batch), []
+    if batch:
+        flush(batch)
+        count += len(batch)
+    return count
+
+
+def _clear(db: Session, model):
+    table = model.__tablename__
+    if get_dialect_name(db) == "postgresql" and is_encoded(db, table):
+        # Emptying the fact table is faster than deleting row by row through the view
+        db.execute(text(f"DELETE FROM {table}_fact"))
+    else:
+        db.execute(delete(model))
+
+
+def write_synthetic_data(db: Session, data: SyntheticData, replace: bool = False) -> dict:
+    """
+    Bulk-insert the synthetic records and rebuild the rollups, bypassing the
+    per-row upserts of the import path. The tables must be empty unless
+    ``replace`` is set, which deletes their rows first. Returns the number of
+    rows written per table; the caller commits.
+    """
+    tables = (Equipment, EquipmentDate, EquipmentSeriesEnd, AllEquipment, System, AllSystem)
+    if not replace and any(db.query(model).first() is not None for model in tables):
+        raise ValueError("The database already holds data; pass replace=True to overwrite it")
+    if replace:
+        for model in tables:
+            _clear(db, model)
+
+    equipment = [
+        {**_equipment_row(record), "date": record["date_recorded"]}
+        for record in data.equipment_records()
+    ]
+    if change_storage():
+        record_series_ends(db, equipment)
+        equipment = changed_rows(db, equipment)
+    written = {"equipment": _insert_batches(db, Equipment, equipment)}
+    record_dates(db, data.dates())
+    written["all_equipment"] = _insert_batches(
+        db, AllEquipment, (_equipment_row(record) for record in data.all_equipment_records())
+    )
+
+    ensure_system_partitions(db, data.dates())
+    written["system"] = _insert_batches(
+        db, System, (_system_row(record) for record in data.system_records())
+    )
+
+    refresh_equipment_daily_totals(db)
+    refresh_system_daily_status(db)
+    refresh_all_system(db)
+    return written
@@ -2,14 +2,85 @@
 Utility functions for database operations.
 """
 
+import re
+
+from sqlalchemy import Date, cast, func, text
 from sqlalchemy.orm import Session
 
+from app.enums import AggregateFunction, Bucket
+
 
 def get_dialect_name(db: Session) -> str:
     """Get the database dialect name."""
     return db.bind.dialect.name if hasattr(db, "bind") else "postgresql"
 
 
+# Dates starting with a valid YYYY-MM month; others go to the DEFAULT partition
+_PARTITION_MONTH = re.compile(r"^[0-9]{4}-(0[1-9]|1[0-2])")
+
+_encoded_tables: dict[tuple[str, str], bool] = {}
+
+
+def is_encoded(db: Session, table_name: str) -> bool:
+    """
+    Whether ``table_name`` is a decoding view over a dictionary-encoded fact
+    table (migration 005). Its INSTEAD OF INSERT trigger upserts by itself,
+    and views do not accept ON CONFLICT.
+    """
+    key = (db.bind.url.render_as_string(), table_name)
+    if key not in _encoded_tables:
+        _encoded_tables[key] = bool(
+            db.execute(
+                text("SELECT relkind = 'v' FROM pg_class WHERE oid = to_regclass(:name)"),
+                {"name": table_name},
+            ).scalar()
+        )
+    return _encoded_tables[key]
+
+
+_trigram_indexes: dict[str, bool] = {}
+
+
+def has_trigram_index(db: Session) -> bool:
+    """Whether migration 006 has added the pg_trgm index on all_system.system."""
+    if get_dialect_name(db) != "postgresql":
+        return False
+    key = db.bind.url.render_as_string()
+    if key not in _trigram_indexes:
+        _trigram_indexes[key] = bool(
+            db.execute(
+                text("SELECT to_regclass('idx_all_system_system_trgm') IS NOT NULL")
+            ).scalar()
+        )
+    return _trigram_indexes[key]
+
+
+def escape_like(value: str, escape: str = "/") -> str:
+    """Escape LIKE wildcards in ``value`` with ``escape``."""
+    for char in (escape, "%", "_"):
+        value = value.replace(char, escape + char)
+    return value
+
+
+def ensure_system_partitions(db: Session, dates) -> int:
+    """
+    Create the monthly partitions of ``system`` that ``dates`` fall in.
+
+    Only applies on PostgreSQL once migration 004 has partitioned the table
+    (or 005 its system_fact replacement); returns the number of months checked.
+    """
+    if get_dialect_name(db) != "postgresql":
+        return 0
+    migrated = db.execute(text("SELECT to_regproc('create_system_partition') IS NOT NULL")).scalar()
+    if not migrated:
+        return 0
+
+    months = sorted({date[:7] + "-01" for date in dates if _PARTITION_MONTH.match(date or "")})
+    for month in months:
+        db.execute(text("SELECT create_system_partition(CAST(:month AS date))"), {"month": month})
+    return len(months)
+
+
 def upsert_equipment(db: Session, equipment_data: dict, model_class):
     """Upsert equipment data (works with both PostgreSQL and SQLite)."""
     dialect = get_dialect_name(db)
@@ -18,6 +89,9 @@ def upsert_equipment(db: Session, equipment_data: dict, model_class):
         from sqlalchemy.dialects.postgresql import insert
 
         stmt = insert(model_class).values(**equipment_data)
+        if is_encoded(db, model_class.__tablename__):
+            db.execute(stmt)
+            return
         stmt = stmt.on_conflict_do_update(
             index_elements=["country", "type", "date"],
             set_={
@@ -56,6 +130,9 @@ def upsert_all_equipment(db: Session, equipment_data: dict, model_class):
         from sqlalchemy.dialects.postgresql import insert
 
         stmt = insert(model_class).values(**equipment_data)
+        if is_encoded(db, model_class.__tablename__):
+            db.execute(stmt)
+            return
         stmt = stmt.on_conflict_do_update(
             index_elements=["country", "type"],
             set_={
@@ -93,6 +170,9 @@ def upsert_system(db: Session, system_data: dict, model_class):
         from sqlalchemy.dialects.postgresql import insert
 
         stmt = insert(model_class).values(**system_data)
+        if is_encoded(db, model_class.__tablename__):
+            db.execute(stmt)
+            return
         if "url" in system_data and "date" in system_data:
             # System model
             stmt = stmt.on_conflict_do_update(
@@ -145,3 +225,30 @@ def upsert_system(db: Session, system_data: dict, model_class):
                 setattr(existing, key, value)
         else:
             db.add(model_class(**system_data))
+
+
+def date_bucket(db: Session, column, bucket: Bucket):
+    """
+    SQL expression truncating a YYYY-MM-DD string column to the start of its bucket.
+
+    Weeks start on Monday. The result is a YYYY-MM-DD string in both dialects.
+    """
+    if bucket == Bucket.DAY:
+        return column
+    if bucket == Bucket.MONTH:
+        return func.substr(column, 1, 7).concat("-01")
+
+    if get_dialect_name(db) == "postgresql":
+        return func.to_char(func.date_trunc("week", cast(column, Date)), "YYYY-MM-DD")
+    # SQLite: step back six days, then forward to the next Monday
+    return func.date(column, "-6 days", "weekday 1")
+
+
+def aggregate(function: AggregateFunction, column):
+    """SQL aggregate expression for an AggregateFunction."""
+    return {
+        AggregateFunction.SUM: func.sum,
+        AggregateFunction.AVG: func.avg,
+        AggregateFunction.MIN: func.min,
+        AggregateFunction.MAX: func.max,
+    }[function](column)
@@ -0,0 +1,109 @@
+"""
+Post-import cache warming.
+
+After an import clears the query cache, the queries every dashboard opens
+with are run again in the background so the first users after 13:00 do not
+pay for them. The set is the canonical groups listed in CACHE_WARM_QUERIES
+plus the CACHE_WARM_HOT_KEYS most requested cache keys of the last day.
+Queries run on their own sessions, CACHE_WARM_CONCURRENCY at a time. The
+warmed keys are the only stats results the cache keeps until the next
+warming, unless QUERY_CACHE_RESULTS=all.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.cache import query_cache, query_key
+from app.database import SessionLocal, settings
+from app.enums import Countries, EquipmentField, EquipmentType, Status, SystemField
+from app.services.equipments_service import EquipmentsService
+from app.services.systems_service import SystemsService
+
+COUNTRIES = (Countries.UKRAINE, Countries.RUSSIA)
+
+CANONICAL_QUERIES = {
+    "equipment_totals": [query_key("all_equipments", c, []) for c in (None, *COUNTRIES)],
+    "equipment_series": [query_key("equipments", c, [], (), [], False) for c in COUNTRIES],
+    "catalogs": [
+        query_key("equipment_types"),
+        query_key("system_types"),
+        query_key("search_index", "system"),
+        query_key("search_index", "origin"),
+    ],
+    "system_totals": [query_key("all_systems", c, []) for c in (None, *COUNTRIES)],
+}
+
+
+def _optional(values, enum=None):
+    """Turn a normalized key part back into a service argument."""
+    if not values:
+        return None
+    return [enum(v) for v in values] if enum else list(values)
+
+
+# Rebuild the service call behind each kind of cache key
+WARMERS = {
+    "equipments": lambda db, country, types, date, fields, sparse=False: EquipmentsService(
+        db
+    ).get_equipments(
+        Countries(country),
+        _optional(types, EquipmentType),
+        _optional(date),
+        _optional(fields, EquipmentField),
+        sparse,
+    ),
+    "all_equipments": lambda db, country, types: EquipmentsService(db).get_total_equipments(
+        Countries(country) if country else None, _optional(types, EquipmentType)
+    ),
+    "equipment_types": lambda db: EquipmentsService(db).get_equipment_types(),
+    "systems": lambda db, country, systems, status, date, fields: SystemsService(db).get_systems(
+        Countries(country),
+        _optional(systems),
+        _optional(status, Status),
+        _optional(date),
+        _optional(fields, SystemField),
+    ),
+    "all_systems": lambda db, country, systems: SystemsService(db).get_total_systems(
+        Countries(country) if country else None, _optional(systems)
+    ),
+    "system_types": lambda db: SystemsService(db).get_system_types(),
+    "search_index": lambda db, kind: SystemsService(db).search_index(kind),
+}
+
+
+def queries_to_warm() -> list[tuple]:
+    """Configured canonical queries followed by the hottest keys, without duplicates."""
+    keys = [key for group in settings.cache_warm_queries for key in CANONICAL_QUERIES[group]]
+    if settings.cache_warm_hot_keys > 0:
+        keys += query_cache.hot_keys(settings.cache_warm_hot_keys)
+    return [key for key in dict.fromkeys(keys) if key[0] in WARMERS]
+
+
+def warm_caches(keys: list[tuple] | None = None, session_factory=SessionLocal) -> int:
+    """Run the given cache keys (default: queries_to_warm()) and return how many succeeded."""
+    keys = queries_to_warm() if keys is None else keys
+    query_cache.set_warmed(keys)
+
+    def warm(key) -> bool:
+        db = session_factory()
+        try:
+            kind, *args = key
+            WARMERS[kind](db, *args)
+            return True
+        except Exception as e:
+            print(f"⚠ Warning: Failed to warm cache for {key}: {e}")
+            return False
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=max(1, settings.cache_warm_concurrency)) as pool:
+        warmed = sum(pool.map(warm, keys))
+    print(f"✓ Warmed {warmed}/{len(keys)} cached queries")
+    return warmed
+
+
+def start_cache_warming() -> threading.Thread:
+    """Warm the caches in a background thread."""
+    thread = threading.Thread(target=warm_caches, name="cache-warming", daemon=True)
+    thread.start()
+    return thread
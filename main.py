@@ -4,28 +4,35 @@ FastAPI application for War Track Dashboard API.
 
 from contextlib import asynccontextmanager
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import Base, SessionLocal, engine
-from app.routers import equipments, import_router, systems
+from app.cache import cache_stats
+from app.database import Base, SessionLocal, engine, read_replicas, settings
+from app.metrics import MetricsMiddleware, install_query_metrics, metrics_enabled, render_metrics
+from app.middleware import CompressionMiddleware
+from app.pool import pool_status
+from app.routers import batch, equipments, export, import_router, systems
 from app.services.equipments_service import EquipmentsService
 from app.services.systems_service import SystemsService
+from app.slow_queries import QueryContextMiddleware, install_slow_query_log, slow_query_log
+from app.warming import start_cache_warming, warm_caches
 
-# Initialize scheduler
-scheduler = AsyncIOScheduler()
+# Created on startup; apscheduler is imported there to keep it out of import time
+scheduler = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifetime events for the application."""
+    global scheduler
+
     # Startup
     print("Starting War Track Dashboard API...")
 
-    # Ensure database tables exist
-    Base.metadata.create_all(bind=engine)
+    # Ensure database tables exist (scripts/run_migrations.py manages them otherwise)
+    if settings.db_create_all:
+        Base.metadata.create_all(bind=engine)
 
     # Check if database is empty and import historical data if needed
     db = SessionLocal()
@@ -33,8 +40,7 @@ async def lifespan(app: FastAPI):
         from app.models import Equipment
 
         # Check if we have any equipment data
-        equipment_count = db.query(Equipment).count()
-        if equipment_count == 0:
+        if db.query(Equipment.id).first() is None:
             print("Database is empty - importing historical data...")
             equipments_service = EquipmentsService(db)
             systems_service = SystemsService(db)
@@ -45,16 +51,14 @@ async def lifespan(app: FastAPI):
                 equipments_service.import_all_equipments()
                 print("Importing all historical system data...")
                 systems_service.import_systems(import_all=True)
-                systems_service.import_all_systems()
                 print("✓ Historical data import completed")
+                start_cache_warming()
             except Exception as e:
                 print(f"⚠ Warning: Failed to import historical data on startup: {e}")
                 print("You can manually import using: python scripts/import_historical_data.py")
                 print("Or via API: POST /api/import/historical")
         else:
-            print(
-                f"Database already has {equipment_count} equipment records - skipping historical import"
-            )
+            print("Database already has equipment records - skipping historical import")
     except Exception as e:
         print(f"⚠ Warning: Could not check database status: {e}")
     finally:
@@ -73,14 +77,18 @@ async def lifespan(app: FastAPI):
             equipments_service.import_equipments(import_all=False)
             equipments_service.import_all_equipments()
             systems_service.import_systems(import_all=False)
-            systems_service.import_all_systems()
             print("Scheduled import completed")
+            warm_caches()
         except Exception as e:
             print(f"Error during scheduled import: {e}")
         finally:
             db.close()
 
     # Schedule daily import at 1 PM
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from apscheduler.triggers.cron import CronTrigger
+
+    scheduler = AsyncIOScheduler()
     scheduler.add_job(
         import_all_data,
         trigger=CronTrigger(hour=13, minute=0),
@@ -114,10 +122,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression (zstd/brotli/gzip)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    cache_size=settings.compression_cache_size,
+)
+
+# Slow statements are logged with the route that issued them
+if settings.slow_query_log:
+    app.add_middleware(QueryContextMiddleware)
+    install_slow_query_log()
+
+# Request and database metrics; added last so that it times the whole stack
+if metrics_enabled():
+    app.add_middleware(MetricsMiddleware)
+    install_query_metrics()
+
 # Include routers
 app.include_router(equipments.router)
 app.include_router(systems.router)
 app.include_router(import_router.router)
+app.include_router(export.router)
+app.include_router(batch.router)
 
 
 @app.get("/", tags=["Root"])
@@ -136,6 +163,42 @@ def health():
     return {"status": "healthy"}
 
 
+@app.get("/health/pool", tags=["Health"])
+def health_pool():
+    """Database connection pool usage."""
+    return pool_status(engine)
+
+
+@app.get("/health/cache", tags=["Health"])
+def health_cache():
+    """Query cache hit ratio and database calls saved by request coalescing."""
+    return cache_stats()
+
+
+@app.get("/metrics", tags=["Health"])
+def metrics():
+    """Prometheus metrics for every worker process."""
+    try:
+        content, content_type = render_metrics()
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return Response(content=content, media_type=content_type)
+
+
+@app.get("/health/replicas", tags=["Health"])
+def health_replicas():
+    """Read replica health, replay lag and whether reads currently go to the primary."""
+    return read_replicas.status()
+
+
+@app.get("/debug/slow-queries", tags=["Debug"], include_in_schema=settings.debug_endpoints)
+def debug_slow_queries(limit: int = Query(10, ge=1, le=100, description="Number of shapes")):
+    """Slowest normalized query shapes seen by this process, with sampled plans."""
+    if not settings.debug_endpoints:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return slow_query_log.top(limit)
+
+
 if __name__ == "__main__":
     import uvicorn
 
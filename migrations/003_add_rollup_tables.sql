@@ -0,0 +1,44 @@
+-- Rollup tables for the hot aggregates, refreshed at the end of each import
+
+-- Equipment totals across all types per country and date
+CREATE TABLE IF NOT EXISTS equipment_daily_total (
+    id SERIAL PRIMARY KEY,
+    country VARCHAR NOT NULL,
+    date VARCHAR NOT NULL,
+    destroyed INTEGER NOT NULL,
+    abandoned INTEGER NOT NULL,
+    captured INTEGER NOT NULL,
+    damaged INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    CONSTRAINT uq_equipment_daily_total_country_date UNIQUE (country, date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_equipment_daily_total_date ON equipment_daily_total(date);
+
+-- System entry counts per country, system, status and date
+CREATE TABLE IF NOT EXISTS system_daily_status (
+    id SERIAL PRIMARY KEY,
+    country VARCHAR NOT NULL,
+    system VARCHAR NOT NULL,
+    status VARCHAR NOT NULL,
+    date VARCHAR NOT NULL,
+    count INTEGER NOT NULL,
+    CONSTRAINT uq_system_daily_status_country_system_status_date
+        UNIQUE (country, system, status, date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_system_daily_status_date ON system_daily_status(date);
+
+-- Backfill from existing data
+INSERT INTO equipment_daily_total (country, date, destroyed, abandoned, captured, damaged, total)
+SELECT country, date, SUM(destroyed), SUM(abandoned), SUM(captured), SUM(damaged), SUM(total)
+FROM equipment
+WHERE type <> 'All Types'
+GROUP BY country, date
+ON CONFLICT (country, date) DO NOTHING;
+
+INSERT INTO system_daily_status (country, system, status, date, count)
+SELECT country, system, status, date, COUNT(*)
+FROM system
+GROUP BY country, system, status, date
+ON CONFLICT (country, system, status, date) DO NOTHING;
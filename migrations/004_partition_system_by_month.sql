@@ -0,0 +1,123 @@
+-- Monthly range partitioning of the system table on date
+--
+-- Rows are copied into a new partitioned table while the old one stays
+-- readable. This is not an online migration: the SHARE lock blocks writes
+-- until commit, so imports wait (and the scheduled one may time out) for
+-- the whole copy. Run it outside the daily import window; the copy takes
+-- roughly as long as a full-table INSERT ... SELECT of system. The tables
+-- are swapped by renaming at the end, so reads block only for the final
+-- renames. The old table is kept as system_unpartitioned; drop it once the
+-- new table has been verified.
+--
+-- Rows whose date does not start with a valid YYYY-MM month (empty or
+-- malformed strings) go to the DEFAULT partition system_default instead of
+-- aborting the copy.
+
+-- First day of the month of a YYYY-MM-DD string; NULL when it has no valid month
+CREATE OR REPLACE FUNCTION system_partition_month(date_value VARCHAR)
+RETURNS DATE AS $$
+    SELECT CASE
+        WHEN date_value ~ '^[0-9]{4}-(0[1-9]|1[0-2])' THEN to_date(left(date_value, 7), 'YYYY-MM')
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Create the partition of system (or another parent) holding the month of month_start.
+-- Imports call this for the months they write to. Rows of that month already in the
+-- DEFAULT partition are moved into the new partition, which could not be created otherwise.
+-- The parent is resolved on each call: a REGCLASS default would keep pointing at the
+-- table renamed to system_unpartitioned below.
+CREATE OR REPLACE FUNCTION create_system_partition(month_start DATE, parent REGCLASS DEFAULT NULL)
+RETURNS void AS $$
+DECLARE
+    target REGCLASS := COALESCE(parent, 'system'::regclass);
+    first_day DATE := date_trunc('month', month_start)::date;
+    partition_name TEXT := 'system_' || to_char(first_day, 'YYYY_MM');
+    range_start TEXT := to_char(first_day, 'YYYY-MM-DD');
+    range_end TEXT := to_char(first_day + INTERVAL '1 month', 'YYYY-MM-DD');
+    default_partition REGCLASS;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    SELECT i.inhrelid::regclass INTO default_partition
+    FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = target AND c.relpartbound IS NOT NULL
+      AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT';
+
+    IF default_partition IS NOT NULL THEN
+        EXECUTE format(
+            'CREATE TEMP TABLE system_partition_moved ON COMMIT DROP AS '
+            'WITH moved AS (DELETE FROM %s WHERE date >= %L AND date < %L RETURNING *) '
+            'SELECT * FROM moved',
+            default_partition, range_start, range_end
+        );
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+        partition_name, target, range_start, range_end
+    );
+
+    IF default_partition IS NOT NULL THEN
+        EXECUTE format('INSERT INTO %s SELECT * FROM system_partition_moved', target);
+        DROP TABLE system_partition_moved;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    month_start DATE;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'system'::regclass) = 'p' THEN
+        RETURN;
+    END IF;
+
+    LOCK TABLE system IN SHARE MODE;
+
+    CREATE TABLE system_partitioned (LIKE system INCLUDING DEFAULTS) PARTITION BY RANGE (date);
+    ALTER TABLE system_partitioned
+        ADD CONSTRAINT system_partitioned_pkey PRIMARY KEY (id, date),
+        ADD CONSTRAINT uq_system_partitioned_country_system_url_date
+            UNIQUE (country, system, url, date);
+    CREATE INDEX idx_system_partitioned_country ON system_partitioned(LOWER(country));
+    CREATE INDEX idx_system_partitioned_system ON system_partitioned(system);
+    CREATE INDEX idx_system_partitioned_status ON system_partitioned(status);
+    CREATE INDEX idx_system_partitioned_date ON system_partitioned(date);
+
+    FOR month_start IN
+        SELECT DISTINCT system_partition_month(date) FROM system
+        WHERE system_partition_month(date) IS NOT NULL
+    LOOP
+        PERFORM create_system_partition(month_start, 'system_partitioned');
+    END LOOP;
+    CREATE TABLE system_default PARTITION OF system_partitioned DEFAULT;
+
+    INSERT INTO system_partitioned SELECT * FROM system;
+
+    -- Swap the tables and their constraint and index names
+    ALTER TABLE system RENAME TO system_unpartitioned;
+    ALTER TABLE system_unpartitioned
+        RENAME CONSTRAINT uq_system_country_system_url_date
+        TO uq_system_unpartitioned_country_system_url_date;
+    ALTER INDEX IF EXISTS system_pkey RENAME TO system_unpartitioned_pkey;
+    ALTER INDEX IF EXISTS idx_system_unique RENAME TO idx_system_unpartitioned_unique;
+    ALTER INDEX IF EXISTS idx_system_country RENAME TO idx_system_unpartitioned_country;
+    ALTER INDEX IF EXISTS idx_system_system RENAME TO idx_system_unpartitioned_system;
+    ALTER INDEX IF EXISTS idx_system_status RENAME TO idx_system_unpartitioned_status;
+    ALTER INDEX IF EXISTS idx_system_date RENAME TO idx_system_unpartitioned_date;
+
+    ALTER TABLE system_partitioned RENAME TO system;
+    ALTER TABLE system RENAME CONSTRAINT system_partitioned_pkey TO system_pkey;
+    ALTER TABLE system
+        RENAME CONSTRAINT uq_system_partitioned_country_system_url_date
+        TO uq_system_country_system_url_date;
+    ALTER INDEX idx_system_partitioned_country RENAME TO idx_system_country;
+    ALTER INDEX idx_system_partitioned_system RENAME TO idx_system_system;
+    ALTER INDEX idx_system_partitioned_status RENAME TO idx_system_status;
+    ALTER INDEX idx_system_partitioned_date RENAME TO idx_system_date;
+
+    ALTER SEQUENCE IF EXISTS system_id_seq OWNED BY system.id;
+END;
+$$;
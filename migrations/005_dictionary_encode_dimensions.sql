@@ -0,0 +1,227 @@
+-- Dictionary-encode the repeated strings of the equipment and system tables
+--
+-- country, origin, system, status, type and url values move to dimension
+-- tables (dim_*) and the fact tables store their integer ids. Views named
+-- equipment and system decode the ids back to strings, so existing queries,
+-- exports and rollup refreshes keep working unchanged. INSTEAD OF INSERT
+-- triggers on the views look up or create the ids and upsert into the fact
+-- tables.
+--
+-- As in 004, rows are copied while the old tables stay readable and the
+-- names are swapped at the end. The old tables are kept as
+-- equipment_unencoded and system_unencoded; drop them once verified.
+
+CREATE TABLE IF NOT EXISTS dim_country (id SMALLSERIAL PRIMARY KEY, value VARCHAR NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS dim_origin (id SMALLSERIAL PRIMARY KEY, value VARCHAR NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS dim_status (id SMALLSERIAL PRIMARY KEY, value VARCHAR NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS dim_type (id SMALLSERIAL PRIMARY KEY, value VARCHAR NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS dim_system (id SERIAL PRIMARY KEY, value VARCHAR NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS dim_url (id SERIAL PRIMARY KEY, value VARCHAR NOT NULL UNIQUE);
+
+-- Id of dimension_value in the given dim_* table, adding it when missing
+CREATE OR REPLACE FUNCTION dimension_id(dimension REGCLASS, dimension_value VARCHAR)
+RETURNS INTEGER AS $$
+DECLARE
+    result INTEGER;
+BEGIN
+    EXECUTE format('SELECT id FROM %s WHERE value = $1', dimension)
+        INTO result USING dimension_value;
+    IF result IS NULL THEN
+        EXECUTE format(
+            'INSERT INTO %s (value) VALUES ($1) '
+            'ON CONFLICT (value) DO UPDATE SET value = EXCLUDED.value RETURNING id',
+            dimension
+        ) INTO result USING dimension_value;
+    END IF;
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partitions now belong to system_fact once it exists. As in 004, rows of the
+-- month already in the DEFAULT partition are moved into the new partition.
+CREATE OR REPLACE FUNCTION create_system_partition(month_start DATE, parent REGCLASS DEFAULT NULL)
+RETURNS void AS $$
+DECLARE
+    first_day DATE := date_trunc('month', month_start)::date;
+    target REGCLASS := COALESCE(parent, to_regclass('system_fact'), 'system'::regclass);
+    prefix TEXT := CASE WHEN target = to_regclass('system_fact') THEN 'system_fact_' ELSE 'system_' END;
+    partition_name TEXT := prefix || to_char(first_day, 'YYYY_MM');
+    range_start TEXT := to_char(first_day, 'YYYY-MM-DD');
+    range_end TEXT := to_char(first_day + INTERVAL '1 month', 'YYYY-MM-DD');
+    default_partition REGCLASS;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    SELECT i.inhrelid::regclass INTO default_partition
+    FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = target AND c.relpartbound IS NOT NULL
+      AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT';
+
+    IF default_partition IS NOT NULL THEN
+        EXECUTE format(
+            'CREATE TEMP TABLE system_partition_moved ON COMMIT DROP AS '
+            'WITH moved AS (DELETE FROM %s WHERE date >= %L AND date < %L RETURNING *) '
+            'SELECT * FROM moved',
+            default_partition, range_start, range_end
+        );
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+        partition_name, target, range_start, range_end
+    );
+
+    IF default_partition IS NOT NULL THEN
+        EXECUTE format('INSERT INTO %s SELECT * FROM system_partition_moved', target);
+        DROP TABLE system_partition_moved;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    month_start DATE;
+BEGIN
+    IF to_regclass('system_fact') IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    LOCK TABLE equipment, system IN SHARE MODE;
+
+    INSERT INTO dim_country (value)
+        SELECT country FROM equipment UNION SELECT country FROM system
+        ON CONFLICT DO NOTHING;
+    INSERT INTO dim_type (value) SELECT DISTINCT type FROM equipment ON CONFLICT DO NOTHING;
+    INSERT INTO dim_origin (value) SELECT DISTINCT origin FROM system ON CONFLICT DO NOTHING;
+    INSERT INTO dim_system (value) SELECT DISTINCT system FROM system ON CONFLICT DO NOTHING;
+    INSERT INTO dim_status (value) SELECT DISTINCT status FROM system ON CONFLICT DO NOTHING;
+    INSERT INTO dim_url (value) SELECT DISTINCT url FROM system ON CONFLICT DO NOTHING;
+
+    -- Equipment
+    CREATE TABLE equipment_fact (
+        id INTEGER NOT NULL DEFAULT nextval('equipment_id_seq') PRIMARY KEY,
+        country_id SMALLINT NOT NULL REFERENCES dim_country(id),
+        type_id SMALLINT NOT NULL REFERENCES dim_type(id),
+        destroyed INTEGER NOT NULL,
+        abandoned INTEGER NOT NULL,
+        captured INTEGER NOT NULL,
+        damaged INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        date VARCHAR NOT NULL,
+        CONSTRAINT uq_equipment_fact_country_type_date UNIQUE (country_id, type_id, date)
+    );
+    CREATE INDEX idx_equipment_fact_type ON equipment_fact(type_id);
+    CREATE INDEX idx_equipment_fact_date ON equipment_fact(date);
+
+    INSERT INTO equipment_fact
+    SELECT e.id, c.id, t.id, e.destroyed, e.abandoned, e.captured, e.damaged, e.total, e.date
+    FROM equipment e
+    JOIN dim_country c ON c.value = e.country
+    JOIN dim_type t ON t.value = e.type;
+
+    -- System, partitioned by month like 004
+    CREATE TABLE system_fact (
+        id INTEGER NOT NULL DEFAULT nextval('system_id_seq'),
+        country_id SMALLINT NOT NULL REFERENCES dim_country(id),
+        origin_id SMALLINT NOT NULL REFERENCES dim_origin(id),
+        system_id INTEGER NOT NULL REFERENCES dim_system(id),
+        status_id SMALLINT NOT NULL REFERENCES dim_status(id),
+        url_id INTEGER NOT NULL REFERENCES dim_url(id),
+        date VARCHAR NOT NULL,
+        CONSTRAINT system_fact_pkey PRIMARY KEY (id, date),
+        CONSTRAINT uq_system_fact_country_system_url_date UNIQUE (country_id, system_id, url_id, date)
+    ) PARTITION BY RANGE (date);
+    CREATE INDEX idx_system_fact_system ON system_fact(system_id);
+    CREATE INDEX idx_system_fact_status ON system_fact(status_id);
+    CREATE INDEX idx_system_fact_date ON system_fact(date);
+
+    FOR month_start IN
+        SELECT DISTINCT system_partition_month(date) FROM system
+        WHERE system_partition_month(date) IS NOT NULL
+    LOOP
+        PERFORM create_system_partition(month_start, 'system_fact');
+    END LOOP;
+    CREATE TABLE system_fact_default PARTITION OF system_fact DEFAULT;
+
+    INSERT INTO system_fact
+    SELECT s.id, c.id, o.id, y.id, t.id, u.id, s.date
+    FROM system s
+    JOIN dim_country c ON c.value = s.country
+    JOIN dim_origin o ON o.value = s.origin
+    JOIN dim_system y ON y.value = s.system
+    JOIN dim_status t ON t.value = s.status
+    JOIN dim_url u ON u.value = s.url;
+
+    -- Swap the old tables for decoding views
+    ALTER TABLE equipment RENAME TO equipment_unencoded;
+    ALTER TABLE system RENAME TO system_unencoded;
+    ALTER SEQUENCE equipment_id_seq OWNED BY equipment_fact.id;
+    ALTER SEQUENCE system_id_seq OWNED BY system_fact.id;
+
+    CREATE VIEW equipment AS
+    SELECT f.id, c.value AS country, t.value AS type,
+           f.destroyed, f.abandoned, f.captured, f.damaged, f.total, f.date
+    FROM equipment_fact f
+    JOIN dim_country c ON c.id = f.country_id
+    JOIN dim_type t ON t.id = f.type_id;
+
+    CREATE VIEW system AS
+    SELECT f.id, c.value AS country, o.value AS origin, y.value AS system,
+           t.value AS status, u.value AS url, f.date
+    FROM system_fact f
+    JOIN dim_country c ON c.id = f.country_id
+    JOIN dim_origin o ON o.id = f.origin_id
+    JOIN dim_system y ON y.id = f.system_id
+    JOIN dim_status t ON t.id = f.status_id
+    JOIN dim_url u ON u.id = f.url_id;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION equipment_view_insert() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO equipment_fact
+        (country_id, type_id, destroyed, abandoned, captured, damaged, total, date)
+    VALUES (
+        dimension_id('dim_country', NEW.country),
+        dimension_id('dim_type', NEW.type),
+        NEW.destroyed, NEW.abandoned, NEW.captured, NEW.damaged, NEW.total, NEW.date
+    )
+    ON CONFLICT (country_id, type_id, date) DO UPDATE SET
+        destroyed = EXCLUDED.destroyed,
+        abandoned = EXCLUDED.abandoned,
+        captured = EXCLUDED.captured,
+        damaged = EXCLUDED.damaged,
+        total = EXCLUDED.total
+    RETURNING id INTO NEW.id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION system_view_insert() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO system_fact (country_id, origin_id, system_id, status_id, url_id, date)
+    VALUES (
+        dimension_id('dim_country', NEW.country),
+        dimension_id('dim_origin', NEW.origin),
+        dimension_id('dim_system', NEW.system),
+        dimension_id('dim_status', NEW.status),
+        dimension_id('dim_url', NEW.url),
+        NEW.date
+    )
+    ON CONFLICT (country_id, system_id, url_id, date) DO UPDATE SET
+        origin_id = EXCLUDED.origin_id,
+        status_id = EXCLUDED.status_id
+    RETURNING id INTO NEW.id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS equipment_view_insert ON equipment;
+CREATE TRIGGER equipment_view_insert INSTEAD OF INSERT ON equipment
+    FOR EACH ROW EXECUTE FUNCTION equipment_view_insert();
+
+DROP TRIGGER IF EXISTS system_view_insert ON system;
+CREATE TRIGGER system_view_insert INSTEAD OF INSERT ON system
+    FOR EACH ROW EXECUTE FUNCTION system_view_insert();
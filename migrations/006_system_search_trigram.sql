@@ -0,0 +1,9 @@
+-- Trigram index for searching system names (GET /api/stats/system-types/search)
+--
+-- The GIN index serves both the prefix (ILIKE 'abc%') and the fuzzy
+-- (similarity, the % operator) matches of the search endpoint.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_all_system_system_trgm
+    ON all_system USING gin (system gin_trgm_ops);
@@ -0,0 +1,31 @@
+-- Calendar of equipment import dates for change-only storage (EQUIPMENT_STORAGE=changes)
+--
+-- With change-only storage, a date on which no equipment count changed has
+-- no equipment rows, so the imported dates are kept here. Readers rebuild
+-- the dense daily series over these dates.
+
+CREATE TABLE IF NOT EXISTS equipment_date (
+    date VARCHAR PRIMARY KEY
+);
+
+INSERT INTO equipment_date (date)
+SELECT DISTINCT date FROM equipment
+ON CONFLICT DO NOTHING;
+
+-- Compacting deletes repeated rows; let the decoding view of 005 accept that
+CREATE OR REPLACE FUNCTION equipment_view_delete() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM equipment_fact WHERE id = OLD.id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF to_regclass('equipment_fact') IS NOT NULL THEN
+        DROP TRIGGER IF EXISTS equipment_view_delete ON equipment;
+        CREATE TRIGGER equipment_view_delete INSTEAD OF DELETE ON equipment
+            FOR EACH ROW EXECUTE FUNCTION equipment_view_delete();
+    END IF;
+END;
+$$;
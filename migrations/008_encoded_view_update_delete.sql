@@ -0,0 +1,75 @@
+-- UPDATE and DELETE through the decoding views of 005
+--
+-- 005 only gave the equipment and system views INSTEAD OF INSERT triggers
+-- (007 added DELETE for equipment), so ORM or SQL updates and deletes of
+-- system rows, and updates of equipment rows, failed on encoded databases.
+-- These triggers apply them to equipment_fact and system_fact, looking up
+-- or creating the dimension ids of the new values. Changing the date of a
+-- system row moves it to the matching partition.
+
+CREATE OR REPLACE FUNCTION equipment_view_update() RETURNS trigger AS $$
+BEGIN
+    UPDATE equipment_fact SET
+        id = NEW.id,
+        country_id = dimension_id('dim_country', NEW.country),
+        type_id = dimension_id('dim_type', NEW.type),
+        destroyed = NEW.destroyed,
+        abandoned = NEW.abandoned,
+        captured = NEW.captured,
+        damaged = NEW.damaged,
+        total = NEW.total,
+        date = NEW.date
+    WHERE id = OLD.id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION equipment_view_delete() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM equipment_fact WHERE id = OLD.id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION system_view_update() RETURNS trigger AS $$
+BEGIN
+    UPDATE system_fact SET
+        id = NEW.id,
+        country_id = dimension_id('dim_country', NEW.country),
+        origin_id = dimension_id('dim_origin', NEW.origin),
+        system_id = dimension_id('dim_system', NEW.system),
+        status_id = dimension_id('dim_status', NEW.status),
+        url_id = dimension_id('dim_url', NEW.url),
+        date = NEW.date
+    WHERE id = OLD.id AND date = OLD.date;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION system_view_delete() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM system_fact WHERE id = OLD.id AND date = OLD.date;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF to_regclass('equipment_fact') IS NOT NULL THEN
+        DROP TRIGGER IF EXISTS equipment_view_update ON equipment;
+        CREATE TRIGGER equipment_view_update INSTEAD OF UPDATE ON equipment
+            FOR EACH ROW EXECUTE FUNCTION equipment_view_update();
+        DROP TRIGGER IF EXISTS equipment_view_delete ON equipment;
+        CREATE TRIGGER equipment_view_delete INSTEAD OF DELETE ON equipment
+            FOR EACH ROW EXECUTE FUNCTION equipment_view_delete();
+    END IF;
+    IF to_regclass('system_fact') IS NOT NULL THEN
+        DROP TRIGGER IF EXISTS system_view_update ON system;
+        CREATE TRIGGER system_view_update INSTEAD OF UPDATE ON system
+            FOR EACH ROW EXECUTE FUNCTION system_view_update();
+        DROP TRIGGER IF EXISTS system_view_delete ON system;
+        CREATE TRIGGER system_view_delete INSTEAD OF DELETE ON system
+            FOR EACH ROW EXECUTE FUNCTION system_view_delete();
+    END IF;
+END;
+$$;
@@ -0,0 +1,16 @@
+-- Series ends for change-only equipment storage (EQUIPMENT_STORAGE=changes)
+--
+-- Readers of 007 carried the last stored row of every (country, type) series
+-- over all later calendar dates, so a type that stopped being reported kept
+-- appearing. Imports and compaction now record here the first imported date
+-- on which a series was missing, and readers stop the series there.
+-- Databases compacted before this migration have no recorded ends, so a
+-- series that disappeared earlier is still carried forward until the table
+-- is rebuilt from a dense import and compacted again.
+
+CREATE TABLE IF NOT EXISTS equipment_series_end (
+    country VARCHAR NOT NULL,
+    type VARCHAR NOT NULL,
+    date VARCHAR NOT NULL,
+    PRIMARY KEY (country, type, date)
+);
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Check that the all_system totals match a recount of the system entries.
+
+Imports keep all_system in sync for the (country, system) keys they write;
+this verifies the whole table and lists every mismatching key. With
+--repair, the table is rebuilt from the entries afterwards.
+
+Examples:
+    python scripts/check_all_system.py
+    python scripts/check_all_system.py --repair
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.rollups import check_all_system
+from app.services.systems_service import SystemsService
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--repair", action="store_true", help="Rebuild all_system when it is inconsistent"
+    )
+    return parser.parse_args(argv)
+
+
+def check(args) -> bool:
+    """Print mismatches and return whether all_system is consistent (after any repair)."""
+    db = SessionLocal()
+    try:
+        mismatches = check_all_system(db)
+        for item in mismatches:
+            print(
+                f"✗ {item['country']} / {item['system']}: "
+                f"stored {item['stored']}, expected {item['expected']}"
+            )
+        if not mismatches:
+            print("✓ all_system matches the system entries")
+            return True
+
+        print(f"✗ {len(mismatches)} inconsistent all_system keys")
+        if args.repair:
+            SystemsService(db).import_all_systems()
+            print("✓ all_system rebuilt from the system entries")
+            return True
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(0 if check(parse_args()) else 1)
+    except Exception as e:
+        print(f"✗ Check failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Convert the equipment table between dense and change-only storage.
+
+Compacting deletes every row whose counts repeat the previous date of its
+(country, type) series, fills the equipment_date calendar and records
+where series stop being reported in equipment_series_end; set
+EQUIPMENT_STORAGE=changes afterwards so readers carry the remaining rows
+forward. --expand writes the carried rows back for EQUIPMENT_STORAGE=dense.
+On PostgreSQL, run VACUUM FULL on the table to return the freed space.
+
+Examples:
+    python scripts/compact_equipment.py
+    python scripts/compact_equipment.py --expand
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.equipment_storage import compact_equipment, expand_equipment
+from app.models import Equipment
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--expand", action="store_true", help="Write carried rows back (change-only to dense)"
+    )
+    return parser.parse_args(argv)
+
+
+def convert(args):
+    db = SessionLocal()
+    try:
+        before = db.query(Equipment).count()
+        if args.expand:
+            changed = expand_equipment(db)
+            print(f"✓ Wrote {changed} carried equipment rows back")
+        else:
+            changed = compact_equipment(db)
+            print(f"✓ Deleted {changed} repeated equipment rows")
+        db.commit()
+        after = db.query(Equipment).count()
+        print(f"  equipment rows: {before} -> {after}")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    try:
+        convert(parse_args())
+    except Exception as e:
+        print(f"✗ Conversion failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Export equipment and system tables to Arrow IPC stream or Parquet files.
+
+Rows are written in record batches, so exporting the full history uses bounded memory.
+
+Examples:
+    python scripts/export_data.py equipment --format parquet -o equipment.parquet
+    python scripts/export_data.py system --country ukraine --date-from 2024-01-01 -o system.arrow
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.enums import Countries, EquipmentType, ExportFormat, ExportTable, Status
+from app.services.export_service import DEFAULT_BATCH_SIZE, ExportService
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("table", choices=[t.value for t in ExportTable])
+    parser.add_argument(
+        "--format",
+        choices=[f.value for f in ExportFormat],
+        default=ExportFormat.PARQUET.value,
+    )
+    parser.add_argument("-o", "--output", help="Output file (default: <table>.<format>)")
+    parser.add_argument("--country", choices=[c.value for c in Countries], default="all")
+    parser.add_argument("--type", dest="types", action="append", help="Equipment type")
+    parser.add_argument("--system", dest="systems", action="append", help="System name")
+    parser.add_argument("--status", action="append", choices=[s.value for s in Status])
+    parser.add_argument("--date-from", help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--date-to", help="End date (YYYY-MM-DD)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    return parser.parse_args(argv)
+
+
+def export_data(args):
+    """Export one table to a file."""
+    table = ExportTable(args.table)
+    export_format = ExportFormat(args.format)
+    output = args.output or f"{table.value}.{export_format.value}"
+
+    date = None
+    if args.date_from or args.date_to:
+        date = [args.date_from or "0000-01-01", args.date_to or "9999-12-31"]
+
+    filters = {
+        "country": Countries(args.country),
+        "types": [EquipmentType(t) for t in args.types] if args.types else None,
+        "systems": args.systems,
+        "status": [Status(s) for s in args.status] if args.status else None,
+        "date": date,
+    }
+
+    db = SessionLocal()
+    try:
+        service = ExportService(db)
+        start = time.perf_counter()
+        if export_format == ExportFormat.PARQUET:
+            rows = service.write_parquet(output, table, args.batch_size, **filters)
+        else:
+            rows = service.write_arrow(output, table, args.batch_size, **filters)
+        elapsed = time.perf_counter() - start
+        print(f"✓ Exported {rows} {table.value} rows to {output} in {elapsed:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    try:
+        export_data(parse_args())
+    except Exception as e:
+        print(f"✗ Export failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Generate deterministic synthetic Oryx-scale data for load testing and profiling.
+
+Records have the shape OryxScraper returns. --output writes them as JSON
+lines (equipments.jsonl, all_equipments.jsonl, systems.jsonl) into a
+directory; --to-db bulk-inserts them into DATABASE_URL and rebuilds the
+rollups. The same options and --seed always produce the same data.
+
+Examples:
+    python scripts/generate_data.py --output data/ --days 30
+    python scripts/generate_data.py --to-db --days 1460 --entries-per-day 1000
+    python scripts/generate_data.py --to-db --replace --seed 7 --types 5 --systems 500
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.synthetic import START_DATE, SyntheticData
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--output", help="Directory to write JSON lines files into")
+    target.add_argument("--to-db", action="store_true", help="Insert into DATABASE_URL")
+    parser.add_argument("--days", type=int, default=365, help="Number of days (default: 365)")
+    parser.add_argument(
+        "--types", type=int, help="Number of equipment types (default: all of them)"
+    )
+    parser.add_argument(
+        "--systems", type=int, default=2000, help="Distinct system names (default: 2000)"
+    )
+    parser.add_argument(
+        "--entries-per-day", type=int, default=50, help="New system entries per day (default: 50)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        default=START_DATE,
+        help=f"First date, YYYY-MM-DD (default: {START_DATE})",
+    )
+    parser.add_argument(
+        "--replace", action="store_true", help="With --to-db, delete the existing rows first"
+    )
+    return parser.parse_args(argv)
+
+
+def write_files(data: SyntheticData, output: Path) -> dict:
+    output.mkdir(parents=True, exist_ok=True)
+    written = {}
+    for name, records in [
+        ("equipments", data.equipment_records()),
+        ("all_equipments", data.all_equipment_records()),
+        ("systems", data.system_records()),
+    ]:
+        count = 0
+        with open(output / f"{name}.jsonl", "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+                count += 1
+        written[f"{name}.jsonl"] = count
+    return written
+
+
+def write_database(data: SyntheticData, replace: bool) -> dict:
+    from app.database import SessionLocal
+    from app.synthetic import write_synthetic_data
+
+    db = SessionLocal()
+    try:
+        written = write_synthetic_data(db, data, replace=replace)
+        db.commit()
+        return written
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def generate(args):
+    data = SyntheticData(
+        days=args.days,
+        types=args.types,
+        systems=args.systems,
+        entries_per_day=args.entries_per_day,
+        seed=args.seed,
+        start=args.start,
+    )
+    start = time.perf_counter()
+    if args.to_db:
+        written = write_database(data, args.replace)
+    else:
+        written = write_files(data, Path(args.output))
+    elapsed = time.perf_counter() - start
+
+    rows = sum(written.values())
+    for name, count in written.items():
+        print(f"  {name:<20} {count:>12,}")
+    print(f"✓ Generated {rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    try:
+        generate(parse_args())
+    except Exception as e:
+        print(f"✗ Generation failed: {e}")
+        sys.exit(1)
@@ -27,21 +27,17 @@ def import_historical_data():
         systems_service = SystemsService(db)
 
         # Import all equipment data (import_all=True)
-        print("\n[1/4] Importing historical equipment data...")
+        print("\n[1/3] Importing historical equipment data...")
         equipments_service.import_equipments(import_all=True)
 
         # Import all equipment totals
-        print("\n[2/4] Importing historical equipment totals...")
+        print("\n[2/3] Importing historical equipment totals...")
         equipments_service.import_all_equipments()
 
-        # Import all system data (import_all=True)
-        print("\n[3/4] Importing historical system data...")
+        # Import all system data (import_all=True), which also rebuilds the system totals
+        print("\n[3/3] Importing historical system data...")
         systems_service.import_systems(import_all=True)
 
-        # Import all system totals
-        print("\n[4/4] Importing historical system totals...")
-        systems_service.import_all_systems()
-
         print("\n" + "=" * 60)
         print("✓ Historical data import completed successfully!")
         print("=" * 60)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Measure on-disk size and query latency of the equipment and system tables.
+
+Run it before and after a storage migration (such as 005) and compare. Sizes
+cover the whole logical table: partitions, and for dictionary-encoded tables
+the fact table plus its dimension tables. Latencies are the median of
+several runs of representative service queries, with the query cache off.
+
+Examples:
+    python scripts/measure_storage.py
+    python scripts/measure_storage.py --runs 20 --json before.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import func, text
+
+from app.cache import query_cache
+from app.database import SessionLocal
+from app.enums import AggregateFunction, Bucket, Countries, EquipmentType, SystemDimension
+from app.models import System
+from app.services.equipments_service import EquipmentsService
+from app.services.systems_service import SystemsService
+
+# Relations that make up each logical table, in order of preference
+STORAGE = {
+    "equipment": ["equipment_fact", "dim_type", "equipment"],
+    "system": ["system_fact", "dim_origin", "dim_system", "dim_status", "dim_url", "system"],
+}
+
+# Counted in either form (the calendar and series ends of change-only equipment storage)
+EXTRA = {"equipment": ["equipment_date", "equipment_series_end"]}
+
+# Sum over the partitions of a partitioned table, or the table itself
+SIZE_QUERY = text("""
+    SELECT COALESCE(SUM(pg_table_size(relid)), 0), COALESCE(SUM(pg_indexes_size(relid)), 0)
+    FROM (
+        SELECT relid FROM pg_partition_tree(to_regclass(:name)) WHERE isleaf
+        UNION SELECT to_regclass(:name)
+    ) relations
+    """)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="Runs per query (default: 10)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    return parser.parse_args(argv)
+
+
+def table_sizes(db) -> dict:
+    """Heap and index bytes of each logical table."""
+    sizes = {}
+    for table, relations in STORAGE.items():
+        heap = indexes = 0
+        encoded = db.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"), {"name": relations[0]}
+        ).scalar()
+        names = (relations[:-1] if encoded else relations[-1:]) + EXTRA.get(table, [])
+        for name in names:
+            table_bytes, index_bytes = db.execute(SIZE_QUERY, {"name": name}).one()
+            heap += int(table_bytes)
+            indexes += int(index_bytes)
+        sizes[table] = {"relations": names, "table_bytes": heap, "index_bytes": indexes}
+    return sizes
+
+
+def query_latencies(db, runs: int) -> dict:
+    """Median milliseconds of representative equipment and system queries."""
+    equipments = EquipmentsService(db)
+    systems = SystemsService(db)
+    last = db.query(func.max(System.date)).scalar()
+    month = [last[:7] + "-01", last] if last else None
+    names = [r[0] for r in db.query(System.system).distinct().limit(3)]
+
+    queries = {
+        "equipments_country": lambda: equipments.get_equipments(Countries.UKRAINE),
+        "equipments_type": lambda: equipments.get_equipments(
+            Countries.ALL, types=[EquipmentType.TANKS]
+        ),
+        "systems_last_month": lambda: systems.get_systems(Countries.ALL, date=month),
+        "systems_by_name": lambda: systems.get_systems(Countries.ALL, systems=names),
+        "systems_aggregate_status": lambda: systems.aggregate_systems(
+            Countries.ALL,
+            bucket=Bucket.MONTH,
+            group_by=[SystemDimension.STATUS],
+            aggregates=[AggregateFunction.SUM],
+        ),
+    }
+    if not last:
+        queries = {k: v for k, v in queries.items() if k.startswith("equipments")}
+
+    latencies = {}
+    for name, run in queries.items():
+        timings = []
+        for _ in range(runs):
+            query_cache.invalidate()
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+        latencies[name] = round(statistics.median(timings), 2)
+    return latencies
+
+
+def measure(args):
+    db = SessionLocal()
+    try:
+        results = {"sizes": table_sizes(db), "latency_ms": query_latencies(db, args.runs)}
+    finally:
+        db.close()
+
+    for table, size in results["sizes"].items():
+        print(
+            f"{table:<10} table {size['table_bytes'] / 2**20:8.1f} MiB"
+            f"   indexes {size['index_bytes'] / 2**20:8.1f} MiB   ({', '.join(size['relations'])})"
+        )
+    for name, ms in results["latency_ms"].items():
+        print(f"{name:<26} {ms:8.2f} ms")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"✓ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    try:
+        measure(parse_args())
+    except Exception as e:
+        print(f"✗ Measurement failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Measure how long the API takes to start, with a breakdown of import time.
+
+Each run starts a fresh interpreter that imports main.py with
+``python -X importtime``. The script reports the median import time and the
+packages that contributed most to it. Self time is summed per top-level
+package, so ``sqlalchemy`` covers all of its submodules. --serve also starts
+uvicorn on DATABASE_URL and times the first successful /health response,
+which includes the startup hook. --budget fails the run when the median
+import time is above the given number of seconds.
+
+Examples:
+    python scripts/startup_benchmark.py
+    python scripts/startup_benchmark.py --runs 10 --top 15 --budget 0.8
+    DB_CREATE_ALL=false python scripts/startup_benchmark.py --serve
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).parent.parent
+IMPORT_MAIN = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters (default: 5)")
+    parser.add_argument("--top", type=int, default=10, help="Packages to list (default: 10)")
+    parser.add_argument("--serve", action="store_true", help="Also time uvicorn to first /health")
+    parser.add_argument("--port", type=int, default=8766, help="Port for --serve")
+    parser.add_argument("--budget", type=float, help="Fail above this median import time (s)")
+    return parser.parse_args(argv)
+
+
+def import_run() -> tuple[float, dict[str, int], dict[str, int]]:
+    """
+    One fresh import of main. Returns the wall time in seconds, the self time
+    per top-level package, and the cumulative time of each app module (µs).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_MAIN],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    packages = defaultdict(int)
+    app_modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, module = match.groups()
+        packages[module.split(".")[0]] += int(self_us)
+        if module == "main" or module.startswith("app."):
+            app_modules[module] = int(cumulative_us)
+    return float(result.stdout.strip().splitlines()[-1]), packages, app_modules
+
+
+def serve_run(port: int) -> float:
+    """Seconds from starting uvicorn until /health answers."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "error"],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < 60:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        raise RuntimeError("the app did not answer /health within 60s")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def benchmark(args) -> bool:
+    timings, packages, app_modules = [], defaultdict(list), defaultdict(list)
+    for _ in range(args.runs):
+        seconds, run_packages, run_modules = import_run()
+        timings.append(seconds)
+        for name, us in run_packages.items():
+            packages[name].append(us)
+        for name, us in run_modules.items():
+            app_modules[name].append(us)
+
+    median = statistics.median(timings)
+    print(f"import main: median {median * 1000:.0f} ms over {args.runs} runs")
+    print(f"  min {min(timings) * 1000:.0f} ms, max {max(timings) * 1000:.0f} ms")
+
+    print(f"\nTop {args.top} packages by self time (median):")
+    ranked = sorted(packages.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, values in ranked[: args.top]:
+        print(f"  {name:<30} {statistics.median(values) / 1000:8.1f} ms")
+
+    print(f"\nTop {args.top} app modules by cumulative time (median):")
+    ranked = sorted(app_modules.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, values in ranked[: args.top]:
+        print(f"  {name:<30} {statistics.median(values) / 1000:8.1f} ms")
+
+    if args.serve:
+        print(f"\nuvicorn to first /health: {serve_run(args.port) * 1000:.0f} ms")
+
+    if args.budget is not None and median > args.budget:
+        print(f"\n✗ Median import time {median:.3f}s is over the {args.budget:.3f}s budget")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(0 if benchmark(parse_args()) else 1)
+    except Exception as e:
+        print(f"✗ Startup benchmark failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,82 @@
+"""
+Tests for batch queries.
+"""
+
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from app.models import Equipment, System
+from app.schemas import BatchRequest, BatchResult, EquipmentsBatchResult, SystemsBatchResult
+from app.services.batch_service import BatchService
+
+
+@pytest.mark.unit
+def test_batch_service_results_keyed_by_id(db_session, sample_equipment_data, sample_system_data):
+    """Test merged sub-queries return the same rows as separate queries."""
+    for country in ["ukraine", "russia"]:
+        data = sample_equipment_data.copy()
+        data["country"] = country
+        db_session.add(Equipment(**data))
+    db_session.add(System(**sample_system_data))
+    db_session.commit()
+
+    request = BatchRequest.model_validate(
+        {
+            "queries": [
+                {"id": "ua", "kind": "equipments", "country": "ukraine"},
+                {"id": "ru", "kind": "equipments", "country": "russia"},
+                {"id": "none", "kind": "equipments", "types": ["Aircraft"]},
+                {"id": "totals", "kind": "equipments", "fields": ["country", "total"]},
+                {"id": "systems", "kind": "systems", "status": ["destroyed"]},
+            ]
+        }
+    )
+    results = BatchService(db_session).run(request.queries)
+
+    assert [r.country for r in results["ua"].results] == ["ukraine"]
+    assert [r.country for r in results["ru"].results] == ["russia"]
+    assert results["none"].results == []
+    assert sorted(
+        r.model_dump(exclude_unset=True)["country"] for r in results["totals"].results
+    ) == ["russia", "ukraine"]
+    assert results["totals"].results[0].model_dump(exclude_unset=True).keys() == {
+        "country",
+        "total",
+    }
+    assert results["systems"].kind == "systems"
+    assert [r.system for r in results["systems"].results] == ["M1 Abrams"]
+
+
+@pytest.mark.unit
+def test_batch_results_are_tagged_by_kind():
+    """Test system rows are never read back as equipment rows."""
+    adapter = TypeAdapter(dict[str, BatchResult])
+    parsed = adapter.validate_python(
+        {
+            "s": {"kind": "systems", "results": [{"system": "T-72", "status": "destroyed"}]},
+            "e": {"kind": "equipments", "results": [{"type": "Tanks", "total": 3}]},
+        }
+    )
+
+    assert isinstance(parsed["s"], SystemsBatchResult)
+    assert parsed["s"].results[0].system == "T-72"
+    assert isinstance(parsed["e"], EquipmentsBatchResult)
+
+
+@pytest.mark.unit
+def test_batch_request_rejects_duplicate_ids():
+    """Test sub-query ids must be unique."""
+    with pytest.raises(ValidationError):
+        BatchRequest.model_validate(
+            {"queries": [{"id": "a", "kind": "systems"}, {"id": "a", "kind": "equipments"}]}
+        )
+
+
+@pytest.mark.unit
+def test_batch_service_invalid_date_range(db_session):
+    """Test an invalid date range in any sub-query raises ValueError."""
+    request = BatchRequest.model_validate(
+        {"queries": [{"id": "a", "kind": "systems", "date": ["2023-02-01", "2023-01-01"]}]}
+    )
+    with pytest.raises(ValueError, match="Start date should be before end date"):
+        BatchService(db_session).run(request.queries)
@@ -0,0 +1,118 @@
+"""
+Tests for the query cache and request coalescing.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.cache import QueryCache, SingleFlight, query_key
+from app.enums import Countries, EquipmentType
+
+
+@pytest.mark.unit
+def test_single_flight_coalesces_concurrent_calls():
+    """Test concurrent calls with the same key run the function once."""
+    flight = SingleFlight()
+    calls = 0
+    started = threading.Event()
+
+    def slow_query():
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.2)
+        return ["row"]
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        first = pool.submit(flight.do, "key", slow_query)
+        started.wait()
+        others = [pool.submit(flight.do, "key", slow_query) for _ in range(4)]
+        results = [first.result()] + [f.result() for f in others]
+
+    assert calls == 1
+    assert all(r is results[0] for r in results)
+    assert flight.executions == 1
+    assert flight.coalesced == 4
+
+    # Finished calls are not reused
+    assert flight.do("key", slow_query) == ["row"]
+    assert calls == 2
+
+
+@pytest.mark.unit
+def test_single_flight_shares_errors():
+    """Test waiters see the error raised by the in-flight call."""
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing_query():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(flight.do, "key", failing_query)
+        started.wait()
+        second = pool.submit(flight.do, "key", failing_query)
+        for future in (first, second):
+            with pytest.raises(ValueError, match="boom"):
+                future.result()
+
+
+@pytest.mark.unit
+def test_query_key_normalization():
+    """Test filter lists are order-insensitive while date ranges are not."""
+    assert query_key(
+        "equipments", Countries.ALL, [EquipmentType.TANKS, EquipmentType.AIRCRAFT]
+    ) == query_key("equipments", "all", [EquipmentType.AIRCRAFT, EquipmentType.TANKS])
+    assert query_key(("2023-01-01", "2023-02-01")) != query_key(("2023-02-01", "2023-01-01"))
+
+
+@pytest.mark.unit
+def test_request_log_is_bounded(monkeypatch):
+    """Test the lookup counts keep only the heaviest keys and the last day."""
+    monkeypatch.setattr("app.cache.REQUEST_LOG_KEYS", 2)
+    now = [10 * 3600.0]
+    monkeypatch.setattr("app.cache.time.time", lambda: now[0])
+    cache = QueryCache()
+
+    for _ in range(3):
+        cache.get("hot")
+    cache.get("warm")
+    cache.get("warm")
+    for i in range(100):
+        cache.get(("filter", i))
+
+    assert len(cache._requests[-1][1]) <= 4
+    assert cache.hot_keys(2) == ["hot", "warm"]
+
+    now[0] += 24 * 3600
+    cache.get("new")
+    assert [hour for hour, _ in cache._requests] == [34]
+    assert cache.hot_keys(2) == ["new"]
+
+
+@pytest.mark.unit
+def test_only_warmed_results_are_cached(monkeypatch):
+    """Test stats results are cached for warmed keys, or all with QUERY_CACHE_RESULTS=all."""
+    cache = QueryCache()
+    calls = []
+
+    def load(key):
+        return lambda: calls.append(key) or key
+
+    for _ in range(2):
+        cache.get_or_load_result("cold", load("cold"))
+    cache.set_warmed(["warm"])
+    for _ in range(2):
+        cache.get_or_load_result("warm", load("warm"))
+    assert calls == ["cold", "cold", "warm"]
+    assert cache.hot_keys(1) == ["cold"]
+
+    monkeypatch.setattr("app.cache.settings.query_cache_results", "all")
+    for _ in range(2):
+        cache.get_or_load_result("cold", load("cold"))
+    assert calls == ["cold", "cold", "warm", "cold"]
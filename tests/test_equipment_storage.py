@@ -0,0 +1,194 @@
+"""
+Tests for change-only equipment storage.
+
+Reads over compacted storage must return what the dense table returns.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.cache import query_cache
+from app.enums import Bucket, Countries, EquipmentDimension, EquipmentField, EquipmentType
+from app.equipment_storage import compact_equipment, expand_equipment
+from app.models import Equipment, EquipmentDailyTotal, EquipmentDate, EquipmentSeriesEnd
+from app.rollups import refresh_equipment_daily_totals
+from app.services.equipments_service import EquipmentsService
+
+DATES = [f"2023-01-{day:02d}" for day in range(1, 11)]
+
+
+def _counts(day: int, equipment_type: str) -> int:
+    # Tanks change every third day, Aircraft only once
+    if equipment_type == "Tanks":
+        return 10 + day // 3
+    return 5 if day < 6 else 6
+
+
+def _scraped(dates, aircraft_days=range(1, 11)):
+    return [
+        {
+            "country": country,
+            "equipment_type": equipment_type,
+            "destroyed": _counts(int(date[-2:]), equipment_type),
+            "abandoned": 1,
+            "captured": 0,
+            "damaged": 0,
+            "type_total": _counts(int(date[-2:]), equipment_type) + 1,
+            "date_recorded": date,
+        }
+        for date in dates
+        for country in ("ukraine", "russia")
+        for equipment_type in ("Tanks", "Aircraft")
+        if equipment_type == "Tanks" or int(date[-2:]) in aircraft_days
+    ]
+
+
+@pytest.fixture
+def changes(monkeypatch):
+    monkeypatch.setattr("app.equipment_storage.settings.equipment_storage", "changes")
+
+
+def _import(db_session, dates, **kwargs):
+    with patch("app.services.equipments_service.OryxScraper") as mock_scraper_class:
+        mock_scraper = MagicMock()
+        mock_scraper.scrape_equipments.return_value = _scraped(dates, **kwargs)
+        mock_scraper_class.return_value.__enter__.return_value = mock_scraper
+        EquipmentsService(db_session).import_equipments()
+
+
+def _without_ids(rows):
+    return sorted(
+        (r.country, r.type, r.destroyed, r.abandoned, r.captured, r.damaged, r.total, r.date)
+        for r in rows
+    )
+
+
+def _reads(service):
+    return {
+        "all": _without_ids(service.get_equipments(Countries.ALL)),
+        "range": _without_ids(
+            service.get_equipments(
+                Countries.UKRAINE, [EquipmentType.TANKS], ["2023-01-04", "2023-01-08"]
+            )
+        ),
+        "deltas": [
+            r.model_dump()
+            for r in service.get_equipment_deltas(Countries.ALL, date=["2023-01-03", "2023-01-09"])
+        ],
+        "aggregate": service.aggregate_equipments(
+            Countries.ALL, bucket=Bucket.WEEK, group_by=[EquipmentDimension.TYPE]
+        ),
+        "totals": service.aggregate_equipments(Countries.RUSSIA),
+    }
+
+
+@pytest.mark.unit
+def test_compacted_reads_match_dense(db_session, monkeypatch):
+    """Test every equipment read returns the same rows after compaction."""
+    _import(db_session, DATES)
+    service = EquipmentsService(db_session)
+    dense = _reads(service)
+
+    assert compact_equipment(db_session) == 40 - 12
+    db_session.commit()
+    monkeypatch.setattr("app.equipment_storage.settings.equipment_storage", "changes")
+    refresh_equipment_daily_totals(db_session)
+    db_session.commit()
+    query_cache.invalidate()
+
+    assert db_session.query(Equipment).count() == 12
+    assert db_session.query(EquipmentDate).count() == 10
+    assert _reads(service) == dense
+    assert db_session.query(EquipmentDailyTotal).count() == 20
+
+
+@pytest.mark.unit
+def test_import_with_change_storage(db_session, changes):
+    """Test imports only write changed rows and skip dates already imported."""
+    _import(db_session, DATES[:5])
+    _import(db_session, DATES[3:])
+
+    assert db_session.query(Equipment).count() == 12
+    assert db_session.query(EquipmentDate).count() == 10
+    rows = EquipmentsService(db_session).get_equipments(
+        Countries.RUSSIA, [EquipmentType.AIRCRAFT], ["2023-01-05", "2023-01-07"]
+    )
+    assert [(r.date, r.destroyed) for r in sorted(rows, key=lambda r: r.date)] == [
+        ("2023-01-05", 5),
+        ("2023-01-06", 6),
+        ("2023-01-07", 6),
+    ]
+
+
+@pytest.mark.unit
+def test_sparse_equipments(db_session):
+    """Test the sparse form keeps the first row in range and the changes."""
+    _import(db_session, DATES)
+    service = EquipmentsService(db_session)
+
+    rows = service.get_equipments(
+        Countries.UKRAINE,
+        [EquipmentType.TANKS],
+        ["2023-01-02", "2023-01-08"],
+        [EquipmentField.DATE, EquipmentField.DESTROYED],
+        sparse=True,
+    )
+    assert [r.model_dump(exclude_unset=True) for r in rows] == [
+        {"date": "2023-01-02", "destroyed": 10},
+        {"date": "2023-01-03", "destroyed": 11},
+        {"date": "2023-01-06", "destroyed": 12},
+    ]
+
+
+@pytest.mark.unit
+def test_expand_restores_dense_rows(db_session, changes):
+    """Test expanding change-only storage writes back every carried row."""
+    _import(db_session, DATES)
+    assert db_session.query(Equipment).count() == 12
+
+    assert expand_equipment(db_session) == 28
+    db_session.commit()
+    assert db_session.query(Equipment).count() == 40
+    assert db_session.query(Equipment).filter(Equipment.date == "2023-01-10").count() == 4
+
+
+@pytest.mark.unit
+def test_compacted_series_end_where_type_disappears(db_session, monkeypatch):
+    """Test a type that stops being reported is not carried past its last date."""
+    _import(db_session, DATES, aircraft_days=range(1, 6))
+    service = EquipmentsService(db_session)
+    dense = _reads(service)
+    assert len(dense["all"]) == 30
+
+    compact_equipment(db_session)
+    db_session.commit()
+    monkeypatch.setattr("app.equipment_storage.settings.equipment_storage", "changes")
+    refresh_equipment_daily_totals(db_session)
+    db_session.commit()
+    query_cache.invalidate()
+
+    assert db_session.query(EquipmentSeriesEnd).count() == 2
+    assert _reads(service) == dense
+    assert db_session.query(EquipmentDailyTotal).count() == 20
+
+    stored = db_session.query(Equipment).count()
+    assert expand_equipment(db_session) == 30 - stored
+    db_session.commit()
+    assert _without_ids(db_session.query(Equipment)) == dense["all"]
+    assert db_session.query(EquipmentSeriesEnd).count() == 0
+
+
+@pytest.mark.unit
+def test_import_series_end_and_return(db_session, changes):
+    """Test imports end a missing series and store it again when it comes back."""
+    aircraft_days = [*range(1, 4), *range(7, 11)]
+    _import(db_session, DATES[:5], aircraft_days=aircraft_days)
+    _import(db_session, DATES[5:], aircraft_days=aircraft_days)
+
+    rows = EquipmentsService(db_session).get_equipments(Countries.UKRAINE, [EquipmentType.AIRCRAFT])
+    assert [(r.date, r.destroyed) for r in sorted(rows, key=lambda r: r.date)] == [
+        (date, _counts(int(date[-2:]), "Aircraft"))
+        for date in DATES
+        if int(date[-2:]) in aircraft_days
+    ]
@@ -4,8 +4,16 @@ Tests for equipment endpoints and services.
 
 import pytest
 
-from app.enums import Countries, EquipmentType
+from app.enums import (
+    AggregateFunction,
+    Bucket,
+    Countries,
+    EquipmentDimension,
+    EquipmentField,
+    EquipmentType,
+)
 from app.models import AllEquipment, Equipment
+from app.rollups import refresh_equipment_daily_totals
 from app.services.equipments_service import EquipmentsService
 
 
@@ -189,3 +197,169 @@ def test_equipments_service_invalid_date_range(db_session, sample_equipment_data
             Countries.ALL,
             date=["2023-02-01", "2023-01-01"],
         )
+
+
+@pytest.mark.unit
+def test_equipments_service_fields_projection(db_session, sample_equipment_data):
+    """Test EquipmentsService.get_equipments returns only the requested fields."""
+    service = EquipmentsService(db_session)
+
+    db_session.add(Equipment(**sample_equipment_data))
+    db_session.commit()
+
+    results = service.get_equipments(
+        Countries.ALL,
+        fields=[EquipmentField.DATE, EquipmentField.TOTAL],
+    )
+    assert len(results) == 1
+    assert results[0].model_dump(exclude_unset=True) == {"date": "2023-01-01", "total": 20}
+
+
+@pytest.mark.unit
+def test_equipments_service_aggregate_by_week(db_session, sample_equipment_data):
+    """Test EquipmentsService.aggregate_equipments buckets daily sums by week."""
+    service = EquipmentsService(db_session)
+
+    # 2023-01-02 is a Monday; the 8th closes the same week
+    for date, total in [("2023-01-02", 10), ("2023-01-08", 30), ("2023-01-09", 40)]:
+        for equipment_type in ("Tanks", "Aircraft"):
+            data = sample_equipment_data.copy()
+            data.update(type=equipment_type, total=total, date=date)
+            db_session.add(Equipment(**data))
+    db_session.commit()
+    refresh_equipment_daily_totals(db_session)
+
+    results = service.aggregate_equipments(
+        Countries.ALL,
+        bucket=Bucket.WEEK,
+        aggregates=[AggregateFunction.MIN, AggregateFunction.MAX],
+    )
+    assert [r["bucket"] for r in results] == ["2023-01-02", "2023-01-09"]
+    assert results[0]["total_min"] == 20
+    assert results[0]["total_max"] == 60
+    assert results[1]["total_max"] == 80
+
+
+@pytest.mark.unit
+def test_equipments_service_aggregate_group_by_type(db_session, sample_equipment_data):
+    """Test EquipmentsService.aggregate_equipments keeps grouped dimensions apart."""
+    service = EquipmentsService(db_session)
+
+    for equipment_type in ("Tanks", "Aircraft"):
+        data = sample_equipment_data.copy()
+        data["type"] = equipment_type
+        db_session.add(Equipment(**data))
+    db_session.commit()
+
+    results = service.aggregate_equipments(
+        Countries.UKRAINE,
+        bucket=Bucket.MONTH,
+        group_by=[EquipmentDimension.TYPE],
+    )
+    assert results == [
+        {
+            "bucket": "2023-01-01",
+            "type": "Aircraft",
+            "destroyed_max": 10,
+            "abandoned_max": 2,
+            "captured_max": 5,
+            "damaged_max": 3,
+            "total_max": 20,
+        },
+        {
+            "bucket": "2023-01-01",
+            "type": "Tanks",
+            "destroyed_max": 10,
+            "abandoned_max": 2,
+            "captured_max": 5,
+            "damaged_max": 3,
+            "total_max": 20,
+        },
+    ]
+
+
+@pytest.mark.unit
+def test_equipments_service_aggregate_skips_all_types(db_session, sample_equipment_data):
+    """Test the rollup and raw-row paths agree when "All Types" rows are stored."""
+    service = EquipmentsService(db_session)
+
+    for equipment_type, total in [("Tanks", 20), ("Aircraft", 30), ("All Types", 50)]:
+        data = sample_equipment_data.copy()
+        data.update(type=equipment_type, total=total)
+        db_session.add(Equipment(**data))
+    db_session.commit()
+    refresh_equipment_daily_totals(db_session)
+
+    rollup = service.aggregate_equipments(Countries.UKRAINE, bucket=Bucket.MONTH)
+    by_type = service.aggregate_equipments(
+        Countries.UKRAINE, bucket=Bucket.MONTH, group_by=[EquipmentDimension.TYPE]
+    )
+    all_types = service.aggregate_equipments(
+        Countries.UKRAINE, types=[EquipmentType.ALL_TYPES], bucket=Bucket.MONTH
+    )
+
+    assert rollup[0]["total_max"] == 50
+    assert [(r["type"], r["total_max"]) for r in by_type] == [("Aircraft", 30), ("Tanks", 20)]
+    assert all_types == rollup
+
+
+@pytest.mark.unit
+def test_equipments_service_deltas(db_session, sample_equipment_data):
+    """Test EquipmentsService.get_equipment_deltas diffs each series by date."""
+    service = EquipmentsService(db_session)
+
+    for date, total in [("2023-01-01", 20), ("2023-01-02", 25), ("2023-01-03", 32)]:
+        data = sample_equipment_data.copy()
+        data.update(total=total, date=date)
+        db_session.add(Equipment(**data))
+    db_session.commit()
+
+    results = service.get_equipment_deltas(
+        Countries.UKRAINE,
+        date=["2023-01-02", "2023-01-03"],
+    )
+    assert [r.date for r in results] == ["2023-01-02", "2023-01-03"]
+    assert [r.total for r in results] == [5, 7]
+    assert [r.destroyed for r in results] == [0, 0]
+    assert [r.total_7d for r in results] == [5, 12]
+    assert [r.total_30d for r in results] == [5, 12]
+
+
+@pytest.mark.unit
+def test_equipments_service_type_catalog(
+    db_session, sample_equipment_data, sample_all_equipment_data
+):
+    """Test the type catalog carries row counts, date range and countries."""
+    service = EquipmentsService(db_session)
+
+    for country, date in [("ukraine", "2023-01-01"), ("russia", "2023-01-05")]:
+        data = sample_equipment_data.copy()
+        data.update(country=country, date=date)
+        db_session.add(Equipment(**data))
+    data = sample_all_equipment_data.copy()
+    data["type"] = "Aircraft"
+    db_session.add(AllEquipment(**data))
+    db_session.commit()
+
+    catalog = service.get_equipment_types()
+    assert catalog == [
+        {
+            "type": "Aircraft",
+            "rows": 0,
+            "first_seen": None,
+            "last_seen": None,
+            "countries": ["ukraine"],
+        },
+        {
+            "type": "Tanks",
+            "rows": 2,
+            "first_seen": "2023-01-01",
+            "last_seen": "2023-01-05",
+            "countries": ["russia", "ukraine"],
+        },
+    ]
+
+    # Cached until the next import invalidates it
+    db_session.query(Equipment).delete()
+    db_session.commit()
+    assert service.get_equipment_types() is catalog
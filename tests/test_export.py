@@ -0,0 +1,104 @@
+"""
+Tests for Arrow and Parquet exports.
+"""
+
+import io
+
+import pytest
+
+from app.enums import Countries, ExportTable, Status
+from app.models import Equipment, System
+from app.services.export_service import ExportService
+
+
+@pytest.mark.unit
+def test_export_arrow_stream_in_batches(db_session, sample_system_data):
+    """Test the Arrow stream is written in batches and reads back intact."""
+    pa = pytest.importorskip("pyarrow")
+    for i in range(5):
+        data = sample_system_data.copy()
+        data["url"] = f"https://example.com/{i}"
+        db_session.add(System(**data))
+    db_session.commit()
+
+    service = ExportService(db_session)
+    batches = list(service.iter_record_batches(ExportTable.SYSTEM, batch_size=2))
+    assert [b.num_rows for b in batches] == [2, 2, 1]
+
+    stream = b"".join(service.iter_arrow_stream(ExportTable.SYSTEM, batch_size=2))
+    table = pa.ipc.open_stream(stream).read_all()
+    assert table.num_rows == 5
+    assert table.schema.field("date").type == pa.date32()
+    assert table.column("url").to_pylist()[0] == "https://example.com/0"
+
+
+@pytest.mark.unit
+def test_export_invalid_dates_become_null(db_session, sample_equipment_data):
+    """Test blank and impossible dates are exported as null instead of failing the file."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    for equipment_type, date in [
+        ("Tanks", "2023-01-01"),
+        ("Aircraft", ""),
+        ("Drones", "2023-02-30"),
+    ]:
+        db_session.add(Equipment(**{**sample_equipment_data, "type": equipment_type, "date": date}))
+    db_session.commit()
+
+    buffer = io.BytesIO()
+    assert ExportService(db_session).write_parquet(buffer, ExportTable.EQUIPMENT) == 3
+
+    buffer.seek(0)
+    table = pq.read_table(buffer).sort_by("type")
+    assert [str(d) if d else None for d in table.column("date").to_pylist()] == [
+        None,
+        None,
+        "2023-01-01",
+    ]
+
+
+@pytest.mark.unit
+def test_export_parquet_with_filters(db_session, sample_equipment_data):
+    """Test Parquet export applies the stats filters."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    ukraine_data = sample_equipment_data.copy()
+    russia_data = sample_equipment_data.copy()
+    russia_data["country"] = "russia"
+    db_session.add(Equipment(**ukraine_data))
+    db_session.add(Equipment(**russia_data))
+    db_session.commit()
+
+    buffer = io.BytesIO()
+    rows = ExportService(db_session).write_parquet(
+        buffer,
+        ExportTable.EQUIPMENT,
+        country=Countries.RUSSIA,
+        date=["2023-01-01", "2023-01-31"],
+    )
+    assert rows == 1
+
+    buffer.seek(0)
+    table = pq.read_table(buffer)
+    assert table.column("country").to_pylist() == ["russia"]
+    assert table.column("total").to_pylist() == [20]
+
+
+@pytest.mark.unit
+def test_export_csv_fallback(db_session, sample_system_data):
+    """Test CSV export without COPY writes a header and the filtered rows."""
+    for url, status in [("https://a", "destroyed"), ("https://b", "captured")]:
+        data = sample_system_data.copy()
+        data.update(url=url, status=status)
+        db_session.add(System(**data))
+    db_session.commit()
+
+    chunks = ExportService(db_session).iter_csv(
+        ExportTable.SYSTEM,
+        batch_size=1,
+        country=Countries.UKRAINE,
+        status=[Status.CAPTURED],
+    )
+    lines = b"".join(chunks).decode().splitlines()
+    assert lines == [
+        "id,country,origin,system,status,url,date",
+        "2,ukraine,USA,M1 Abrams,captured,https://b,2023-01-01",
+    ]
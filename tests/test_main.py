@@ -37,3 +37,14 @@ def test_invalid_system_country_endpoint(client):
     """Test system endpoint with invalid country."""
     response = client.post("/api/stats/systems/invalid")
     assert response.status_code == 422  # Validation error
+
+
+@pytest.mark.unit
+def test_debug_endpoints_are_opt_in(client, monkeypatch):
+    """Test /debug/slow-queries is hidden unless DEBUG_ENDPOINTS is set."""
+    assert client.get("/debug/slow-queries").status_code == 404
+
+    monkeypatch.setattr("main.settings.debug_endpoints", True)
+    response = client.get("/debug/slow-queries")
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
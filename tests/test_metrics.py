@@ -0,0 +1,88 @@
+"""
+Tests for Prometheus metrics.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.cache import query_cache
+from app.metrics import (
+    MetricsMiddleware,
+    install_query_metrics,
+    record_import,
+    render_metrics,
+)
+
+prometheus_client = pytest.importorskip("prometheus_client")
+REGISTRY = prometheus_client.REGISTRY
+
+
+def _value(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def metrics_app():
+    """Minimal app wrapped in the metrics middleware."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return PlainTextResponse("x" * 100)
+
+    return app
+
+
+@pytest.mark.unit
+def test_request_metrics_use_route_template(metrics_app):
+    """Test requests are counted and timed per route template, not per path."""
+    labels = {"method": "GET", "route": "/items/{item_id}"}
+    count = _value("wat_http_request_duration_seconds_count", **labels)
+    size = _value("wat_http_response_size_bytes_sum", **labels)
+    missing = _value("wat_http_requests_total", method="GET", route="unmatched", status="404")
+
+    client = TestClient(metrics_app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/nowhere")
+
+    assert _value("wat_http_request_duration_seconds_count", **labels) == count + 2
+    assert _value("wat_http_response_size_bytes_sum", **labels) == size + 200
+    assert (
+        _value("wat_http_requests_total", method="GET", route="unmatched", status="404")
+        == missing + 1
+    )
+
+
+@pytest.mark.unit
+def test_query_metrics(db_session):
+    """Test database statements are timed by statement kind."""
+    install_query_metrics()
+    before = _value("wat_db_query_duration_seconds_count", statement="SELECT")
+
+    db_session.execute(text("SELECT 1"))
+    db_session.execute(text("  select 2"))
+
+    assert _value("wat_db_query_duration_seconds_count", statement="SELECT") == before + 2
+
+
+@pytest.mark.unit
+def test_import_and_cache_metrics():
+    """Test import throughput and cache counters show up in the exposition."""
+    before = _value("wat_import_rows_total", dataset="system")
+    hits = _value("wat_query_cache_hits_total")
+    query_cache.set(("metrics-test",), 1)
+    query_cache.get(("metrics-test",))
+
+    record_import("system", 500, 2.0)
+    content, content_type = render_metrics()
+
+    assert content_type.startswith("text/plain")
+    assert _value("wat_import_rows_total", dataset="system") == before + 500
+    assert _value("wat_import_rows_per_second", dataset="system") == 250
+    assert _value("wat_query_cache_hits_total") == hits + 1
+    assert b"wat_db_pool_checkouts_total" in content
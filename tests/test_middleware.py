@@ -0,0 +1,86 @@
+"""
+Tests for response compression middleware.
+"""
+
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import CompressionMiddleware, negotiate_encoding
+
+LARGE_BODY = "M1 Abrams destroyed https://example.com/entry\n" * 200
+
+
+@pytest.fixture
+def compression_app():
+    """Minimal app wrapped in the compression middleware."""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse(LARGE_BODY)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ok")
+
+    return app
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, br, zstd", "zstd"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("br, gzip", "br"),
+        ("*", "zstd"),
+        ("zstd;q=0, *;q=0.1", "br"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    """Test q-values win and ties follow server preference."""
+    assert negotiate_encoding(accept_encoding, ["zstd", "br", "gzip"]) == expected
+
+
+@pytest.mark.unit
+def test_compresses_large_responses(compression_app):
+    """Test large bodies are gzip encoded and decode to the original."""
+    client = TestClient(compression_app)
+
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert response.text == LARGE_BODY
+
+
+@pytest.mark.unit
+def test_skips_small_responses(compression_app):
+    """Test bodies below the threshold are sent as is."""
+    client = TestClient(compression_app)
+
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == "ok"
+
+
+@pytest.mark.unit
+@pytest.mark.anyio
+async def test_reuses_compressed_bodies():
+    """Test identical payloads are compressed only once."""
+    middleware = CompressionMiddleware(FastAPI())
+    body = LARGE_BODY.encode()
+
+    first = await middleware.compress("gzip", body)
+    second = await middleware.compress("gzip", body)
+    assert first is second
+    assert gzip.decompress(first) == body
+    assert middleware.cache.hits == 1
+    assert middleware.cache.misses == 1
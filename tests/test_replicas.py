@@ -0,0 +1,74 @@
+"""
+Tests for read replica routing.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Settings
+from app.replicas import Replica, ReplicaSet
+
+
+@pytest.fixture
+def replica_set(tmp_path):
+    """A primary and two replicas on separate SQLite files."""
+    primary = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'primary.db'}"))
+    replicas = [Replica(f"sqlite:///{tmp_path / f'replica{i}.db'}") for i in range(2)]
+    replica_set = ReplicaSet(primary, replicas, check_interval=3600)
+    replica_set.last_check = float("inf")  # no background checks during tests
+    return replica_set
+
+
+def _database(session) -> str:
+    try:
+        return session.get_bind().url.database.rsplit("/", 1)[-1]
+    finally:
+        session.close()
+
+
+@pytest.mark.unit
+def test_reads_round_robin_over_replicas(replica_set):
+    """Test read sessions alternate between healthy replicas."""
+    assert [_database(replica_set.session()) for _ in range(4)] == [
+        "replica0.db",
+        "replica1.db",
+        "replica0.db",
+        "replica1.db",
+    ]
+
+
+@pytest.mark.unit
+def test_reads_go_to_primary_after_import(replica_set):
+    """Test reads stay on the primary within the read-your-writes window."""
+    replica_set.mark_write()
+    assert _database(replica_set.session()) == "primary.db"
+    assert replica_set.status()["reading_from_primary"] is True
+
+    replica_set.last_write -= replica_set.write_window
+    assert _database(replica_set.session()).startswith("replica")
+
+
+@pytest.mark.unit
+def test_unreachable_replica_leaves_rotation(replica_set, tmp_path):
+    """Test failed health checks remove replicas and fall back to the primary."""
+    dead = Replica(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replica_set.replicas = [replica_set.replicas[0], dead]
+    replica_set.check()
+
+    assert dead.healthy is False
+    assert dead.error
+    assert {_database(replica_set.session()) for _ in range(3)} == {"replica0.db"}
+
+    replica_set.replicas[0].healthy = False
+    assert _database(replica_set.session()) == "primary.db"
+
+
+@pytest.mark.unit
+def test_read_urls_merge_single_and_list():
+    """Test READ_DATABASE_URL and READ_DATABASE_URLS combine without duplicates."""
+    settings = Settings(
+        read_database_url="postgresql://r1/wartrack",
+        read_database_urls=["postgresql://r1/wartrack", "postgresql://r2/wartrack"],
+    )
+    assert settings.read_urls == ["postgresql://r1/wartrack", "postgresql://r2/wartrack"]
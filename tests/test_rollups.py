@@ -0,0 +1,189 @@
+"""
+Tests for rollup table refreshes.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.models import AllSystem, Equipment, EquipmentDailyTotal, System, SystemDailyStatus
+from app.rollups import (
+    check_all_system,
+    refresh_all_system,
+    refresh_equipment_daily_totals,
+    refresh_system_daily_status,
+)
+from app.services.equipments_service import EquipmentsService
+from app.services.systems_service import SystemsService
+
+
+@pytest.mark.unit
+def test_refresh_equipment_daily_totals(db_session, sample_equipment_data):
+    """Test totals are summed across types and skip the All Types rows."""
+    for equipment_type, total in [("Tanks", 20), ("Aircraft", 5), ("All Types", 25)]:
+        data = sample_equipment_data.copy()
+        data.update(type=equipment_type, total=total)
+        db_session.add(Equipment(**data))
+    db_session.commit()
+
+    refresh_equipment_daily_totals(db_session, ["2023-01-01"])
+    db_session.commit()
+
+    rows = db_session.query(EquipmentDailyTotal).all()
+    assert len(rows) == 1
+    assert rows[0].country == "ukraine"
+    assert rows[0].total == 25
+    assert rows[0].destroyed == 20
+
+
+@pytest.mark.unit
+def test_refresh_system_daily_status_only_touches_given_dates(db_session, sample_system_data):
+    """Test an incremental refresh leaves other dates alone."""
+    for date in ("2023-01-01", "2023-01-02"):
+        data = sample_system_data.copy()
+        data["date"] = date
+        db_session.add(System(**data))
+    db_session.commit()
+
+    refresh_system_daily_status(db_session)
+    db_session.query(System).filter(System.date == "2023-01-01").delete()
+    refresh_system_daily_status(db_session, ["2023-01-02"])
+    db_session.commit()
+
+    rows = db_session.query(SystemDailyStatus).order_by(SystemDailyStatus.date).all()
+    assert [(r.date, r.count) for r in rows] == [("2023-01-01", 1), ("2023-01-02", 1)]
+
+
+@pytest.mark.unit
+@patch("app.services.equipments_service.OryxScraper")
+def test_import_equipments_refreshes_rollup(mock_scraper_class, db_session):
+    """Test import_equipments refreshes the rollup for the imported dates."""
+    mock_scraper = MagicMock()
+    mock_scraper.scrape_equipments.return_value = [
+        {
+            "country": "ukraine",
+            "equipment_type": equipment_type,
+            "destroyed": "1",
+            "abandoned": "0",
+            "captured": "0",
+            "damaged": "0",
+            "type_total": "1",
+            "date_recorded": "2023-01-01",
+        }
+        for equipment_type in ("Tanks", "Aircraft")
+    ]
+    mock_scraper_class.return_value.__enter__.return_value = mock_scraper
+
+    EquipmentsService(db_session).import_equipments()
+
+    rows = db_session.query(EquipmentDailyTotal).all()
+    assert [(r.date, r.total) for r in rows] == [("2023-01-01", 2)]
+
+
+@pytest.mark.unit
+@patch("app.services.systems_service.OryxScraper")
+def test_import_systems_refreshes_rollup(mock_scraper_class, db_session, sample_system_data):
+    """Test import_systems refreshes the rollup for the imported dates."""
+    mock_scraper = MagicMock()
+    mock_scraper.scrape_systems.return_value = [
+        {**sample_system_data, "url": url, "date_recorded": "2023-01-01"}
+        for url in ("https://a", "https://b")
+    ]
+    mock_scraper_class.return_value.__enter__.return_value = mock_scraper
+
+    SystemsService(db_session).import_systems()
+
+    rows = db_session.query(SystemDailyStatus).all()
+    assert [(r.system, r.status, r.count) for r in rows] == [("M1 Abrams", "destroyed", 2)]
+
+
+@pytest.mark.unit
+@patch("app.services.systems_service.OryxScraper")
+def test_import_systems_derives_all_system(mock_scraper_class, db_session, sample_system_data):
+    """Test import_systems updates all_system for the imported keys only."""
+    db_session.add(
+        AllSystem(
+            country="russia",
+            system="T-72B3",
+            destroyed=7,
+            abandoned=0,
+            captured=0,
+            damaged=0,
+            total=7,
+        )
+    )
+    db_session.add(System(**{**sample_system_data, "url": "https://a"}))
+    db_session.commit()
+
+    mock_scraper = MagicMock()
+    mock_scraper.scrape_systems.return_value = [
+        {**sample_system_data, "url": "https://b", "status": "captured", "date_recorded": date}
+        for date in ("2023-01-02", "2023-01-03")
+    ]
+    mock_scraper_class.return_value.__enter__.return_value = mock_scraper
+
+    SystemsService(db_session).import_systems()
+
+    rows = db_session.query(AllSystem).order_by(AllSystem.country).all()
+    assert [(r.country, r.system, r.destroyed, r.captured, r.total) for r in rows] == [
+        ("russia", "T-72B3", 7, 0, 7),
+        ("ukraine", "M1 Abrams", 1, 1, 2),
+    ]
+
+
+@pytest.mark.unit
+def test_refresh_all_system_counts_entries_once(db_session, sample_system_data):
+    """Test an entry seen on several dates counts once, with its latest status."""
+    for date, status in [("2023-01-01", "damaged"), ("2023-01-02", "captured")]:
+        db_session.add(System(**{**sample_system_data, "date": date, "status": status}))
+    db_session.add(System(**{**sample_system_data, "url": "https://b", "date": "2023-01-01"}))
+    db_session.commit()
+
+    refresh_all_system(db_session)
+    db_session.commit()
+
+    row = db_session.query(AllSystem).one()
+    assert (row.destroyed, row.captured, row.damaged, row.total) == (1, 1, 0, 2)
+    assert check_all_system(db_session) == []
+
+
+@pytest.mark.unit
+def test_check_all_system(db_session, sample_system_data):
+    """Test the checker reports wrong, missing and stale keys until a rebuild."""
+    for url, system in [("https://a", "M1 Abrams"), ("https://b", "Leopard 2")]:
+        db_session.add(System(**{**sample_system_data, "url": url, "system": system}))
+    db_session.commit()
+
+    refresh_all_system(db_session)
+    db_session.commit()
+    assert check_all_system(db_session) == []
+
+    db_session.query(AllSystem).filter(AllSystem.system == "Leopard 2").delete()
+    db_session.query(AllSystem).update({"total": 5})
+    db_session.add(
+        AllSystem(
+            country="ukraine",
+            system="Gone",
+            destroyed=1,
+            abandoned=0,
+            captured=0,
+            damaged=0,
+            total=1,
+        )
+    )
+    db_session.commit()
+
+    expected = {"destroyed": 1, "abandoned": 0, "captured": 0, "damaged": 0, "total": 1}
+    assert check_all_system(db_session) == [
+        {"country": "ukraine", "system": "Gone", "stored": expected, "expected": None},
+        {"country": "ukraine", "system": "Leopard 2", "stored": None, "expected": expected},
+        {
+            "country": "ukraine",
+            "system": "M1 Abrams",
+            "stored": {**expected, "total": 5},
+            "expected": expected,
+        },
+    ]
+
+    SystemsService(db_session).import_all_systems()
+    assert check_all_system(db_session) == []
@@ -0,0 +1,82 @@
+"""
+Tests for the slow-query log.
+"""
+
+import pytest
+
+from app.enums import Countries
+from app.services.equipments_service import EquipmentsService
+from app.slow_queries import (
+    SlowQueryLog,
+    install_slow_query_log,
+    normalize,
+    slow_query_log,
+)
+
+
+@pytest.fixture
+def log_everything(monkeypatch):
+    monkeypatch.setattr("app.slow_queries.settings.slow_query_threshold_ms", 0.0)
+    install_slow_query_log()
+    slow_query_log.reset()
+    yield
+    slow_query_log.reset()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "statement, expected",
+    [
+        (
+            "SELECT * FROM system WHERE date >= %(date_1)s AND status IN (%(s_1)s, %(s_2)s)",
+            "SELECT * FROM system WHERE date >= ? AND status IN (?)",
+        ),
+        (
+            "SELECT id FROM equipment_2022\n  WHERE type = 'Tanks' LIMIT 10 OFFSET ?",
+            "SELECT id FROM equipment_2022 WHERE type = ? LIMIT ? OFFSET ?",
+        ),
+        ("SELECT CAST(date AS DATE)::date FROM x", "SELECT CAST(date AS DATE)::date FROM x"),
+    ],
+)
+def test_normalize(statement, expected):
+    """Test literals, binds and IN lists are collapsed into one shape."""
+    assert normalize(statement) == expected
+
+
+@pytest.mark.unit
+def test_slow_queries_record_service_method(db_session, log_everything):
+    """Test slow statements are grouped by shape with the calling service method."""
+    service = EquipmentsService(db_session)
+    service.get_equipments(Countries.UKRAINE, date=["2023-01-01", "2023-01-31"])
+    service.get_equipments(Countries.UKRAINE, date=["2023-02-01", "2023-02-28"])
+
+    top = slow_query_log.top(5)
+    entry = next(e for e in top if "FROM equipment" in e["shape"])
+    assert entry["count"] == 2
+    assert entry["service_method"].startswith("EquipmentsService.")
+    assert entry["route"] is None
+    assert "2023-0" in entry["parameters"]
+    assert top == sorted(top, key=lambda e: e["max_ms"], reverse=True)
+
+
+@pytest.mark.unit
+def test_explain_is_postgres_only(db_session, log_everything, monkeypatch):
+    """Test no EXPLAIN is scheduled on SQLite even when every query is sampled."""
+    monkeypatch.setattr("app.slow_queries.settings.slow_query_explain_sample_rate", 1.0)
+    scheduled = []
+    monkeypatch.setattr("app.slow_queries._schedule_explain", lambda *args: scheduled.append(args))
+
+    EquipmentsService(db_session).get_equipments(Countries.ALL)
+
+    assert scheduled == []
+
+
+@pytest.mark.unit
+def test_log_keeps_slowest_shapes():
+    """Test the fastest shape is dropped when the log is full."""
+    log = SlowQueryLog(max_shapes=2)
+    log.record("SELECT 1 FROM a", None, 10.0, None, None)
+    log.record("SELECT 1 FROM b", None, 30.0, None, None)
+    log.record("SELECT 1 FROM c", None, 20.0, None, None)
+
+    assert [e["shape"] for e in log.top(5)] == ["SELECT ? FROM b", "SELECT ? FROM c"]
@@ -0,0 +1,122 @@
+"""
+Tests for the in-memory equipment snapshot.
+
+The snapshot must return exactly what the SQL path returns.
+"""
+
+import pytest
+
+from app.enums import (
+    AggregateFunction,
+    Bucket,
+    Countries,
+    EquipmentDimension,
+    EquipmentField,
+    EquipmentType,
+)
+from app.models import Equipment
+from app.rollups import refresh_equipment_daily_totals
+from app.services.equipments_service import EquipmentsService
+
+np = pytest.importorskip("numpy")
+
+from app.snapshot import EquipmentSnapshot, get_equipment_snapshot  # noqa: E402
+
+
+@pytest.fixture
+def equipment_history(db_session):
+    """A few weeks of equipment rows for two countries and three types."""
+    for day in range(1, 40):
+        date = f"2023-{1 + (day - 1) // 31:02d}-{(day - 1) % 31 + 1:02d}"
+        for country in ("ukraine", "Russia"):
+            for i, equipment_type in enumerate(("Tanks", "Aircraft", "All Types")):
+                count = day * (i + 1) + len(country)
+                db_session.add(
+                    Equipment(
+                        country=country,
+                        type=equipment_type,
+                        destroyed=count,
+                        abandoned=day % 3,
+                        captured=i,
+                        damaged=day % 5,
+                        total=count + day % 3 + i + day % 5,
+                        date=date,
+                    )
+                )
+    db_session.commit()
+    refresh_equipment_daily_totals(db_session)
+    db_session.commit()
+    return db_session
+
+
+FILTERS = [
+    {"country": Countries.ALL},
+    {"country": Countries.RUSSIA},
+    {"country": Countries.UKRAINE, "types": [EquipmentType.TANKS]},
+    {"country": Countries.ALL, "date": ["2023-01-10", "2023-02-02"]},
+    {"country": Countries.RUSSIA, "types": [EquipmentType.ALL_TYPES, EquipmentType.TANKS]},
+]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("filters", FILTERS)
+def test_snapshot_query_matches_sql(equipment_history, filters):
+    """Test snapshot queries return the same rows as the SQL path."""
+    service = EquipmentsService(equipment_history)
+    snapshot = EquipmentSnapshot.load(equipment_history)
+
+    expected = sorted(service.get_equipments(**filters), key=lambda r: r.id)
+    assert snapshot.query(**filters) == expected
+
+    fields = [EquipmentField.DATE, EquipmentField.TOTAL]
+    projected = service.get_equipments(**filters, fields=fields)
+    assert [r.model_dump(exclude_unset=True) for r in snapshot.query(**filters, fields=fields)] == [
+        r.model_dump(exclude_unset=True) for r in projected
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("bucket", list(Bucket))
+@pytest.mark.parametrize("dimensions", [[], ["country"], ["type"], ["country", "type"]])
+def test_snapshot_aggregate_matches_sql(equipment_history, filters, bucket, dimensions):
+    """Test snapshot aggregations return the same buckets as the SQL path."""
+    aggregates = list(AggregateFunction)
+    expected = EquipmentsService(equipment_history).aggregate_equipments(
+        **filters,
+        bucket=bucket,
+        group_by=[EquipmentDimension(d) for d in dimensions],
+        aggregates=aggregates,
+    )
+    actual = EquipmentSnapshot.load(equipment_history).aggregate(
+        **filters, bucket=bucket, dimensions=dimensions, aggregates=aggregates
+    )
+    assert actual == pytest.approx(expected)
+
+
+@pytest.mark.unit
+def test_snapshot_invalid_date_range(equipment_history):
+    """Test the snapshot validates date ranges like the SQL path."""
+    snapshot = EquipmentSnapshot.load(equipment_history)
+    with pytest.raises(ValueError, match="Start date should be before end date"):
+        snapshot.query(Countries.ALL, date=["2023-02-01", "2023-01-01"])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("bad_date", ["", "2023-02-30", "2023-01"])
+def test_snapshot_falls_back_to_sql_on_invalid_dates(
+    equipment_history, monkeypatch, bad_date, sample_equipment_data
+):
+    """Test rows with invalid dates disable the snapshot instead of corrupting results."""
+    equipment_history.add(Equipment(**{**sample_equipment_data, "date": bad_date}))
+    equipment_history.commit()
+    service = EquipmentsService(equipment_history)
+    filters = {"country": Countries.UKRAINE, "date": ["1970-01-01", "2023-01-31"]}
+    expected = service.get_equipments(**filters)
+
+    monkeypatch.setattr("app.snapshot.settings.equipment_snapshot", True)
+    monkeypatch.setattr("app.snapshot._snapshot", None)
+    assert EquipmentSnapshot.load(equipment_history).invalid_dates == 1
+    assert get_equipment_snapshot(equipment_history) is None
+    assert service.get_equipments(**filters) == expected
+    assert "1970-01-01" not in [r.date for r in expected]
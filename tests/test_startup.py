@@ -0,0 +1,26 @@
+"""
+Tests for cold-start imports.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+LAZY_MODULES = ("apscheduler", "oryx_wat_scraper", "pyarrow", "numpy")
+
+
+@pytest.mark.unit
+def test_import_main_defers_optional_modules():
+    """Test importing the app does not load the scheduler, scraper or optional extras."""
+    check = f"import sys, main; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", check],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == ""
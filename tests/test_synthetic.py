@@ -0,0 +1,90 @@
+"""
+Tests for the synthetic data generator.
+"""
+
+from itertools import pairwise
+
+import pytest
+
+from app.enums import Countries
+from app.models import AllSystem, Equipment, EquipmentDailyTotal, System
+from app.services.equipments_service import EquipmentsService
+from app.synthetic import STATUS_CHANGES, SyntheticData, write_synthetic_data
+
+
+@pytest.mark.unit
+def test_generator_is_deterministic():
+    """Test the same seed produces the same records and another seed does not."""
+    data = SyntheticData(days=5, types=3, systems=20, entries_per_day=10, seed=1)
+
+    assert list(data.system_records()) == list(
+        SyntheticData(days=5, types=3, systems=20, entries_per_day=10, seed=1).system_records()
+    )
+    assert list(data.equipment_records()) != list(
+        SyntheticData(days=5, types=3, seed=2).equipment_records()
+    )
+
+
+@pytest.mark.unit
+def test_generator_scale_and_shape():
+    """Test record counts follow the scale options and counts are cumulative."""
+    data = SyntheticData(days=30, types=4, systems=50, entries_per_day=25)
+    equipment = list(data.equipment_records())
+    systems = list(data.system_records())
+
+    # 4 types plus "All Types", for 2 countries
+    assert len(equipment) == 30 * 5 * 2
+    # 25 new entries a day, each listed again on every later date
+    assert len(systems) == 25 * sum(range(1, 31))
+    assert len({s["url"] for s in systems}) == 30 * 25
+    assert {s["system"] for s in systems} <= {data.system_name(i) for i in range(50)}
+
+    series = {}
+    for record in equipment:
+        series.setdefault((record["country"], record["equipment_type"]), []).append(record)
+        assert record["type_total"] == sum(
+            record[k] for k in ("destroyed", "abandoned", "captured", "damaged")
+        )
+    for records in series.values():
+        totals = [r["type_total"] for r in records]
+        assert totals == sorted(totals)
+
+
+@pytest.mark.unit
+def test_generator_repeats_system_entries():
+    """Test each date lists the earlier entries again, some with an updated status."""
+    data = SyntheticData(days=30, systems=50, entries_per_day=25)
+    by_date = {}
+    for record in data.system_records():
+        by_date.setdefault(record["date_recorded"], {})[record["url"]] = record
+
+    changes = 0
+    for previous, current in pairwise(data.dates()):
+        assert by_date[previous].keys() < by_date[current].keys()
+        for url, entry in by_date[previous].items():
+            status = by_date[current][url]["status"]
+            if status != entry["status"]:
+                assert STATUS_CHANGES[entry["status"]] == status
+                changes += 1
+    assert changes > 0
+
+
+@pytest.mark.unit
+def test_write_synthetic_data(db_session):
+    """Test the direct write fills the tables and rollups the services read."""
+    data = SyntheticData(days=10, types=2, systems=10, entries_per_day=5)
+
+    written = write_synthetic_data(db_session, data)
+    db_session.commit()
+
+    assert written == {"equipment": 60, "all_equipment": 6, "system": 275}
+    assert db_session.query(Equipment).count() == 60
+    assert db_session.query(System).count() == 275
+    assert db_session.query(EquipmentDailyTotal).count() == 20
+    # Counted once per entry, not once per date it is listed on
+    assert sum(s.total for s in db_session.query(AllSystem)) == 50
+    assert len(EquipmentsService(db_session).get_equipments(Countries.ALL)) == 60
+
+    with pytest.raises(ValueError):
+        write_synthetic_data(db_session, data)
+    assert write_synthetic_data(db_session, data, replace=True)["system"] == 275
@@ -4,8 +4,10 @@ Tests for system endpoints and services.
 
 import pytest
 
-from app.enums import Countries, Status
+from app.enums import Bucket, Countries, Status, SystemDimension, SystemField
 from app.models import AllSystem, System
+from app.rollups import refresh_system_daily_status
+from app.search import similarity
 from app.services.systems_service import SystemsService
 
 
@@ -192,3 +194,141 @@ def test_systems_service_invalid_date_range(db_session, sample_system_data):
             Countries.UKRAINE,
             date=["2023-02-01", "2023-01-01"],
         )
+
+
+@pytest.mark.unit
+def test_systems_service_fields_projection(db_session, sample_system_data):
+    """Test SystemsService.get_systems returns only the requested fields."""
+    service = SystemsService(db_session)
+
+    db_session.add(System(**sample_system_data))
+    db_session.commit()
+
+    results = service.get_systems(
+        Countries.UKRAINE,
+        fields=[SystemField.SYSTEM, SystemField.STATUS],
+    )
+    assert len(results) == 1
+    assert results[0].model_dump(exclude_unset=True) == {
+        "system": "M1 Abrams",
+        "status": "destroyed",
+    }
+
+
+@pytest.mark.unit
+def test_systems_service_aggregate_by_status(db_session, sample_system_data):
+    """Test SystemsService.aggregate_systems counts daily entries per group."""
+    service = SystemsService(db_session)
+
+    for url, status in [
+        ("https://a", "destroyed"),
+        ("https://b", "destroyed"),
+        ("https://c", "captured"),
+    ]:
+        data = sample_system_data.copy()
+        data.update(url=url, status=status)
+        db_session.add(System(**data))
+    db_session.commit()
+    refresh_system_daily_status(db_session)
+
+    results = service.aggregate_systems(
+        Countries.ALL,
+        bucket=Bucket.MONTH,
+        group_by=[SystemDimension.STATUS],
+    )
+    assert results == [
+        {"bucket": "2023-01-01", "status": "captured", "count_max": 1},
+        {"bucket": "2023-01-01", "status": "destroyed", "count_max": 2},
+    ]
+
+
+@pytest.mark.unit
+def test_systems_service_system_catalog(db_session, sample_system_data):
+    """Test the system catalog carries entry counts, date range, countries and origins."""
+    service = SystemsService(db_session)
+
+    for url, date in [("https://a", "2023-01-01"), ("https://b", "2023-02-01")]:
+        data = sample_system_data.copy()
+        data.update(url=url, date=date)
+        db_session.add(System(**data))
+    db_session.commit()
+
+    assert service.get_system_types() == [
+        {
+            "system": "M1 Abrams",
+            "rows": 2,
+            "first_seen": "2023-01-01",
+            "last_seen": "2023-02-01",
+            "countries": ["ukraine"],
+            "origins": ["USA"],
+        }
+    ]
+
+
+def _add_all_systems(db_session, names):
+    for name in names:
+        db_session.add(
+            AllSystem(
+                country="ukraine",
+                system=name,
+                destroyed=1,
+                abandoned=0,
+                captured=0,
+                damaged=0,
+                total=1,
+            )
+        )
+    db_session.commit()
+
+
+@pytest.mark.unit
+def test_search_similarity_matches_pg_trgm():
+    """Test trigram similarity follows pg_trgm's similarity()."""
+    assert similarity("word", "two words") == pytest.approx(4 / 11)
+    assert similarity("T-72B3", "t 72b3") == 1.0
+    assert similarity("", "T-72") == 0.0
+
+
+@pytest.mark.unit
+def test_systems_service_search(db_session, sample_system_data):
+    """Test search ranks prefix matches before fuzzy ones and covers origins."""
+    service = SystemsService(db_session)
+    _add_all_systems(db_session, ["T-72B3", "T-72B", "T-80BV", "BMP-2", "Leopard 2A4"])
+    db_session.add(System(**sample_system_data))
+    db_session.commit()
+
+    results = service.search_systems("t-72")
+    assert [(r["value"], r["match"]) for r in results[:2]] == [
+        ("T-72B", "prefix"),
+        ("T-72B3", "prefix"),
+    ]
+    assert all(r["kind"] == "system" for r in results)
+
+    # A typo still finds the system
+    assert service.search_systems("leopart 2a4")[0] == {
+        "value": "Leopard 2A4",
+        "kind": "system",
+        "match": "fuzzy",
+        "score": pytest.approx(similarity("leopart 2a4", "Leopard 2A4"), abs=1e-4),
+    }
+
+    assert service.search_systems("us") == [
+        {"value": "USA", "kind": "origin", "match": "prefix", "score": 0.4}
+    ]
+    assert len(service.search_systems("t", limit=2)) == 2
+
+    with pytest.raises(ValueError):
+        service.search_systems("  ")
+
+
+@pytest.mark.unit
+def test_search_systems_endpoint(client, db_session):
+    """Test the search endpoint returns ranked matches and validates the limit."""
+    _add_all_systems(db_session, ["T-72B3", "T-80BV"])
+
+    response = client.get("/api/stats/system-types/search", params={"q": "T-8", "limit": 5})
+    assert response.status_code == 200
+    assert response.json()[0]["value"] == "T-80BV"
+
+    response = client.get("/api/stats/system-types/search", params={"q": "T", "limit": 100})
+    assert response.status_code == 422
@@ -0,0 +1,64 @@
+"""
+Tests for post-import cache warming.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.cache import query_cache, query_key
+from app.database import Base
+from app.enums import Countries, EquipmentType
+from app.models import AllEquipment, Equipment
+from app.services.equipments_service import EquipmentsService
+from app.warming import CANONICAL_QUERIES, queries_to_warm, warm_caches
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on a file database, shared by the warming threads."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'warm.db'}")
+    Base.metadata.create_all(bind=engine)
+    query_cache.reset()
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.mark.unit
+def test_warm_caches_fills_canonical_queries(
+    session_factory, sample_equipment_data, sample_all_equipment_data
+):
+    """Test warmed queries are served from the cache afterwards."""
+    db = session_factory()
+    db.add(Equipment(**sample_equipment_data))
+    db.add(AllEquipment(**sample_all_equipment_data))
+    db.commit()
+
+    keys = [key for group in CANONICAL_QUERIES.values() for key in group]
+    assert warm_caches(keys, session_factory) == len(keys)
+
+    # Changes are not visible until the next import invalidates the cache
+    db.query(Equipment).delete()
+    db.commit()
+    service = EquipmentsService(db)
+    assert len(service.get_equipments(Countries.UKRAINE)) == 1
+    assert len(service.get_total_equipments()) == 1
+    db.close()
+
+
+@pytest.mark.unit
+def test_queries_to_warm_include_hot_keys(session_factory, monkeypatch):
+    """Test the most requested keys are warmed after the configured groups."""
+    monkeypatch.setattr("app.warming.settings.cache_warm_queries", ["catalogs"])
+    db = session_factory()
+    service = EquipmentsService(db)
+    for _ in range(3):
+        service.get_equipments(Countries.UKRAINE, types=[EquipmentType.TANKS])
+    db.close()
+
+    hot = query_key("equipments", Countries.UKRAINE, [EquipmentType.TANKS], (), [], False)
+    assert queries_to_warm() == [*CANONICAL_QUERIES["catalogs"], hot]
+
+    query_cache.invalidate()
+    assert warm_caches([hot], session_factory) == 1
+    assert query_cache.get(hot) == []